@@ -1,15 +1,28 @@
 # src/cli_interface.py
+import shlex
 import subprocess
 import sys
-from core.nlp_utils import parse_nlp
-from core.command_generator import generate_command
-from core.aws_validator import validate_command_safe
-from core.telemetry import telemetry_log_event
+from aws_cli_assistant.core.nlp_utils import parse_nlp_detailed, parse_nlp_batch
+from aws_cli_assistant.config.settings import NLP_BUDGET_MS
+from aws_cli_assistant.core.command_generator import command_argv
+from aws_cli_assistant.core.fanout import generate_and_validate
+from aws_cli_assistant.core.intent_registry import service_title, supported_services
+from aws_cli_assistant.core.telemetry import telemetry_log_event
+from aws_cli_assistant.core.timing import latency_stats, trace
+
+def _format_timings(timings: dict) -> str:
+    parts = []
+    for s in timings["spans"]:
+        if s["name"] in ("nlp", "generate", "validate", "fanout"):
+            backend = f" ({s['backend']})" if "backend" in s else ""
+            parts.append(f"{s['name']} {s['ms']:.1f} ms{backend}")
+    parts += [f"{c['service']}.{c['operation']} {c['ms']:.1f} ms" for c in timings["aws_calls"]]
+    return " · ".join(parts)
 
 def run_cli_interface():
     """Interactive CLI interface for AWS CLI Assistant"""
     print("🚀 AWS CLI Assistant - Interactive Mode")
-    print("Type 'exit' or 'quit' to stop, 'help' for supported services\n")
+    print("Type 'exit' or 'quit' to stop, 'help' for supported services, 'stats' for latency percentiles\n")
     
     while True:
         try:
@@ -24,21 +37,37 @@ def run_cli_interface():
                 break
                 
             if query.lower() == 'help':
-                print("Supported services: S3, DynamoDB, EC2, Lambda, IAM")
+                print("Supported services: " + ", ".join(service_title(s) for s in supported_services()))
                 print("Example: 'list my s3 buckets' or 'describe ec2 instances'\n")
                 continue
+
+            if query.lower() == 'stats':
+                for name, h in latency_stats().items():
+                    print(f"{name:<32} n={h['count']:<5} p50={h['p50_ms']:.1f} p95={h['p95_ms']:.1f} p99={h['p99_ms']:.1f} ms")
+                print()
+                continue
             
             # Process the query
             print(f"\n🔄 Processing: {query}")
             
             # Parse and generate command
-            intent, entities = parse_nlp(query)
-            command, explanation = generate_command(intent, entities)
-            validation = validate_command_safe(intent, entities)
+            with trace("cli.query") as t:
+                parsed = parse_nlp_detailed(query, NLP_BUDGET_MS["cli"])
+                intent, entities = parsed.intent, parsed.entities
+                response = generate_and_validate(intent, entities, query)
+            timings = t.to_dict()
+            command, explanation, validation = response["command"], response["explanation"], response["validation"]
+            # (entities, command) per region when the query named several
+            targets = [(dict(entities, region=r["region"]), r["command"]) for r in response.get("regions", [])]
+            targets = targets or [(entities, command)]
             
             # Display results
             print(f"\n📋 Generated Command: {command}")
             print(f"💡 Explanation: {explanation}")
+            print(f"⏱️  {_format_timings(timings)}")
+            for r in response.get("regions", []):
+                ms = f"{r['ms']:.0f} ms" if r.get("ms") is not None else "-"
+                print(f"   {r['region']:<16} {r['validation'].get('status', 'unknown'):<10} {ms}")
             
             # Show validation status
             status = validation.get('status', 'unknown')
@@ -51,27 +80,29 @@ def run_cli_interface():
             execute = input(f"\nExecute this command? (y/n): ").strip().lower()
             
             if execute in ['y', 'yes']:
-                print(f"\n⚡ Executing: {command}")
-                try:
-                    result = subprocess.run(
-                        command.split(), 
-                        capture_output=True, 
-                        text=True, 
-                        timeout=30
-                    )
-                    
-                    if result.returncode == 0:
-                        print("✅ Success!")
-                        if result.stdout:
-                            print(result.stdout)
-                    else:
-                        print("❌ Error:")
-                        print(result.stderr)
+                for target_entities, target_command in targets:
+                    print(f"\n⚡ Executing: {target_command}")
+                    try:
+                        # the template's argv keeps each entity value one argument
+                        result = subprocess.run(
+                            command_argv(intent, target_entities) or shlex.split(target_command),
+                            capture_output=True, 
+                            text=True, 
+                            timeout=30
+                        )
                         
-                except subprocess.TimeoutExpired:
-                    print("⏰ Command timed out (30s limit)")
-                except Exception as e:
-                    print(f"❌ Execution failed: {str(e)}")
+                        if result.returncode == 0:
+                            print("✅ Success!")
+                            if result.stdout:
+                                print(result.stdout)
+                        else:
+                            print("❌ Error:")
+                            print(result.stderr)
+                            
+                    except subprocess.TimeoutExpired:
+                        print("⏰ Command timed out (30s limit)")
+                    except Exception as e:
+                        print(f"❌ Execution failed: {str(e)}")
             else:
                 print("Command not executed.")
             
@@ -81,6 +112,8 @@ def run_cli_interface():
             telemetry_log_event("cli.interaction", {
                 "query": query,
                 "intent": intent,
+                "nlp_stage": parsed.stage,
+                "timings": timings,
                 "executed": execute in ['y', 'yes']
             })
             
@@ -91,5 +124,31 @@ def run_cli_interface():
             print(f"❌ Error: {str(e)}")
             continue
 
+def run_cli_batch(path: str, workers: int = 1):
+    """Non-interactive: generate a command for every non-empty line of `path` ('-' reads stdin).
+
+    With workers > 1 classification runs on a pre-forked pool sharing one model.
+    """
+    if path == "-":
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    with trace("cli.batch") as t:
+        if workers > 1:
+            from aws_cli_assistant.prefork import parse_nlp_pool
+            parsed = parse_nlp_pool(queries, workers=workers)
+        else:
+            parsed = parse_nlp_batch(queries)
+
+        for query, (intent, entities) in zip(queries, parsed):
+            response = generate_and_validate(intent, entities, query)
+            print(f"🔄 {query}")
+            print(f"📋 {response['command']}")
+            print(f"💡 {response['explanation']} [{response['validation'].get('status', 'unknown')}]\n")
+
+    telemetry_log_event("cli.batch", {"count": len(queries), "timings": t.to_dict()})
+
 if __name__ == "__main__":
     run_cli_interface()
\ No newline at end of file
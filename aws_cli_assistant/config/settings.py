@@ -8,3 +8,29 @@ try:
 except Exception:
     CONFIG = {}
 DEFAULT_REGION = os.getenv("AWS_REGION") or CONFIG.get("default_region", "us-west-1")
+INTENT_EXAMPLES_PATH = os.path.join(BASE, "config", "intent_examples.json")
+
+# per-interface latency budget for NLP classification; 0 waits for every stage
+NLP_BUDGET_MS = {
+    iface: float(os.getenv(f"NLP_BUDGET_MS_{iface.upper()}", CONFIG.get("nlp_budget_ms", {}).get(iface, 0)))
+    for iface in ("mcp", "http", "cli")
+}
+
+# named region sets for "all us regions"-style queries; "all" is every configured region
+REGION_GROUPS = {name: list(regions) for name, regions in CONFIG.get("region_groups", {}).items()}
+REGION_GROUPS.setdefault("all", list(dict.fromkeys(r for regions in REGION_GROUPS.values() for r in regions)))
+
+# multi-region validation: regions checked at once, and how long a slow region may hold up the response
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", CONFIG.get("fanout", {}).get("concurrency", 8)))
+FANOUT_DEADLINE_MS = float(os.getenv("FANOUT_DEADLINE_MS", CONFIG.get("fanout", {}).get("deadline_ms", 5000)))
+
+# pooled boto3 clients: connections kept per client, and how often credentials are checked for a change
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS",
+                                         CONFIG.get("aws_clients", {}).get("max_pool_connections", 32)))
+AWS_CREDENTIAL_CHECK_S = float(os.getenv("AWS_CREDENTIAL_CHECK_S",
+                                         CONFIG.get("aws_clients", {}).get("credential_check_s", 1.0)))
+
+# JSON telemetry log the servers write (and the distilled classifier trains from); empty disables it
+_telemetry = CONFIG.get("telemetry", {})
+TELEMETRY_LOG_PATH = os.getenv("TELEMETRY_LOG_PATH", _telemetry.get("log_path", "telemetry/telemetry.log")
+                               if _telemetry.get("enabled", True) else "")
@@ -0,0 +1,79 @@
+"""Pre-parsed AWS CLI command templates.
+
+A template such as ``aws s3api create-bucket --bucket {bucket}`` is split into
+argv tokens once, when the parser module is imported, and each token into
+literal and field parts. Tokens without fields are shell-quoted up front; at
+render time each value is dropped into its token as-is (never re-split,
+whatever it contains) and only tokens holding values are quoted.
+"""
+import shlex
+import string
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# entity values repeat (regions, default names); quoting is a regex scan per value
+_quote = lru_cache(maxsize=4096)(shlex.quote)
+
+# (literal text, None) or (None, entity name)
+Part = Tuple[Optional[str], Optional[str]]
+
+
+def _parse_token(token: str) -> Tuple[Part, ...]:
+    parts = []
+    for text, name, spec, conversion in string.Formatter().parse(token):
+        if text:
+            parts.append((text, None))
+        if name is None:
+            continue
+        if not name.isidentifier() or spec or conversion:
+            raise ValueError(f"unsupported placeholder in {token!r}; use plain {{name}}")
+        parts.append((None, name))
+    return tuple(parts)
+
+
+def _fill(parts: Tuple[Part, ...], entities: Dict[str, Any]) -> str:
+    value = ""
+    for text, name in parts:
+        value += text if name is None else str(entities[name])
+    return value
+
+
+class CommandTemplate:
+    """``aws <service> <operation> ... {entity} ...`` parsed once, rendered per request.
+
+    Placeholders are plain ``{name}`` fields over the resolved entities; a
+    token may mix literal text and fields (``s3://{bucket}/{file_name}``).
+    Calling the template renders the shell string, so it can serve as an
+    `IntentSpec.build`; `argv(entities)` gives the same command as a list.
+    """
+
+    __slots__ = ("text", "tokens", "fields", "_quoted")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tuple(_parse_token(token) for token in shlex.split(text))
+        self.fields = tuple(dict.fromkeys(name for parts in self.tokens for _, name in parts if name))
+        # shell text of each literal-only token; None where a value goes
+        self._quoted = tuple(None if any(name for _, name in parts) else shlex.quote(_fill(parts, {}))
+                             for parts in self.tokens)
+
+    def render(self, entities: Dict[str, Any]) -> str:
+        out = []
+        for parts, quoted in zip(self.tokens, self._quoted):
+            out.append(quoted if quoted is not None else _quote(_fill(parts, entities)))
+        return " ".join(out)
+
+    def argv(self, entities: Dict[str, Any]) -> List[str]:
+        return [_fill(parts, entities) for parts in self.tokens]
+
+    def __call__(self, entities: Dict[str, Any]) -> str:
+        return self.render(entities)
+
+    def __repr__(self):
+        return f"CommandTemplate({self.text!r})"
+
+
+@lru_cache(maxsize=None)
+def command_template(text: str) -> CommandTemplate:
+    """Shared parsed template for `text` (for plugins building templates at runtime)."""
+    return CommandTemplate(text)
@@ -1,21 +1,21 @@
-def parse_dynamodb_intent(intent: str, entities: dict) -> str:
-    """Generate AWS CLI for DynamoDB-related intents."""
-    table = entities.get("table") or entities.get("table_name", "MyTable")
-    region = entities.get("region", "us-east-1")
-
-    if "list" in intent:
-        return f"aws dynamodb list-tables --region {region}"
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate
+from aws_cli_assistant.core.intent_registry import get_intent
 
-    if "create" in intent:
-        return (
-            f"aws dynamodb create-table --table-name {table} "
-            "--attribute-definitions AttributeName=Id,AttributeType=S "
-            "--key-schema AttributeName=Id,KeyType=HASH "
-            "--provisioned-throughput ReadCapacityUnits=5,WriteCapacityUnits=5 "
-            f"--region {region}"
-        )
+# command builders, parsed once; see command_template
+list_tables = CommandTemplate("aws dynamodb list-tables --region {region}")
+create_table = CommandTemplate(
+    "aws dynamodb create-table --table-name {table} "
+    "--attribute-definitions AttributeName=Id,AttributeType=S "
+    "--key-schema AttributeName=Id,KeyType=HASH "
+    "--provisioned-throughput ReadCapacityUnits=5,WriteCapacityUnits=5 "
+    "--region {region}"
+)
+delete_table = CommandTemplate("aws dynamodb delete-table --table-name {table}")
 
-    if "delete" in intent:
-        return f"aws dynamodb delete-table --table-name {table}"
 
-    return "echo 'Unknown DynamoDB intent'"
+def parse_dynamodb_intent(intent: str, entities: dict) -> str:
+    """Generate AWS CLI for DynamoDB-related intents."""
+    spec = get_intent(intent)
+    if spec is None or spec.service != "dynamodb":
+        return "echo 'Unknown DynamoDB intent'"
+    return spec.build(spec.resolve(entities))
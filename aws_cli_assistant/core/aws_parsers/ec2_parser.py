@@ -1,18 +1,16 @@
-def parse_ec2_intent(intent: str, entities: dict) -> str:
-    """Generate AWS CLI for EC2-related intents."""
-    region = entities.get("region", "us-east-1")
-    instance_id = entities.get("instance_id", "i-1234567890abcdef")
-
-    if "list" in intent or "describe" in intent:
-        return f"aws ec2 describe-instances --region {region}"
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate
+from aws_cli_assistant.core.intent_registry import get_intent
 
-    if "start" in intent:
-        return f"aws ec2 start-instances --instance-ids {instance_id} --region {region}"
+# command builders, parsed once; see command_template
+describe_instances = CommandTemplate("aws ec2 describe-instances --region {region}")
+start_instances = CommandTemplate("aws ec2 start-instances --instance-ids {instance_id} --region {region}")
+stop_instances = CommandTemplate("aws ec2 stop-instances --instance-ids {instance_id} --region {region}")
+terminate_instances = CommandTemplate("aws ec2 terminate-instances --instance-ids {instance_id} --region {region}")
 
-    if "stop" in intent:
-        return f"aws ec2 stop-instances --instance-ids {instance_id} --region {region}"
 
-    if "terminate" in intent:
-        return f"aws ec2 terminate-instances --instance-ids {instance_id} --region {region}"
-
-    return "echo 'Unknown EC2 intent'"
+def parse_ec2_intent(intent: str, entities: dict) -> str:
+    """Generate AWS CLI for EC2-related intents."""
+    spec = get_intent(intent)
+    if spec is None or spec.service != "ec2":
+        return "echo 'Unknown EC2 intent'"
+    return spec.build(spec.resolve(entities))
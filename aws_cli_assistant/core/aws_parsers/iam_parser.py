@@ -1,14 +1,15 @@
-def parse_iam_intent(intent: str, entities: dict) -> str:
-    """Generate AWS CLI for IAM-related intents."""
-    user = entities.get("username") or entities.get("user_name", "TestUser")
-
-    if "list" in intent:
-        return "aws iam list-users"
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate
+from aws_cli_assistant.core.intent_registry import get_intent
 
-    if "create" in intent:
-        return f"aws iam create-user --user-name {user}"
+# command builders, parsed once; see command_template
+list_users = CommandTemplate("aws iam list-users")
+create_user = CommandTemplate("aws iam create-user --user-name {user_name}")
+delete_user = CommandTemplate("aws iam delete-user --user-name {user_name}")
 
-    if "delete" in intent:
-        return f"aws iam delete-user --user-name {user}"
 
-    return "echo 'Unknown IAM intent'"
+def parse_iam_intent(intent: str, entities: dict) -> str:
+    """Generate AWS CLI for IAM-related intents."""
+    spec = get_intent(intent)
+    if spec is None or spec.service != "iam":
+        return "echo 'Unknown IAM intent'"
+    return spec.build(spec.resolve(entities))
@@ -1,20 +1,20 @@
-def parse_lambda_intent(intent: str, entities: dict) -> str:
-    """Generate AWS CLI for Lambda-related intents."""
-    function = entities.get("function") or entities.get("function_name", "my-function")
-    region = entities.get("region", "us-east-1")
-
-    if "list" in intent:
-        return f"aws lambda list-functions --region {region}"
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate
+from aws_cli_assistant.core.intent_registry import get_intent
 
-    if "invoke" in intent:
-        return f"aws lambda invoke --function-name {function} response.json --region {region}"
+# command builders, parsed once; see command_template
+list_functions = CommandTemplate("aws lambda list-functions --region {region}")
+invoke_function = CommandTemplate("aws lambda invoke --function-name {function} response.json --region {region}")
+create_function = CommandTemplate(
+    "aws lambda create-function --function-name {function} "
+    "--runtime python3.9 --role arn:aws:iam::123456789012:role/lambda-role "
+    "--handler lambda_function.lambda_handler --zip-file fileb://function.zip "
+    "--region {region}"
+)
 
-    if "create" in intent:
-        return (
-            f"aws lambda create-function --function-name {function} "
-            "--runtime python3.9 --role arn:aws:iam::123456789012:role/lambda-role "
-            "--handler lambda_function.lambda_handler --zip-file fileb://function.zip "
-            f"--region {region}"
-        )
 
-    return "echo 'Unknown Lambda intent'"
+def parse_lambda_intent(intent: str, entities: dict) -> str:
+    """Generate AWS CLI for Lambda-related intents."""
+    spec = get_intent(intent)
+    if spec is None or spec.service != "lambda":
+        return "echo 'Unknown Lambda intent'"
+    return spec.build(spec.resolve(entities))
@@ -1,23 +1,17 @@
-def parse_s3_intent(intent: str, entities: dict) -> str:
-    """Generate AWS CLI for S3-related intents."""
-    region = entities.get("region", "us-east-1")
-    bucket = entities.get("bucket") or entities.get("bucket_name", "my-bucket")
-
-    if "create" in intent:
-        return f"aws s3api create-bucket --bucket {bucket} --region {region}"
-
-    if "delete" in intent:
-        return f"aws s3api delete-bucket --bucket {bucket}"
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate
+from aws_cli_assistant.core.intent_registry import get_intent
 
-    if "list" in intent:
-        return "aws s3api list-buckets"
+# command builders, parsed once; see command_template
+create_bucket = CommandTemplate("aws s3api create-bucket --bucket {bucket} --region {region}")
+delete_bucket = CommandTemplate("aws s3api delete-bucket --bucket {bucket}")
+list_buckets = CommandTemplate("aws s3api list-buckets")
+upload_file = CommandTemplate("aws s3 cp {file_name} s3://{bucket}/")
+download_file = CommandTemplate("aws s3 cp s3://{bucket}/{file_name} .")
 
-    if "upload" in intent:
-        file = entities.get("file_name", "file.txt")
-        return f"aws s3 cp {file} s3://{bucket}/"
 
-    if "download" in intent:
-        file = entities.get("file_name", "file.txt")
-        return f"aws s3 cp s3://{bucket}/{file} ."
-
-    return "echo 'Unknown S3 intent'"
+def parse_s3_intent(intent: str, entities: dict) -> str:
+    """Generate AWS CLI for S3-related intents."""
+    spec = get_intent(intent)
+    if spec is None or spec.service != "s3":
+        return "echo 'Unknown S3 intent'"
+    return spec.build(spec.resolve(entities))
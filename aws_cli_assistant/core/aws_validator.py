@@ -1,180 +1,268 @@
 # src/core/validator.py
-import boto3
-import botocore
+import hashlib
+import os
+import threading
+import time
 from loguru import logger
 # Use root-level package import when `src` is on PYTHONPATH
-from aws_cli_assistant.config.settings import DEFAULT_REGION
+from aws_cli_assistant.config.settings import AWS_CREDENTIAL_CHECK_S, AWS_MAX_POOL_CONNECTIONS, DEFAULT_REGION
+from aws_cli_assistant.core.intent_registry import get_intent
+from aws_cli_assistant.core.timing import record_aws_call, span
 
+# every API call a client makes is timed through botocore's event hooks
+def _call_started(context, **kwargs):
+    context["timing_start"] = time.perf_counter()
+
+def _call_finished(model, context, http_response=None, **kwargs):
+    start = context.pop("timing_start", None)
+    if start is not None:
+        status = getattr(http_response, "status_code", None)
+        record_aws_call(model.service_model.service_name, model.name, (time.perf_counter() - start) * 1000, status)
+
+def _instrument(client):
+    client.meta.events.register("before-call", _call_started)
+    client.meta.events.register("after-call", _call_finished)
+    client.meta.events.register("after-call-error", _call_finished)
+    return client
+
+# --- Client pool -------------------------------------------------------------
+# One session per profile and one client per (profile, service, region), made
+# on first use and shared by every thread (boto3 clients are thread-safe;
+# sessions are only touched under the lock). A client keeps its service model,
+# resolved credentials and open keep-alive connections, so only the first
+# validation against a service/region pays for them. The pool is dropped
+# whenever the credential environment changes or AWS rejects the credentials.
+
+_CREDENTIAL_ENV = ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN", "AWS_PROFILE",
+                   "AWS_SHARED_CREDENTIALS_FILE", "AWS_CONFIG_FILE", "AWS_ENDPOINT_URL")
+# error codes meaning the pooled credentials are no good any more
+_AUTH_ERRORS = {"ExpiredToken", "ExpiredTokenException", "InvalidClientTokenId", "UnrecognizedClientException",
+                "AuthFailure", "SignatureDoesNotMatch", "InvalidAccessKeyId", "RequestExpired"}
+
+_clients = {}
+_sessions = {}
+_clients_lock = threading.Lock()
+_fingerprint = None
+_checked_at = 0.0
+
+def _credential_fingerprint() -> str:
+    h = hashlib.sha1()
+    for name in _CREDENTIAL_ENV:
+        h.update(f"{name}={os.environ.get(name, '')}\0".encode())
+    for path in (os.environ.get("AWS_SHARED_CREDENTIALS_FILE") or "~/.aws/credentials",
+                 os.environ.get("AWS_CONFIG_FILE") or "~/.aws/config"):
+        try:
+            h.update(str(os.stat(os.path.expanduser(path)).st_mtime_ns).encode())
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()
+
+def _check_credentials():
+    # at most once per AWS_CREDENTIAL_CHECK_S: a few env reads and two stats
+    global _fingerprint, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < AWS_CREDENTIAL_CHECK_S:
+        return
+    _checked_at = now
+    fingerprint = _credential_fingerprint()
+    with _clients_lock:
+        # compared under the lock, so of the threads that notice a change only the first evicts
+        if fingerprint == _fingerprint:
+            return
+        if _fingerprint is not None:
+            logger.info("AWS credentials changed; dropping pooled clients")
+        _clients.clear()
+        _sessions.clear()
+        _fingerprint = fingerprint
+
+_ALL = object()
+
+def evict_clients(profile=_ALL) -> int:
+    """Drop pooled sessions and clients (of one profile, None being the default); returns how many clients.
+
+    Evicted clients are not closed: a call in flight on another thread finishes
+    on its own connection, which goes away with the client.
+    """
+    with _clients_lock:
+        keys = [k for k in _clients if profile is _ALL or k[0] == profile]
+        for key in keys:
+            del _clients[key]
+        if profile is _ALL:
+            _sessions.clear()
+        else:
+            _sessions.pop(profile, None)
+    return len(keys)
+
+def _client_config():
+    from botocore.config import Config
+    # validations from the fan-out and batch pools share a client, so it needs as many connections as they have threads
+    return Config(max_pool_connections=AWS_MAX_POOL_CONNECTIONS, tcp_keepalive=True)
+
+# boto3/botocore take ~200 ms to import; they load on the first validation
 def _session_client(service: str, region: str):
-    sess = boto3.Session()
-    return sess.client(service, region_name=region)
+    _check_credentials()
+    key = (os.environ.get("AWS_PROFILE") or None, service, region)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            session = _sessions.get(key[0])
+            if session is None:
+                session = _sessions[key[0]] = boto3.Session(profile_name=key[0])
+            client = _instrument(session.client(service, region_name=region, config=_client_config()))
+            _clients[key] = client
+    return client
 
 def validate_command_safe(intent: str, entities: dict) -> dict:
+    with span("validate", intent=intent) as s:
+        result = _validate_command_safe(intent, entities)
+        s.set(status=result.get("status"))
+    return result
+
+def _validate_command_safe(intent: str, entities: dict) -> dict:
+    import botocore.exceptions
     region = entities.get("region") or DEFAULT_REGION
     result = {"intent": intent, "region": region, "status": "unknown", "reason": None, "detail": {}}
 
-    try:
-        if intent == "create_s3_bucket":
-            s3 = _session_client("s3", region)
-            bucket = entities.get("bucket")
-            if not bucket:
-                result.update(status="unknown", reason="No bucket name provided.")
-                return result
-            try:
-                s3.head_bucket(Bucket=bucket)
-                result.update(status="invalid", reason=f"Bucket '{bucket}' already exists.")
-            except botocore.exceptions.ClientError as e:
-                err = e.response.get("Error", {}).get("Code", "")
-                if err in ("404", "NoSuchBucket", "NotFound"):
-                    result.update(status="valid", reason="Bucket name available.")
-                else:
-                    result.update(status="invalid", reason=f"{err}")
-            return result
-
-        if intent == "list_s3_buckets":
-            s3 = _session_client("s3", region)
-            buckets = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
-            result.update(status="valid", reason="Listed buckets", detail={"buckets": buckets})
-            return result
-            
-        if intent == "invoke_lambda":
-            lambda_client = _session_client("lambda", region)
-            function_name = entities.get("function_name")
-            if not function_name:
-                result.update(status="invalid", reason="No function name provided")
-                return result
-            try:
-                lambda_client.get_function(FunctionName=function_name)
-                result.update(status="valid", reason=f"Function '{function_name}' exists")
-            except botocore.exceptions.ClientError as e:
-                result.update(status="invalid", reason=f"Function '{function_name}' not found")
-            return result
-            
-        if intent == "create_iam_user":
-            iam = _session_client("iam", region)
-            username = entities.get("user_name")
-            if not username:
-                result.update(status="invalid", reason="No username provided")
-                return result
-            try:
-                iam.get_user(UserName=username)
-                result.update(status="invalid", reason=f"User '{username}' already exists")
-            except botocore.exceptions.ClientError as e:
-                if e.response["Error"]["Code"] == "NoSuchEntity":
-                    result.update(status="valid", reason=f"Username '{username}' is available")
-            return result
-
-        if intent in ("describe_ec2_instances", "list_ec2_instances"):
-            ec2 = _session_client("ec2", region)
-            reservations = ec2.describe_instances().get("Reservations", [])
-            instances = []
-            for r in reservations:
-                for inst in r.get("Instances", []):
-                    instances.append({
-                        "InstanceId": inst.get("InstanceId"),
-                        "State": inst.get("State", {}).get("Name"),
-                        "Tags": inst.get("Tags", [])
-                    })
-            result.update(status="valid", reason="Listed instances", detail={"instances": instances})
-            return result
-
-        if intent in ("create_dynamodb_table", "list_dynamodb_tables"):
-            dynamodb = _session_client("dynamodb", region)
-            if intent == "list_dynamodb_tables":
-                tables = dynamodb.list_tables().get("TableNames", [])
-                result.update(status="valid", reason="Listed tables", detail={"tables": tables})
-                return result
-            table = entities.get("table")
-            if not table:
-                result.update(status="unknown", reason="No table name provided.")
-                return result
-            tables = dynamodb.list_tables().get("TableNames", [])
-            if table in tables:
-                result.update(status="invalid", reason=f"Table '{table}' already exists.")
-            else:
-                result.update(status="valid", reason="Table name available.")
-            return result
-
-        if intent in ("start_ec2_instance", "stop_ec2_instance", "list_ec2_instances"):
-            ec2 = _session_client("ec2", region)
-            if intent == "list_ec2_instances":
-                # return basic instance id + state + tags
-                reservations = ec2.describe_instances().get("Reservations", [])
-                instances = []
-                for r in reservations:
-                    for inst in r.get("Instances", []):
-                        instances.append({
-                            "InstanceId": inst.get("InstanceId"),
-                            "State": inst.get("State", {}).get("Name"),
-                            "Tags": inst.get("Tags", [])
-                        })
-                result.update(status="valid", reason="Listed instances", detail={"instances": instances})
-                return result
-            iid = entities.get("instance_id")
-            if not iid:
-                result.update(status="unknown", reason="No instance id provided.")
-                return result
-            try:
-                resp = ec2.describe_instances(InstanceIds=[iid]).get("Reservations", [])
-                if resp:
-                    # get current state
-                    state = resp[0]["Instances"][0].get("State", {}).get("Name")
-                    result.update(status="valid", reason=f"Instance {iid} exists and is {state}", detail={"state": state})
-                else:
-                    result.update(status="invalid", reason=f"Instance {iid} not found.")
-            except botocore.exceptions.ClientError as e:
-                result.update(status="error", reason=str(e))
-            return result
-
-        if intent in ("create_iam_user", "list_iam_users"):
-            iam = _session_client("iam", region)
-            if intent == "list_iam_users":
-                users = iam.list_users().get("Users", [])
-                result.update(status="valid", reason="Listed users", detail={"users": [u["UserName"] for u in users]})
-                return result
-            user = entities.get("user")
-            if not user:
-                result.update(status="unknown", reason="No user provided.")
-                return result
-            try:
-                iam.get_user(UserName=user)
-                result.update(status="invalid", reason=f"User '{user}' already exists.")
-            except botocore.exceptions.ClientError as e:
-                code = e.response.get("Error", {}).get("Code", "")
-                if code in ("NoSuchEntity", "NoSuchEntityException"):
-                    result.update(status="valid", reason="User does not exist; name available.")
-                else:
-                    result.update(status="error", reason=str(e))
-            return result
-
-        if intent in ("invoke_lambda", "list_lambda_functions"):
-            lam = _session_client("lambda", region)
-            if intent == "list_lambda_functions":
-                funcs = lam.list_functions().get("Functions", [])
-                result.update(status="valid", reason="Listed functions", detail={"functions": [f["FunctionName"] for f in funcs]})
-                return result
-            fn = entities.get("function")
-            if not fn:
-                result.update(status="unknown", reason="No function name provided.")
-                return result
-            try:
-                lam.get_function(FunctionName=fn)
-                result.update(status="valid", reason=f"Function '{fn}' exists.")
-            except botocore.exceptions.ClientError as e:
-                code = e.response.get("Error", {}).get("Code", "")
-                if code in ("ResourceNotFoundException", "ResourceNotFound"):
-                    result.update(status="invalid", reason=f"Function '{fn}' not found.")
-                else:
-                    result.update(status="error", reason=str(e))
-            return result
-        # ... (as in phase-2.5 validator)
+    spec = get_intent(intent)
+    if spec is None or spec.validate is None:
         result.update(status="unsupported", reason="Validation not implemented for this intent")
         return result
-
+    try:
+        return spec.validate(spec.resolve(entities, defaults=False), result)
     except botocore.exceptions.NoCredentialsError:
         result.update(status="unknown", reason="AWS credentials not configured.")
         return result
     except Exception as e:
-        logger.exception("Validation error: %s", e)
+        if isinstance(e, botocore.exceptions.ClientError) and \
+                e.response.get("Error", {}).get("Code") in _AUTH_ERRORS:
+            evict_clients()          # rotated or expired credentials: the next validation starts afresh
+        logger.exception("Validation error: {}", e)
         result.update(status="error", reason=str(e))
         return result
+
+# --- Per-intent validators ---------------------------------------------------
+# Registered in builtin_intents. Each gets the intent's entities resolved to
+# their canonical names (no defaults) and fills in `result`.
+
+def _instances(ec2, **kwargs) -> list:
+    instances = []
+    for r in ec2.describe_instances(**kwargs).get("Reservations", []):
+        for inst in r.get("Instances", []):
+            instances.append({
+                "InstanceId": inst.get("InstanceId"),
+                "State": inst.get("State", {}).get("Name"),
+                "Tags": inst.get("Tags", [])
+            })
+    return instances
+
+def validate_create_s3_bucket(e: dict, result: dict) -> dict:
+    from botocore.exceptions import ClientError
+    bucket = e.get("bucket")
+    if not bucket:
+        result.update(status="unknown", reason="No bucket name provided.")
+        return result
+    s3 = _session_client("s3", result["region"])
+    try:
+        s3.head_bucket(Bucket=bucket)
+        result.update(status="invalid", reason=f"Bucket '{bucket}' already exists.")
+    except ClientError as err:
+        code = err.response.get("Error", {}).get("Code", "")
+        if code in ("404", "NoSuchBucket", "NotFound"):
+            result.update(status="valid", reason="Bucket name available.")
+        else:
+            result.update(status="invalid", reason=f"{code}")
+    return result
+
+def validate_list_s3_buckets(e: dict, result: dict) -> dict:
+    s3 = _session_client("s3", result["region"])
+    buckets = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
+    result.update(status="valid", reason="Listed buckets", detail={"buckets": buckets})
+    return result
+
+def validate_list_ec2_instances(e: dict, result: dict) -> dict:
+    ec2 = _session_client("ec2", result["region"])
+    result.update(status="valid", reason="Listed instances", detail={"instances": _instances(ec2)})
+    return result
+
+def validate_ec2_instance_state(e: dict, result: dict) -> dict:
+    from botocore.exceptions import ClientError
+    iid = e.get("instance_id")
+    if not iid:
+        result.update(status="unknown", reason="No instance id provided.")
+        return result
+    ec2 = _session_client("ec2", result["region"])
+    try:
+        resp = ec2.describe_instances(InstanceIds=[iid]).get("Reservations", [])
+        if resp:
+            # get current state
+            state = resp[0]["Instances"][0].get("State", {}).get("Name")
+            result.update(status="valid", reason=f"Instance {iid} exists and is {state}", detail={"state": state})
+        else:
+            result.update(status="invalid", reason=f"Instance {iid} not found.")
+    except ClientError as err:
+        result.update(status="error", reason=str(err))
+    return result
+
+def validate_list_dynamodb_tables(e: dict, result: dict) -> dict:
+    dynamodb = _session_client("dynamodb", result["region"])
+    tables = dynamodb.list_tables().get("TableNames", [])
+    result.update(status="valid", reason="Listed tables", detail={"tables": tables})
+    return result
+
+def validate_create_dynamodb_table(e: dict, result: dict) -> dict:
+    table = e.get("table")
+    if not table:
+        result.update(status="unknown", reason="No table name provided.")
+        return result
+    dynamodb = _session_client("dynamodb", result["region"])
+    tables = dynamodb.list_tables().get("TableNames", [])
+    if table in tables:
+        result.update(status="invalid", reason=f"Table '{table}' already exists.")
+    else:
+        result.update(status="valid", reason="Table name available.")
+    return result
+
+def validate_list_iam_users(e: dict, result: dict) -> dict:
+    iam = _session_client("iam", result["region"])
+    users = iam.list_users().get("Users", [])
+    result.update(status="valid", reason="Listed users", detail={"users": [u["UserName"] for u in users]})
+    return result
+
+def validate_create_iam_user(e: dict, result: dict) -> dict:
+    from botocore.exceptions import ClientError
+    username = e.get("user_name")
+    if not username:
+        result.update(status="invalid", reason="No username provided")
+        return result
+    iam = _session_client("iam", result["region"])
+    try:
+        iam.get_user(UserName=username)
+        result.update(status="invalid", reason=f"User '{username}' already exists")
+    except ClientError as err:
+        if err.response["Error"]["Code"] == "NoSuchEntity":
+            result.update(status="valid", reason=f"Username '{username}' is available")
+    return result
+
+def validate_list_lambda_functions(e: dict, result: dict) -> dict:
+    lam = _session_client("lambda", result["region"])
+    funcs = lam.list_functions().get("Functions", [])
+    result.update(status="valid", reason="Listed functions", detail={"functions": [f["FunctionName"] for f in funcs]})
+    return result
+
+def validate_invoke_lambda(e: dict, result: dict) -> dict:
+    from botocore.exceptions import ClientError
+    function_name = e.get("function")
+    if not function_name:
+        result.update(status="invalid", reason="No function name provided")
+        return result
+    lam = _session_client("lambda", result["region"])
+    try:
+        lam.get_function(FunctionName=function_name)
+        result.update(status="valid", reason=f"Function '{function_name}' exists")
+    except ClientError:
+        result.update(status="invalid", reason=f"Function '{function_name}' not found")
+    return result
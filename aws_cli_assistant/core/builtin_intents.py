@@ -0,0 +1,60 @@
+# src/core/builtin_intents.py
+"""Registry entries for the built-in services, in classifier label order.
+
+Intents with ``classify=False`` have a command builder but no rule keywords
+or training examples yet, so they are never offered as classifier labels;
+`generate_command` still handles them when called with that intent.
+"""
+from aws_cli_assistant.core import aws_validator as v
+from aws_cli_assistant.core.aws_parsers import dynamodb_parser, ec2_parser, iam_parser, lambda_parser, s3_parser
+from aws_cli_assistant.core.intent_registry import EntityField, IntentSpec, register_intent, register_service
+
+REGION = EntityField("region", "us-east-1")
+BUCKET = EntityField("bucket", "my-bucket", ("bucket_name",))
+FILE = EntityField("file_name", "file.txt")
+TABLE = EntityField("table", "MyTable", ("table_name",))
+INSTANCE_ID = EntityField("instance_id", "i-1234567890abcdef")
+USER = EntityField("user_name", "TestUser", ("user", "username"))
+FUNCTION = EntityField("function", "my-function", ("function_name",))
+
+for _service, _title in (("s3", "S3"), ("dynamodb", "DynamoDB"), ("ec2", "EC2"), ("iam", "IAM"), ("lambda", "Lambda")):
+    register_service(_service, _title)
+
+for _spec in (
+    IntentSpec("create_s3_bucket", "s3", "create-bucket", s3_parser.create_bucket, (BUCKET, REGION),
+               v.validate_create_s3_bucket),
+    IntentSpec("list_s3_buckets", "s3", "list-buckets", s3_parser.list_buckets, (REGION,),
+               v.validate_list_s3_buckets),
+    IntentSpec("create_dynamodb_table", "dynamodb", "create-table", dynamodb_parser.create_table, (TABLE, REGION),
+               v.validate_create_dynamodb_table),
+    IntentSpec("list_dynamodb_tables", "dynamodb", "list-tables", dynamodb_parser.list_tables, (REGION,),
+               v.validate_list_dynamodb_tables),
+    IntentSpec("start_ec2_instance", "ec2", "start-instances", ec2_parser.start_instances, (INSTANCE_ID, REGION),
+               v.validate_ec2_instance_state),
+    IntentSpec("stop_ec2_instance", "ec2", "stop-instances", ec2_parser.stop_instances, (INSTANCE_ID, REGION),
+               v.validate_ec2_instance_state),
+    IntentSpec("list_ec2_instances", "ec2", "describe-instances", ec2_parser.describe_instances, (REGION,),
+               v.validate_list_ec2_instances),
+    IntentSpec("describe_ec2_instances", "ec2", "describe-instances", ec2_parser.describe_instances, (REGION,),
+               v.validate_list_ec2_instances),
+    IntentSpec("create_iam_user", "iam", "create-user", iam_parser.create_user, (USER,),
+               v.validate_create_iam_user),
+    IntentSpec("list_iam_users", "iam", "list-users", iam_parser.list_users, (),
+               v.validate_list_iam_users),
+    IntentSpec("invoke_lambda", "lambda", "invoke", lambda_parser.invoke_function, (FUNCTION, REGION),
+               v.validate_invoke_lambda),
+    IntentSpec("list_lambda_functions", "lambda", "list-functions", lambda_parser.list_functions, (REGION,),
+               v.validate_list_lambda_functions),
+
+    IntentSpec("delete_s3_bucket", "s3", "delete-bucket", s3_parser.delete_bucket, (BUCKET,), classify=False),
+    IntentSpec("upload_s3_file", "s3", "cp", s3_parser.upload_file, (FILE, BUCKET), classify=False),
+    IntentSpec("download_s3_file", "s3", "cp", s3_parser.download_file, (FILE, BUCKET), classify=False),
+    IntentSpec("delete_dynamodb_table", "dynamodb", "delete-table", dynamodb_parser.delete_table, (TABLE,),
+               classify=False),
+    IntentSpec("terminate_ec2_instance", "ec2", "terminate-instances", ec2_parser.terminate_instances,
+               (INSTANCE_ID, REGION), classify=False),
+    IntentSpec("delete_iam_user", "iam", "delete-user", iam_parser.delete_user, (USER,), classify=False),
+    IntentSpec("create_lambda_function", "lambda", "create-function", lambda_parser.create_function,
+               (FUNCTION, REGION), classify=False),
+):
+    register_intent(_spec)
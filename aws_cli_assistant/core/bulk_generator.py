@@ -0,0 +1,138 @@
+# src/core/bulk_generator.py
+"""Streaming bulk generation: query lines in, one result dict per query out.
+
+    for result in generate_commands(read_queries("runbook.txt")):
+        ...
+
+Queries are pulled lazily from any iterable and classified in batches with
+`parse_nlp_batch` on one background thread, so batch k+1 is classified
+while batch k is generated and validated on a thread pool (validation is
+mostly waiting on AWS). At most `window` queries are in flight at a time and
+results are yielded as soon as they can be, so memory stays flat whatever
+the input size. `ordered=True` yields in input order (a slow validation holds
+back the ones after it); `ordered=False` yields as each query completes.
+
+`write_jsonl` drives it from a file or stdin to a JSONL file or stdout; it is
+what `mcp_server.py --mode batch` runs.
+"""
+import contextvars
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from loguru import logger
+
+from aws_cli_assistant.core.fanout import generate_and_validate
+from aws_cli_assistant.core.nlp_utils import ML_BATCH_SIZE, parse_nlp_batch
+from aws_cli_assistant.core.telemetry import telemetry_log_event
+from aws_cli_assistant.core.timing import span
+
+BULK_CONCURRENCY = 8
+
+
+def read_queries(path: str) -> Iterator[str]:
+    """Lines of `path` ('-' reads stdin), read lazily."""
+    if path == "-":
+        yield from sys.stdin
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def _batches(queries: Iterable[str], size: int) -> Iterator[List[Tuple[int, str]]]:
+    # (1-based line number, query); blank lines are skipped but still counted
+    numbered = ((n, q.strip()) for n, q in enumerate(queries, 1))
+    numbered = ((n, q) for n, q in numbered if q)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _classify(batch: List[Tuple[int, str]]):
+    return batch, parse_nlp_batch([q for _, q in batch])
+
+
+def _process(line: int, query: str, intent: str, entities: Dict, validate: bool) -> Dict:
+    result = {"line": line, "query": query, "intent": intent}
+    try:
+        result.update(generate_and_validate(intent, entities, query, validate))
+    except Exception as e:
+        # one bad query must not end a run over thousands
+        logger.exception("Bulk generation failed on line {}: {}", line, e)
+        result["error"] = str(e)
+    return result
+
+
+def generate_commands(queries: Iterable[str], batch_size: int = ML_BATCH_SIZE,
+                      concurrency: int = BULK_CONCURRENCY, ordered: bool = True, validate: bool = True,
+                      window: Optional[int] = None) -> Iterator[Dict]:
+    """Result dicts (line, query, intent, command, explanation, validation) for every non-blank query.
+
+    A query that raises gets an "error" key instead of stopping the stream.
+    Closing the iterator early cancels the queries not yet started.
+    """
+    window = window or max(2 * batch_size, 4 * concurrency)
+    batches = _batches(queries, batch_size)
+    nlp = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-nlp")
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bulk")
+    in_flight: "deque[Future]" = deque()
+    pending: set = set()
+
+    def submit_next() -> Optional[Future]:
+        batch = next(batches, None)
+        return nlp.submit(contextvars.copy_context().run, _classify, batch) if batch else None
+
+    def drain(limit: int) -> Iterator[Dict]:
+        # yield until no more than `limit` queries are in flight
+        nonlocal pending
+        if ordered:
+            while len(in_flight) > limit:
+                yield in_flight.popleft().result()
+            return
+        while len(pending) > limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    try:
+        classifying = submit_next()
+        while classifying is not None:
+            batch, parsed = classifying.result()
+            classifying = submit_next()          # classify the next batch while this one runs
+            for (line, query), (intent, entities) in zip(batch, parsed):
+                future = pool.submit(contextvars.copy_context().run, _process, line, query, intent, entities,
+                                     validate)
+                (in_flight.append if ordered else pending.add)(future)
+                yield from drain(window - 1)
+        yield from drain(0)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        nlp.shutdown(wait=True, cancel_futures=True)
+
+
+def write_jsonl(source: str = "-", dest: str = "-", *, batch_size: int = ML_BATCH_SIZE,
+                concurrency: int = BULK_CONCURRENCY, ordered: bool = True, validate: bool = True) -> Dict:
+    """Stream `generate_commands` over the lines of `source` into JSONL at `dest` ('-': stdin/stdout)."""
+    out: TextIO = sys.stdout if dest == "-" else open(dest, "w", encoding="utf-8")
+    counts = {"queries": 0, "errors": 0}
+    start = time.perf_counter()
+    try:
+        with span("bulk", ordered=ordered, concurrency=concurrency):
+            for result in generate_commands(read_queries(source), batch_size, concurrency, ordered, validate):
+                out.write(json.dumps(result, default=str) + "\n")
+                if out is sys.stdout:
+                    out.flush()
+                counts["queries"] += 1
+                counts["errors"] += "error" in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    counts["seconds"] = round(time.perf_counter() - start, 3)
+    telemetry_log_event("bulk.run", counts)
+    return counts
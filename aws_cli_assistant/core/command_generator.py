@@ -2,35 +2,50 @@
 # Use package-root imports (when `src` is on PYTHONPATH) — avoid importing `src.` prefix which breaks
 # when running files under `src/` directly.
 from loguru import logger
-from aws_cli_assistant.core.aws_parsers.s3_parser import parse_s3_intent
-from aws_cli_assistant.core.aws_parsers.ec2_parser import parse_ec2_intent
-from aws_cli_assistant.core.aws_parsers.lambda_parser import parse_lambda_intent
-from aws_cli_assistant.core.aws_parsers.dynamodb_parser import parse_dynamodb_intent
-from aws_cli_assistant.core.aws_parsers.iam_parser import parse_iam_intent
+from aws_cli_assistant.core import operation_index
+from aws_cli_assistant.core.intent_registry import get_intent, service_title, supported_services
+from aws_cli_assistant.core.timing import span
 
 def list_supported_services():
-    return ["s3", "ec2", "dynamodb", "iam", "lambda"]
+    return supported_services()
 
-def generate_command(intent: str, entities: dict):
+def generate_command(intent: str, entities: dict, query: str = None):
     """Generate AWS CLI commands based on intent and entities.
     
     Args:
         intent: The classified intent string
         entities: Dict of extracted entities
+        query: The original request; when the intent is unknown, it is looked up in
+            the AWS CLI operation index (see core/operation_index)
         
     Returns:
         tuple: (command_str, description_str)
     """
-    if intent.startswith("s3_") or intent == "list_s3_buckets":
-        return parse_s3_intent(intent, entities), f"S3 operation: {intent}"
-    elif intent.startswith("ec2_") or intent == "list_ec2_instances" or intent == "describe_ec2_instances":
-        return parse_ec2_intent(intent, entities), f"EC2 operation: {intent}"
-    elif intent.startswith("lambda_") or intent == "list_lambda_functions":
-        return parse_lambda_intent(intent, entities), f"Lambda operation: {intent}"
-    elif intent.startswith("dynamodb_") or intent == "list_dynamodb_tables":
-        return parse_dynamodb_intent(intent, entities), f"DynamoDB operation: {intent}"
-    elif intent.startswith("iam_") or intent == "list_iam_users" or intent == "list_iam_roles":
-        return parse_iam_intent(intent, entities), f"IAM operation: {intent}"
+    with span("generate", intent=intent):
+        return _generate_command(intent, entities, query)
 
-    logger.warning("Unsupported intent: %s", intent)
+def command_argv(intent: str, entities: dict):
+    """The command `generate_command` renders for this intent as an argv list, or None
+    when its builder is not a `CommandTemplate`."""
+    spec = get_intent(intent)
+    argv = getattr(spec.build, "argv", None) if spec is not None else None
+    return argv(spec.resolve(entities)) if argv is not None else None
+
+def _generate_command(intent: str, entities: dict, query: str = None):
+    # one dict lookup; services register their intents in intent_registry
+    spec = get_intent(intent)
+    if spec is not None:
+        return spec.build(spec.resolve(entities)), spec.description or f"{service_title(spec.service)} operation: {intent}"
+
+    # anything else botocore knows: "list_sns_topics", "sns.list-topics", or a query naming a service
+    # and every word of a non-destructive operation (see OperationIndex.search)
+    index = operation_index.get_index()
+    if index is not None:
+        op = index.resolve(intent) if intent != "unknown" else None
+        if op is None and query:
+            op = next(iter(index.search(query, limit=1)), None)
+        if op is not None:
+            return op.command(entities), f"{op.service} {op.operation} (from the AWS CLI operation index)"
+
+    logger.warning("Unsupported intent: {}", intent)
     return "echo 'Unknown service intent'", "Service not supported or intent unclear"
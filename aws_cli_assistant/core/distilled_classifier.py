@@ -0,0 +1,286 @@
+# src/core/distilled_classifier.py
+"""Tiny distilled intent classifier (`ML_BACKEND=distilled`).
+
+Hashed word uni/bigrams and character 3-5-grams feed a multinomial logistic
+regression trained in NumPy. Only the weight rows of features seen in
+training are stored (float16), so the model file stays in the KB range and a
+query costs one feature pass and a small gather/sum - tens of microseconds.
+
+Training data comes from query logs: telemetry (loguru-serialized
+`telemetry.log`) and `requests.jsonl`-style JSON lines with a `query` field,
+plus the bundled intent examples. Rows without a trusted label (an explicit
+`intent`, or one answered by Haiku/ML in telemetry) are labelled by
+`_rule_intent_and_entities`; rule-engine "unknown" rows are dropped, since
+those are exactly the queries that should reach the large model.
+
+At inference, answers below DISTILLED_CONF_THRESHOLD are deferred to the
+DISTILLED_FALLBACK backend, loaded only when first needed.
+
+Train with:
+    python -m aws_cli_assistant.core.distilled_classifier --train telemetry/telemetry.log requests.jsonl
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from aws_cli_assistant.config.settings import INTENT_EXAMPLES_PATH
+from aws_cli_assistant.core.semantic_cache import hashed_features
+
+DISTILLED_MODEL_PATH = os.getenv(
+    "DISTILLED_MODEL_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-cli-assistant", "distilled_intents.npz"),
+)
+DISTILLED_CONF_THRESHOLD = float(os.getenv("DISTILLED_CONF_THRESHOLD", "0.8"))
+DISTILLED_FALLBACK = os.getenv("DISTILLED_FALLBACK", "zero-shot").lower()  # any other ML_BACKEND, or "none"
+HASH_DIM = 1 << 20
+
+# stages whose telemetry label is better than what the rules would say
+_TRUSTED_STAGES = {"haiku", "ml"}
+
+
+# --- Dataset ---------------------------------------------------------------
+
+def _log_rows(path: str) -> Iterable[Tuple[str, Optional[str]]]:
+    """(query, trusted label or None) from a telemetry log or a JSON-lines query log."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(obj, dict):
+                continue
+            if "record" in obj:
+                # loguru serialize=True: telemetry payload is the repr() of a dict
+                try:
+                    payload = ast.literal_eval(obj["record"]["message"])
+                except (ValueError, SyntaxError, KeyError, TypeError):
+                    continue
+                details = payload.get("details", {}) if isinstance(payload, dict) else {}
+                if isinstance(details, dict) and isinstance(details.get("result_summary"), dict):
+                    # MCP response.emitted: intent and stage sit in the summary
+                    details = dict(details, **details["result_summary"])
+                query = details.get("query")
+                label = details.get("intent") if details.get("nlp_stage") in _TRUSTED_STAGES else None
+            else:
+                query, label = obj.get("query") or obj.get("text"), obj.get("intent")
+            if isinstance(query, str) and query.strip():
+                yield query.strip(), label
+
+
+def build_dataset(paths: Sequence[str], examples_path: Optional[str] = INTENT_EXAMPLES_PATH) -> List[Tuple[str, str]]:
+    from aws_cli_assistant.core.nlp_utils import INTENTS, _rule_intent_and_entities
+
+    rows: List[Tuple[str, Optional[str]]] = []
+    if examples_path:
+        with open(examples_path, encoding="utf-8") as f:
+            rows += [(t, intent) for intent, texts in json.load(f).items() for t in texts]
+    for path in paths:
+        rows += list(_log_rows(path))
+
+    seen, data = set(), []
+    for query, label in rows:
+        if label not in INTENTS:
+            label = _rule_intent_and_entities(query)[0]
+            if label == "unknown":
+                continue
+        key = (" ".join(query.lower().split()), label)
+        if key not in seen:
+            seen.add(key)
+            data.append((query, label))
+    return data
+
+
+# --- Model -----------------------------------------------------------------
+
+class DistilledModel:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(self, labels: List[str], rows: np.ndarray, weights: np.ndarray, bias: np.ndarray,
+                 dim: int = HASH_DIM, digest: str = ""):
+        self.labels = list(labels)
+        self.rows = rows.astype(np.int64)            # sorted hashed feature ids with a weight row
+        self.weights = weights.astype(np.float32)    # (len(rows), len(labels))
+        self.bias = bias.astype(np.float32)
+        self.dim = dim
+        self.digest = digest
+
+    def probabilities(self, text: str) -> np.ndarray:
+        idx, val = hashed_features(text, self.dim)
+        pos = np.searchsorted(self.rows, idx)
+        pos[pos == len(self.rows)] = 0
+        known = self.rows[pos] == idx if len(self.rows) else np.zeros(len(idx), bool)
+        logits = self.bias + val[known] @ self.weights[pos[known]]
+        logits -= logits.max()
+        p = np.exp(logits)
+        return p / p.sum()
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, labels=np.array(self.labels), rows=self.rows.astype(np.int32),
+                            weights=self.weights.astype(np.float16), bias=self.bias,
+                            dim=np.array(self.dim), digest=np.array(self.digest))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "DistilledModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(l) for l in data["labels"]], data["rows"], data["weights"], data["bias"],
+                       int(data["dim"]), str(data["digest"]))
+
+
+def train(data: Sequence[Tuple[str, str]], labels: Sequence[str], dim: int = HASH_DIM, epochs: int = 300,
+          lr: float = 0.5, l2: float = 1e-4, seed: int = 0) -> DistilledModel:
+    """Full-batch softmax regression (Adam) on the sparse feature matrix."""
+    label_ids = {l: i for i, l in enumerate(labels)}
+    pairs = [(hashed_features(text, dim), label_ids[l]) for text, l in data]
+    pairs = [(f, l) for f, l in pairs if len(f[0])]
+    feats = [f for f, _ in pairs]
+    y = np.array([l for _, l in pairs], dtype=np.intp)
+
+    # compact the hashed ids seen in training into 0..F-1, CSR layout
+    rows = np.unique(np.concatenate([idx for idx, _ in feats]))
+    cols = np.concatenate([np.searchsorted(rows, idx) for idx, _ in feats])
+    vals = np.concatenate([val for _, val in feats])
+    row_starts = np.cumsum([0] + [len(idx) for idx, _ in feats[:-1]])
+    # the same non-zeros ordered by feature, for the gradient's segment sums
+    by_col = np.argsort(cols, kind="stable")
+    col_ids, col_starts = np.unique(cols[by_col], return_index=True)
+    owner = np.repeat(np.arange(len(feats)), [len(idx) for idx, _ in feats])
+
+    rng = np.random.default_rng(seed)
+    n, k = len(feats), len(labels)
+    W = rng.normal(0, 0.01, (len(rows), k)).astype(np.float32)
+    b = np.zeros(k, np.float32)
+    onehot = np.eye(k, dtype=np.float32)[y]
+    m_w, v_w, m_b, v_b = np.zeros_like(W), np.zeros_like(W), np.zeros_like(b), np.zeros_like(b)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for t in range(1, epochs + 1):
+        logits = np.add.reduceat(vals[:, None] * W[cols], row_starts, axis=0) + b
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+        g = (p - onehot) / n
+        g_w = l2 * W
+        g_w[col_ids] += np.add.reduceat((vals[:, None] * g[owner])[by_col], col_starts, axis=0)
+        g_b = g.sum(axis=0)
+        for param, grad, m, v in ((W, g_w, m_w, v_w), (b, g_b, m_b, v_b)):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= lr * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+
+    digest = hashlib.sha1(json.dumps([list(labels), sorted(data)]).encode("utf-8")).hexdigest()[:12]
+    return DistilledModel(list(labels), rows, W, b, dim, digest)
+
+
+# --- Pipeline-compatible classifier ----------------------------------------
+
+class DistilledClassifier:
+    """Zero-shot-pipeline-shaped wrapper; low-confidence answers go to `fallback`."""
+
+    def __init__(self, model: DistilledModel, threshold: float = DISTILLED_CONF_THRESHOLD,
+                 fallback: Optional[Callable[[], Optional[Callable]]] = None):
+        self.model = model
+        self.threshold = threshold
+        self._fallback_loader = fallback
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+        self.deferred = 0
+
+    def _get_fallback(self):
+        if self._fallback is None and self._fallback_loader is not None:
+            with self._fallback_lock:
+                if self._fallback is None and self._fallback_loader is not None:
+                    self._fallback = self._fallback_loader()
+                    if self._fallback is None:
+                        # failed to load; answer from the small model from now on
+                        self._fallback_loader = None
+        return self._fallback
+
+    def _classify(self, text: str, candidate_labels) -> Dict:
+        probs = self.model.probabilities(text)
+        cols = [i for i, l in enumerate(self.model.labels) if not candidate_labels or l in candidate_labels]
+        if not cols:
+            # labels the model was never trained on (a plugin intent): no answer, so the fallback scores them
+            return {"labels": [], "scores": []}
+        row = probs[cols] / max(probs[cols].sum(), 1e-12)
+        order = np.argsort(-row, kind="stable")
+        return {"labels": [self.model.labels[cols[j]] for j in order], "scores": [float(row[j]) for j in order]}
+
+    def __call__(self, inputs, candidate_labels=None, multi_label=False, batch_size=None):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        results = [self._classify(t, candidate_labels) for t in texts]
+
+        unsure = [i for i, r in enumerate(results) if not r["scores"] or r["scores"][0] < self.threshold]
+        fallback = self._get_fallback() if unsure else None
+        if fallback is not None:
+            self.deferred += len(unsure)
+            answers = fallback([texts[i] for i in unsure], candidate_labels=candidate_labels,
+                               multi_label=multi_label, batch_size=batch_size)
+            if isinstance(answers, dict):
+                answers = [answers]
+            for i, res in zip(unsure, answers):
+                results[i] = res
+        return results[0] if single else results
+
+
+def load_distilled_classifier(path: str = DISTILLED_MODEL_PATH,
+                              fallback: Optional[Callable[[], Optional[Callable]]] = None) -> DistilledClassifier:
+    if not os.path.exists(path):
+        # first run: bootstrap from the bundled examples so the backend works out of the box
+        from aws_cli_assistant.core.nlp_utils import INTENTS
+        logger.info("No distilled model at {}; training one from the bundled intent examples", path)
+        train(build_dataset([]), INTENTS).save(path)
+    return DistilledClassifier(DistilledModel.load(path), fallback=fallback)
+
+
+def _accuracy(model: DistilledModel, data: Sequence[Tuple[str, str]]) -> float:
+    hits = sum(model.labels[int(np.argmax(model.probabilities(q)))] == l for q, l in data)
+    return hits / max(len(data), 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiny distilled intent classifier")
+    parser.add_argument("--train", nargs="*", metavar="LOG", help="telemetry / JSON-lines query logs to learn from")
+    parser.add_argument("--out", default=DISTILLED_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction held out to report accuracy")
+    args = parser.parse_args()
+    if args.train is None:
+        parser.print_help()
+        raise SystemExit(0)
+
+    from aws_cli_assistant.core.nlp_utils import INTENTS
+
+    data = build_dataset(args.train)
+    print(f"{len(data)} labelled queries, "
+          f"{len({l for _, l in data})} intents")
+    if args.holdout and len(data) >= 10:
+        shuffled = data[:]
+        random.Random(0).shuffle(shuffled)
+        cut = int(len(shuffled) * (1 - args.holdout))
+        probe = train(shuffled[:cut], INTENTS, epochs=args.epochs)
+        print(f"held-out accuracy: {_accuracy(probe, shuffled[cut:]):.1%} on {len(shuffled) - cut} queries")
+
+    model = train(data, INTENTS, epochs=args.epochs)
+    model.save(args.out)
+    start = time.perf_counter()
+    for q, _ in data:
+        model.probabilities(q)
+    per_query_us = (time.perf_counter() - start) / max(len(data), 1) * 1e6
+    print(f"training accuracy: {_accuracy(model, data):.1%}")
+    print(f"saved {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB), {per_query_us:.0f} us/query")
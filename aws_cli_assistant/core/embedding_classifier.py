@@ -0,0 +1,139 @@
+# src/core/embedding_classifier.py
+"""Embedding-similarity intent classifier (`ML_BACKEND=embedding`).
+
+Labelled example utterances for each intent are embedded once into a
+normalized float32 matrix and persisted to disk. A query then costs a single
+encoder pass plus one matrix-vector product, instead of one NLI forward pass
+per candidate label.
+
+The classifier is callable with the same signature as the transformers
+zero-shot pipeline and returns the same ``{"labels", "scores"}`` contract,
+so `nlp_utils` can use either interchangeably.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from aws_cli_assistant.config.settings import INTENT_EXAMPLES_PATH
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_INDEX_PATH = os.getenv(
+    "EMBEDDING_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-cli-assistant", "intent_index.npz"),
+)
+# softmax temperature applied to per-intent cosine similarities, so scores
+# behave like the zero-shot probabilities ML_CONF_THRESHOLD was tuned for
+EMBEDDING_TEMPERATURE = float(os.getenv("EMBEDDING_TEMPERATURE", "0.05"))
+
+
+class TransformerEncoder:
+    """Mean-pooled sentence embeddings from a Hugging Face encoder."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        import torch
+
+        from aws_cli_assistant.core.model_cache import load_model
+
+        self.name = model_name
+        self._torch = torch
+        self._model, self._tokenizer = load_model(model_name, kind="base")
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        out = []
+        with self._torch.inference_mode():
+            for start in range(0, len(texts), batch_size):
+                batch = self._tokenizer(list(texts[start:start + batch_size]), padding=True,
+                                        truncation=True, return_tensors="pt")
+                hidden = self._model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+                out.append(pooled.cpu().numpy())
+        return _normalize(np.concatenate(out).astype(np.float32))
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.maximum(norms, 1e-12)
+
+
+def load_examples(path: str = INTENT_EXAMPLES_PATH) -> Dict[str, List[str]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _digest(model_name: str, examples: Dict[str, List[str]]) -> str:
+    payload = json.dumps({"model": model_name, "examples": examples}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingClassifier:
+    def __init__(self, encoder, examples: Dict[str, List[str]], index_path: Optional[str] = EMBEDDING_INDEX_PATH,
+                 temperature: float = EMBEDDING_TEMPERATURE):
+        self.encoder = encoder
+        self.temperature = temperature
+        # examples are grouped by intent so per-intent maxima are one reduceat
+        self.intents = sorted(examples)
+        texts = [t for intent in self.intents for t in examples[intent]]
+        counts = [len(examples[intent]) for intent in self.intents]
+        self._offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+        self.matrix = self._load_or_build(texts, _digest(encoder.name, examples), index_path)
+
+    def _load_or_build(self, texts: List[str], digest: str, index_path: Optional[str]) -> np.ndarray:
+        if index_path and os.path.exists(index_path):
+            try:
+                with np.load(index_path, allow_pickle=False) as data:
+                    if str(data["digest"]) == digest:
+                        logger.info("Loaded intent embedding index from {}", index_path)
+                        return data["matrix"]
+                logger.info("Intent embedding index at {} is stale; rebuilding", index_path)
+            except Exception as e:
+                logger.warning("Could not read intent embedding index {}: {}", index_path, e)
+
+        matrix = self.encoder.encode(texts).astype(np.float32)
+        if index_path:
+            try:
+                os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+                tmp = index_path + ".tmp.npz"
+                np.savez(tmp, matrix=matrix, digest=np.array(digest))
+                os.replace(tmp, index_path)
+            except OSError as e:
+                logger.warning("Could not persist intent embedding index {}: {}", index_path, e)
+        return matrix
+
+    def _scores(self, vectors: np.ndarray) -> np.ndarray:
+        """(n_queries, n_intents) softmax over each intent's best example similarity."""
+        sims = vectors @ self.matrix.T
+        best = np.maximum.reduceat(sims, self._offsets, axis=1)
+        logits = best / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def __call__(self, inputs, candidate_labels=None, multi_label=False, batch_size=None):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        cols = [i for i, intent in enumerate(self.intents) if not candidate_labels or intent in candidate_labels]
+        if not cols:
+            # no examples for any candidate: an empty answer, which the cascade treats as unsure
+            results = [{"labels": [], "scores": []} for _ in texts]
+            return results[0] if single else results
+        vectors = self.encoder.encode(texts, batch_size=batch_size or 32)
+        probs = self._scores(vectors)[:, cols]
+        probs = probs / probs.sum(axis=1, keepdims=True)
+
+        results = []
+        for row in probs:
+            order = np.argsort(-row, kind="stable")
+            results.append({
+                "labels": [self.intents[cols[j]] for j in order],
+                "scores": [float(row[j]) for j in order],
+            })
+        return results[0] if single else results
+
+
+def load_embedding_classifier() -> EmbeddingClassifier:
+    return EmbeddingClassifier(TransformerEncoder(), load_examples())
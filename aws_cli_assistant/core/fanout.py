@@ -0,0 +1,114 @@
+# src/core/fanout.py
+"""Generate and validate a query, once per region when it names several.
+
+A query with a region set ("list ec2 instances in all us regions", see
+`regions.region_set`) gets one command per region. The validations run in
+parallel, at most FANOUT_CONCURRENCY at a time, and whatever has not
+answered FANOUT_DEADLINE_MS after the start is reported as a timeout instead
+of holding up the regions that did. Front ends call `generate_and_validate`
+for every query; without a region set it is the plain
+`generate_command` + `validate_command_safe` pair.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from aws_cli_assistant.config.settings import FANOUT_CONCURRENCY, FANOUT_DEADLINE_MS
+from aws_cli_assistant.core.aws_validator import validate_command_safe
+from aws_cli_assistant.core.command_generator import generate_command
+from aws_cli_assistant.core.intent_registry import get_intent
+from aws_cli_assistant.core.timing import span
+
+
+# CLI operation verbs that only read; anything else runs once, in the first region named
+_READ_VERBS = ("list", "describe", "get")
+
+
+def target_regions(intent: str, entities: Dict) -> Optional[List[str]]:
+    """The regions to fan out over, or None for a single command.
+
+    Only read intents whose command template takes a region fan out: a global
+    service (IAM, S3 list-buckets) would give identical copies, and a create
+    or start names one bucket or instance, which must not be repeated per region.
+    """
+    regions = entities.get("regions")
+    if not regions:
+        return None
+    spec = get_intent(intent)
+    if spec is None or "region" not in getattr(spec.build, "fields", ()):
+        return None
+    if spec.operation.split("-")[0] not in _READ_VERBS:
+        return None
+    return list(regions)
+
+
+def _timed_validate(intent: str, entities: Dict) -> Dict:
+    start = time.perf_counter()
+    validation = validate_command_safe(intent, entities)
+    return {"validation": validation, "ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+def _merge(intent: str, per_region: List[Dict]) -> Dict:
+    statuses = {r["region"]: r["validation"].get("status") for r in per_region}
+    distinct = set(statuses.values())
+    if len(distinct) == 1:
+        status = distinct.pop()
+    else:
+        status = "partial" if "valid" in distinct else "mixed"
+    valid = sum(s == "valid" for s in statuses.values())
+    others = ", ".join(f"{region}: {s}" for region, s in statuses.items() if s != "valid")
+    reason = f"Valid in {valid}/{len(statuses)} regions" + (f" ({others})" if others else "")
+    return {"intent": intent, "region": None, "status": status, "reason": reason, "detail": {"regions": statuses}}
+
+
+def fan_out(intent: str, entities: Dict, regions: List[str], query: Optional[str] = None,
+            validate: bool = True, concurrency: int = FANOUT_CONCURRENCY,
+            deadline_ms: float = FANOUT_DEADLINE_MS) -> Dict:
+    """One command per region, validated in parallel; see the module docstring."""
+    if not regions:
+        raise ValueError("fan_out needs at least one region")
+    with span("fanout", intent=intent, regions=len(regions)) as s:
+        per_region = []
+        for region in regions:
+            command, explanation = generate_command(intent, dict(entities, region=region), query)
+            per_region.append({"region": region, "command": command})
+        if validate:
+            pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(regions))),
+                                      thread_name_prefix="fanout")
+            try:
+                futures = [pool.submit(contextvars.copy_context().run, _timed_validate, intent,
+                                       dict(entities, region=r["region"])) for r in per_region]
+                wait(futures, timeout=deadline_ms / 1000)
+            finally:
+                # a region past the deadline keeps its thread until its call returns; nobody waits for it
+                pool.shutdown(wait=False, cancel_futures=True)
+            for r, future in zip(per_region, futures):
+                if future.done() and not future.cancelled():
+                    r.update(future.result())
+                else:
+                    r.update(validation={"intent": intent, "region": r["region"], "status": "timeout",
+                                         "reason": f"No answer within {deadline_ms:.0f} ms", "detail": {}}, ms=None)
+            s.set(timeouts=sum(r["validation"]["status"] == "timeout" for r in per_region))
+    result = {"command": "\n".join(r["command"] for r in per_region),
+              "explanation": f"{explanation} (in {len(regions)} regions)"}
+    if validate:
+        result["validation"] = _merge(intent, per_region)
+    result["regions"] = per_region
+    return result
+
+
+def generate_and_validate(intent: str, entities: Dict, query: Optional[str] = None, validate: bool = True) -> Dict:
+    """command / explanation / validation for a parsed query, plus "regions" when it fans out."""
+    regions = target_regions(intent, entities)
+    if regions and len(regions) > 1:
+        return fan_out(intent, entities, regions, query, validate)
+    if regions:
+        entities = dict(entities, region=regions[0])
+    elif entities.get("regions") and not entities.get("region"):
+        entities = dict(entities, region=entities["regions"][0])     # not fanned out: the first region named
+    command, explanation = generate_command(intent, entities, query)
+    result = {"command": command, "explanation": explanation}
+    if validate:
+        result["validation"] = validate_command_safe(intent, entities)
+    return result
@@ -0,0 +1,100 @@
+# src/core/haiku_client.py
+"""Async Haiku client for `NLP_MODE=haiku`.
+
+One shared httpx.AsyncClient per event loop, so calls reuse pooled
+keep-alive connections instead of parking a thread each. It talks to the same
+text completions endpoint (`POST /v1/complete`) as the synchronous SDK call
+in `nlp_utils._haiku_intent`, which also makes it easy to point at a local
+stub server through ANTHROPIC_BASE_URL.
+
+ - connect and read timeouts are configured separately
+ - transport errors and 408/409/429/5xx/529 are retried with full-jitter
+   exponential backoff
+ - concurrent calls with an identical prompt share one upstream request
+"""
+import asyncio
+import os
+import random
+from typing import Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+HAIKU_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+HAIKU_MODEL = os.getenv("HAIKU_MODEL", "claude-3-haiku")
+HAIKU_CONNECT_TIMEOUT = float(os.getenv("HAIKU_CONNECT_TIMEOUT", "2"))   # seconds
+HAIKU_READ_TIMEOUT = float(os.getenv("HAIKU_READ_TIMEOUT", "10"))        # seconds
+HAIKU_MAX_RETRIES = int(os.getenv("HAIKU_MAX_RETRIES", "2"))
+HAIKU_BACKOFF = float(os.getenv("HAIKU_BACKOFF", "0.25"))                # seconds, doubled per attempt
+HAIKU_MAX_CONNECTIONS = int(os.getenv("HAIKU_MAX_CONNECTIONS", "20"))
+HAIKU_KEEPALIVE = float(os.getenv("HAIKU_KEEPALIVE", "30"))              # idle seconds before a pooled connection closes
+
+API_VERSION = "2023-06-01"
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class AsyncHaikuClient:
+    def __init__(self, api_key: str, base_url: str = HAIKU_BASE_URL, model: str = HAIKU_MODEL,
+                 connect_timeout: float = HAIKU_CONNECT_TIMEOUT, read_timeout: float = HAIKU_READ_TIMEOUT,
+                 max_retries: int = HAIKU_MAX_RETRIES, backoff: float = HAIKU_BACKOFF,
+                 max_connections: int = HAIKU_MAX_CONNECTIONS, keepalive: float = HAIKU_KEEPALIVE):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"x-api-key": api_key, "anthropic-version": API_VERSION},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive),
+        )
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._stats = {"calls": 0, "upstream": 0, "coalesced": 0, "retries": 0}
+
+    async def complete(self, prompt: str, max_tokens: int = 32) -> str:
+        """Completion text for `prompt`; identical concurrent prompts share one request."""
+        self._stats["calls"] += 1
+        key = (prompt, max_tokens)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(prompt, max_tokens))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+        # shield: one caller giving up must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _request(self, prompt: str, max_tokens: int) -> str:
+        body = {"model": self.model, "prompt": prompt, "max_tokens_to_sample": max_tokens}
+        for attempt in range(self.max_retries + 1):
+            self._stats["upstream"] += 1
+            last = attempt == self.max_retries
+            try:
+                resp = await self._http.post("/v1/complete", json=body)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                logger.warning("Haiku request failed ({}); retrying", e.__class__.__name__)
+            else:
+                if resp.status_code not in RETRY_STATUS or last:
+                    resp.raise_for_status()
+                    return resp.json()["completion"]
+                logger.warning("Haiku returned HTTP {}; retrying", resp.status_code)
+            self._stats["retries"] += 1
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict:
+        return dict(self._stats, inflight=len(self._inflight))
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def load_async_haiku_client() -> Optional[AsyncHaikuClient]:
+    key = os.getenv("ANTHROPIC_API_KEY")
+    if not key:
+        logger.warning("Haiku enabled but ANTHROPIC_API_KEY not set")
+        return None
+    return AsyncHaikuClient(key, base_url=HAIKU_BASE_URL)
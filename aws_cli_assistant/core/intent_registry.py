@@ -0,0 +1,123 @@
+# src/core/intent_registry.py
+"""Central table of supported intents.
+
+Each intent maps to its service, AWS CLI operation, entity schema, command
+builder and (optionally) a live validator. `generate_command` and
+`validate_command_safe` resolve an intent with one dict lookup, and the
+classifier label set (`nlp_utils.INTENTS`) and every service listing are
+derived from here.
+
+The built-in services live in `builtin_intents`. Other services register as
+plugins: a module named in INTENT_PLUGINS (comma-separated) is imported once
+and calls `register_intent` for each of its intents. A plugin spec may carry
+rule keywords (`verbs`, `nouns`) so the rule engine recognizes it too.
+"""
+import importlib
+import os
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+INTENT_PLUGINS = [m.strip() for m in os.getenv("INTENT_PLUGINS", "").split(",") if m.strip()]
+
+
+class EntityField(NamedTuple):
+    name: str
+    default: Optional[str] = None           # used in the command when the query gave no value
+    aliases: Tuple[str, ...] = ()           # other keys the value may arrive under
+
+
+class IntentSpec(NamedTuple):
+    name: str
+    service: str
+    operation: str                          # AWS CLI operation, e.g. "describe-instances"
+    build: Callable[[Dict[str, Any]], str]  # resolved entities -> command
+    entities: Tuple[EntityField, ...] = ()
+    validate: Optional[Callable[[Dict[str, Any], Dict], Dict]] = None  # (resolved entities, result) -> result
+    description: str = ""
+    classify: bool = True                   # offered to the classifiers as a label
+    verbs: Tuple[str, ...] = ()             # rule keywords, for plugins
+    nouns: Tuple[str, ...] = ()
+
+    def resolve(self, entities: Dict[str, Any], defaults: bool = True) -> Dict[str, Any]:
+        """Schema entities under their canonical names; empty values fall back to the default."""
+        resolved = {}
+        for field in self.entities:
+            value = next((entities[k] for k in (field.name,) + field.aliases if entities.get(k)), None)
+            resolved[field.name] = value if value is not None or not defaults else field.default
+        return resolved
+
+
+_intents: Dict[str, IntentSpec] = {}
+_service_titles: Dict[str, str] = {}
+_listeners: List[Callable[[IntentSpec], None]] = []
+_lock = threading.RLock()
+_loaded = False
+_loading = False
+
+
+def _ensure_loaded():
+    global _loaded, _loading
+    if _loaded:
+        return
+    with _lock:
+        # _loading stops a plugin that queries the registry from re-entering
+        if _loaded or _loading:
+            return
+        _loading = True
+        try:
+            from aws_cli_assistant.core import builtin_intents  # noqa: F401  (registers on import)
+            for module in INTENT_PLUGINS:
+                importlib.import_module(module)
+        finally:
+            _loading = False
+        _loaded = True
+
+
+def register_service(name: str, title: str):
+    """Display name of a service ("DynamoDB"); defaults to the upper-cased name."""
+    _service_titles[name] = title
+
+
+def register_intent(spec: IntentSpec, replace: bool = False) -> IntentSpec:
+    with _lock:
+        if spec.name in _intents and not replace:
+            raise ValueError(f"intent {spec.name!r} is already registered")
+        if spec.name == "unknown":
+            raise ValueError("'unknown' is reserved for unclassified queries")
+        _intents[spec.name] = spec
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(spec)
+    return spec
+
+
+def on_register(listener: Callable[[IntentSpec], None]):
+    """Call `listener(spec)` for every intent registered from now on."""
+    with _lock:
+        _listeners.append(listener)
+
+
+def get_intent(name: str) -> Optional[IntentSpec]:
+    _ensure_loaded()
+    return _intents.get(name)
+
+
+def registered_intents(classify_only: bool = False) -> List[IntentSpec]:
+    """Every registered intent, in registration order."""
+    _ensure_loaded()
+    with _lock:
+        return [s for s in _intents.values() if s.classify or not classify_only]
+
+
+def intent_names() -> List[str]:
+    """Labels the classifiers choose from (without "unknown")."""
+    return [s.name for s in registered_intents(classify_only=True)]
+
+
+def supported_services() -> List[str]:
+    return list(dict.fromkeys(s.service for s in registered_intents()))
+
+
+def service_title(service: str) -> str:
+    _ensure_loaded()
+    return _service_titles.get(service, service.upper())
@@ -0,0 +1,195 @@
+# src/core/intent_store.py
+"""Persistent SQLite store of past classifications, so restarts start warm.
+
+Rows are ``normalized query -> (intent, entities, backend, score, hits)``,
+stamped with a version derived from the INTENTS set and the NLP config; rows
+from another version are ignored and removed by compaction.
+
+Writes never happen on the request path: `record` / `hit` only update an
+in-memory pending batch, and a daemon thread upserts it every
+`flush_interval` seconds (or once `batch_size` rows are pending). At startup
+`top` reads the N most frequently hit rows back for preloading.
+
+Compact with:
+    python -m aws_cli_assistant.core.intent_store --compact [--path FILE]
+"""
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+INTENT_STORE_MAX_ROWS = int(os.getenv("INTENT_STORE_MAX_ROWS", "100000"))
+INTENT_STORE_FLUSH_S = float(os.getenv("INTENT_STORE_FLUSH_S", "2.0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS intents (
+    query    TEXT NOT NULL,
+    version  TEXT NOT NULL,
+    intent   TEXT NOT NULL,
+    entities TEXT NOT NULL,
+    backend  TEXT NOT NULL,
+    score    REAL,
+    hits     INTEGER NOT NULL DEFAULT 1,
+    updated  REAL NOT NULL,
+    PRIMARY KEY (query, version)
+);
+CREATE INDEX IF NOT EXISTS intents_by_hits ON intents (version, hits DESC);
+"""
+
+_UPSERT = """
+INSERT INTO intents (query, version, intent, entities, backend, score, hits, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (query, version) DO UPDATE SET
+    intent = excluded.intent, entities = excluded.entities, backend = excluded.backend,
+    score = excluded.score, hits = hits + excluded.hits, updated = excluded.updated
+"""
+
+_BUMP = "UPDATE intents SET hits = hits + ?, updated = ? WHERE query = ? AND version = ?"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class IntentStore:
+    def __init__(self, path: str, version: str, max_rows: int = INTENT_STORE_MAX_ROWS,
+                 flush_interval: float = INTENT_STORE_FLUSH_S, batch_size: int = 256):
+        self.path = path
+        self.version = version
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = _connect(path)
+        self._db_lock = threading.Lock()
+        # query -> row to upsert; query -> extra hits on an already stored row
+        self._pending: Dict[str, Tuple] = {}
+        self._pending_hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flushes = 0
+        self._thread = threading.Thread(target=self._run, name="intent-store", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- request path: memory only ------------------------------------------
+    def record(self, query: str, intent: str, entities: Dict, backend: str, score: Optional[float] = None):
+        with self._lock:
+            self._pending[query] = (intent, json.dumps(entities, sort_keys=True), backend, score)
+            full = len(self._pending) + len(self._pending_hits) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def hit(self, query: str):
+        with self._lock:
+            self._pending_hits[query] = self._pending_hits.get(query, 0) + 1
+
+    # --- background ----------------------------------------------------------
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("Intent store flush failed: {}", e)
+
+    def flush(self) -> int:
+        """Write pending rows now; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            hits, self._pending_hits = self._pending_hits, {}
+        if not pending and not hits:
+            return 0
+        now = time.time()
+        rows = [(q, self.version, intent, entities, backend, score, 1 + hits.pop(q, 0), now)
+                for q, (intent, entities, backend, score) in pending.items()]
+        bumps = [(n, now, q, self.version) for q, n in hits.items()]
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(_UPSERT, rows)
+                self._conn.executemany(_BUMP, bumps)
+            self._flushes += 1
+            if self._flushes % 16 == 0:
+                self._enforce_cap()
+        return len(rows) + len(bumps)
+
+    def _enforce_cap(self):
+        # least-hit, then oldest, rows go first
+        self._conn.execute(
+            "DELETE FROM intents WHERE rowid IN (SELECT rowid FROM intents "
+            "ORDER BY (version = ?) ASC, hits ASC, updated ASC "
+            "LIMIT max(0, (SELECT count(*) FROM intents) - ?))",
+            (self.version, self.max_rows),
+        )
+
+    # --- startup / maintenance -------------------------------------------------
+    def top(self, n: int) -> List[Tuple[str, str, Dict, str, Optional[float]]]:
+        """The `n` most hit rows of this version as (query, intent, entities, backend, score)."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT query, intent, entities, backend, score FROM intents WHERE version = ? "
+                "ORDER BY hits DESC, updated DESC LIMIT ?", (self.version, n)).fetchall()
+        return [(q, intent, json.loads(entities), backend, score) for q, intent, entities, backend, score in rows]
+
+    def compact(self) -> Dict[str, int]:
+        """Drop rows of other versions, enforce the row cap and reclaim space."""
+        self.flush()
+        with self._db_lock:
+            before = self._conn.execute("SELECT count(*) FROM intents").fetchone()[0]
+            self._conn.execute("DELETE FROM intents WHERE version != ?", (self.version,))
+            self._enforce_cap()
+            after = self._conn.execute("SELECT count(*) FROM intents").fetchone()[0]
+            self._conn.execute("VACUUM")
+        return {"before": before, "after": after, "removed": before - after}
+
+    def stats(self) -> Dict:
+        with self._db_lock:
+            total, current = self._conn.execute(
+                "SELECT count(*), sum(version = ?) FROM intents", (self.version,)).fetchone()
+        with self._lock:
+            pending = len(self._pending) + len(self._pending_hits)
+        return {"path": self.path, "version": self.version, "rows": total, "current_rows": current or 0,
+                "pending": pending, "max_rows": self.max_rows}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._conn.close()
+
+
+if __name__ == "__main__":
+    from aws_cli_assistant.core import nlp_utils
+
+    parser = argparse.ArgumentParser(description="Persistent intent store maintenance")
+    parser.add_argument("--path", default=nlp_utils.INTENT_STORE_PATH or None)
+    parser.add_argument("--compact", action="store_true", help="drop stale-version rows, enforce the cap, VACUUM")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("no store configured; pass --path or set INTENT_STORE_PATH")
+    store = IntentStore(args.path, nlp_utils.intent_store_version())
+    if args.compact:
+        print(json.dumps(store.compact()))
+    if args.stats or not args.compact:
+        print(json.dumps(store.stats()))
+    store.close()
@@ -0,0 +1,94 @@
+# src/core/keyword_index.py
+"""Character-trigram index for typo-tolerant keyword matching.
+
+Every vocabulary word is split into boundary-padded trigrams ("^li", "lis",
+"ist", "st$") with a posting list per trigram. A misspelled token looks up
+its own trigrams, ranks the words sharing the most of them, and accepts the
+best one within a small Damerau (adjacent transposition) edit distance, so
+"tabels" -> "tables" and "dynamdb" -> "dynamodb" without scanning the whole
+vocabulary. Short transpositions can share no trigram at all ("lsit" vs
+"list"); only when the index finds nothing are the words with the same
+first letter and a similar length checked directly. Answers are memoized per token.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"^{word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int = 2) -> int:
+    """Optimal string alignment distance, giving up (returning limit + 1) once it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class TrigramIndex:
+    """Fuzzy lookup of single tokens against a fixed keyword vocabulary.
+
+    Tokens shorter than `min_length` are never corrected (too many short
+    English words sit one edit away from "run" or "add"); up to one edit is
+    allowed below 7 characters and two from there on.
+    """
+
+    def __init__(self, words: Iterable[str], min_length: int = 4, cache_size: int = 4096):
+        self.words = sorted(set(words))
+        self._vocab = set(self.words)
+        self.min_length = min_length
+        self._postings: Dict[str, List[int]] = {}
+        self._by_initial: Dict[str, List[int]] = {}
+        for i, word in enumerate(self.words):
+            self._by_initial.setdefault(word[0], []).append(i)
+            for gram in _trigrams(word):
+                self._postings.setdefault(gram, []).append(i)
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    def _max_edits(self, token: str) -> int:
+        return 1 if len(token) < 7 else 2
+
+    def _correct(self, token: str) -> Optional[str]:
+        """The vocabulary word `token` most likely misspells, or None."""
+        if token in self._vocab:
+            return token
+        if len(token) < self.min_length or not token.isalpha():
+            return None
+        shared: Dict[int, int] = {}
+        for gram in _trigrams(token):
+            for i in self._postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        limit = self._max_edits(token)
+        best = self._best(token, shared, limit)
+        if best is None:
+            nearby = {i: 0 for i in self._by_initial.get(token[0], ())
+                      if i not in shared and abs(len(self.words[i]) - len(token)) <= limit}
+            best = self._best(token, nearby, limit)
+        return best
+
+    def _best(self, token: str, shared: Dict[int, int], limit: int) -> Optional[str]:
+        best, best_key = None, None
+        for i, count in shared.items():
+            word = self.words[i]
+            dist = edit_distance(token, word, limit)
+            if dist > limit:
+                continue
+            # fewest edits, then most shared trigrams, then alphabetical for stability
+            key = (dist, -count, word)
+            if best_key is None or key < best_key:
+                best, best_key = word, key
+        return best
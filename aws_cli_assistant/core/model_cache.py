@@ -0,0 +1,217 @@
+# src/core/model_cache.py
+"""Local model directory with memory-mapped safetensors weights.
+
+Hugging Face models are saved once into MODEL_CACHE_DIR (one directory per
+model id, weights as safetensors). Later processes load from there with no
+network access, and with MODEL_MMAP the weight tensors are views over a
+copy-on-write mapping of the file instead of deserialized copies: the kernel
+page cache holds a single copy of the weights that every process on the host
+shares, and a second process's cold load is mostly page-table setup.
+
+With NLP_OFFLINE (or HF_HUB_OFFLINE) a model missing from the directory is
+an error instead of a download. Populate the directory ahead of time with:
+    python -m aws_cli_assistant.core.model_cache --export facebook/bart-large-mnli
+"""
+import argparse
+import contextlib
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+MODEL_CACHE_DIR = os.getenv(
+    "MODEL_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-cli-assistant", "models"),
+)
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() in ("1","true","yes")
+NLP_OFFLINE = any(os.getenv(var, "false").lower() in ("1","true","yes") for var in ("NLP_OFFLINE", "HF_HUB_OFFLINE"))
+
+_WEIGHTS = "model.safetensors"
+_WEIGHTS_INDEX = "model.safetensors.index.json"
+
+# safetensors dtype -> numpy dtype; BF16 has no numpy type and is reinterpreted in torch
+_DTYPES = {
+    "F64": np.float64, "F32": np.float32, "F16": np.float16, "BF16": np.uint16,
+    "I64": np.int64, "I32": np.int32, "I16": np.int16, "I8": np.int8, "U8": np.uint8, "BOOL": np.bool_,
+}
+
+
+class ModelNotCachedError(FileNotFoundError):
+    """Raised offline when a model has not been exported to MODEL_CACHE_DIR."""
+
+
+def local_model_dir(model_id: str, cache_dir: Optional[str] = None) -> str:
+    return os.path.join(cache_dir or MODEL_CACHE_DIR, model_id.replace("/", "--"))
+
+
+def is_cached(model_id: str, cache_dir: Optional[str] = None) -> bool:
+    path = local_model_dir(model_id, cache_dir)
+    return os.path.exists(os.path.join(path, "config.json")) and any(
+        os.path.exists(os.path.join(path, name)) for name in (_WEIGHTS, _WEIGHTS_INDEX))
+
+
+def _auto_class(kind: str):
+    from transformers import AutoModel, AutoModelForSequenceClassification
+    return {"sequence-classification": AutoModelForSequenceClassification, "base": AutoModel}[kind]
+
+
+def export_model(model_id: str, kind: str = "sequence-classification", cache_dir: Optional[str] = None) -> str:
+    """Download `model_id` and save it (safetensors + tokenizer) into the cache directory."""
+    from transformers import AutoTokenizer
+
+    if NLP_OFFLINE:
+        raise ModelNotCachedError(f"{model_id} is not in {local_model_dir(model_id, cache_dir)} and NLP_OFFLINE is set")
+    out_dir = local_model_dir(model_id, cache_dir)
+    tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+    _auto_class(kind).from_pretrained(model_id).save_pretrained(tmp_dir, safe_serialization=True)
+    # concurrent exporters race to the rename; the loser's copy is dropped
+    try:
+        os.rename(tmp_dir, out_dir)
+    except OSError:
+        import shutil
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info("Saved {} to {}", model_id, out_dir)
+    return out_dir
+
+
+def resolve_model(model_id: str, kind: str = "sequence-classification", cache_dir: Optional[str] = None) -> str:
+    """Local directory holding `model_id`, exporting it first when allowed."""
+    if not is_cached(model_id, cache_dir):
+        if NLP_OFFLINE:
+            raise ModelNotCachedError(
+                f"{model_id} is not in {local_model_dir(model_id, cache_dir)}; export it with "
+                f"`python -m aws_cli_assistant.core.model_cache --export {model_id}` or unset NLP_OFFLINE")
+        logger.info("{} not in the model cache; exporting", model_id)
+        return export_model(model_id, kind, cache_dir)
+    return local_model_dir(model_id, cache_dir)
+
+
+# --- safetensors without copies --------------------------------------------
+def read_header(path: str) -> Tuple[Dict, int]:
+    """(tensor table, offset of the data section) of a safetensors file."""
+    with open(path, "rb") as f:
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    header.pop("__metadata__", None)
+    return header, 8 + size
+
+
+def mmap_arrays(path: str) -> Dict[str, np.ndarray]:
+    """Every tensor of a safetensors file as a NumPy view over one mapping of it.
+
+    The mapping is private (copy-on-write), so the arrays are writable but
+    clean pages stay shared with every other process mapping the same file.
+    """
+    header, start = read_header(path)
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    arrays = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        dtype = np.dtype(_DTYPES[info["dtype"]])
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=(end - begin) // dtype.itemsize,
+                                     offset=start + begin).reshape(info["shape"])
+    return arrays
+
+
+def _weight_files(model_dir: str):
+    index = os.path.join(model_dir, _WEIGHTS_INDEX)
+    if os.path.exists(index):
+        with open(index, encoding="utf-8") as f:
+            return sorted({os.path.join(model_dir, name) for name in json.load(f)["weight_map"].values()})
+    return [os.path.join(model_dir, _WEIGHTS)]
+
+
+def mmap_state_dict(model_dir: str) -> Dict:
+    import torch
+
+    bf16 = set()
+    for path in _weight_files(model_dir):
+        header, _ = read_header(path)
+        bf16.update(name for name, info in header.items() if info["dtype"] == "BF16")
+    state = {}
+    for path in _weight_files(model_dir):
+        for name, array in mmap_arrays(path).items():
+            tensor = torch.from_numpy(array)
+            state[name] = tensor.view(torch.bfloat16) if name in bf16 else tensor
+    return state
+
+
+def _load_mmap(model_dir: str, kind: str):
+    from transformers import AutoConfig
+
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = contextlib.nullcontext
+    config = AutoConfig.from_pretrained(model_dir, local_files_only=True)
+    # parameters are allocated but never touched (so never resident) before
+    # load_state_dict(assign=True) swaps in the mapped tensors
+    with no_init_weights():
+        model = _auto_class(kind).from_config(config)
+    state = mmap_state_dict(model_dir)
+    missing, unexpected = model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+    # a key absent from the file is fine only when tie_weights() pointed it at a loaded tensor
+    params = dict(model.named_parameters(remove_duplicate=False))
+    loaded = {id(params[name]) for name in state if name in params}
+    untied = [name for name in missing if name not in params or id(params[name]) not in loaded]
+    if untied:
+        raise ValueError(f"weights missing from {model_dir}: {untied[:5]}")
+    if unexpected:
+        logger.debug("Ignoring unexpected weights in {}: {}", model_dir, unexpected[:5])
+    return model.eval()
+
+
+def load_model(model_id: str, kind: str = "sequence-classification", cache_dir: Optional[str] = None):
+    """(model, tokenizer) for `model_id` from the local cache, memory-mapped when MODEL_MMAP."""
+    from transformers import AutoTokenizer
+
+    model_dir = resolve_model(model_id, kind, cache_dir)
+    start = time.monotonic()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+    model = None
+    if MODEL_MMAP:
+        try:
+            model = _load_mmap(model_dir, kind)
+        except Exception as e:
+            logger.warning("Memory-mapped load of {} failed ({}); loading normally", model_dir, e)
+    if model is None:
+        model = _auto_class(kind).from_pretrained(model_dir, local_files_only=True).eval()
+    logger.info("Loaded {} from {} in {:.2f}s (mmap={})", model_id, model_dir, time.monotonic() - start, MODEL_MMAP)
+    return model, tokenizer
+
+
+def memory_usage() -> Optional[Dict[str, float]]:
+    """Resident memory of this process split into shared and private MB (Linux only)."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return None
+    return {
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local safetensors model cache")
+    parser.add_argument("--export", nargs="+", metavar="MODEL_ID", help="download and save models into the cache")
+    parser.add_argument("--kind", choices=["sequence-classification", "base"], default="sequence-classification")
+    parser.add_argument("--cache-dir", default=MODEL_CACHE_DIR)
+    args = parser.parse_args()
+    for model_id in args.export or []:
+        print(export_model(model_id, args.kind, args.cache_dir))
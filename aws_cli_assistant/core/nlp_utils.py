@@ -1,164 +1,1131 @@
 # src/core/nlp_utils.py
+import asyncio
+import contextvars
+import copy
+import hashlib
 import os
 import re
-from typing import Tuple, Dict
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from loguru import logger
+from aws_cli_assistant.core.intent_cache import IntentCache
+from aws_cli_assistant.core.intent_registry import get_intent, intent_names, on_register
+from aws_cli_assistant.core.regions import REGION_NAME, region_set
+from aws_cli_assistant.core.keyword_index import TrigramIndex, edit_distance
+from aws_cli_assistant.core.micro_batcher import MicroBatcher
+from aws_cli_assistant.core.timing import span
 
 ENABLE_ML = os.getenv("ENABLE_ML", "true").lower() in ("1","true","yes")
 NLP_MODE = os.getenv("NLP_MODE", "local").lower()  # local | haiku
 ML_CONF_THRESHOLD = float(os.getenv("ML_CONF_THRESHOLD", "0.7"))
+ML_BACKEND = os.getenv("ML_BACKEND", "zero-shot").lower()  # zero-shot | embedding | onnx | distilled
+ML_BATCH_SIZE = int(os.getenv("ML_BATCH_SIZE", "16"))
+ML_LABEL_PRUNING = os.getenv("ML_LABEL_PRUNING", "true").lower() in ("1","true","yes")
+RULE_FUZZY_KEYWORDS = os.getenv("RULE_FUZZY_KEYWORDS", "true").lower() in ("1","true","yes")
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "1024"))  # 0 disables
+INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "3600"))  # seconds; 0 = no expiry
+INTENT_STORE_PATH = os.getenv("INTENT_STORE_PATH", "")  # SQLite file surviving restarts; empty disables
+INTENT_STORE_PRELOAD = int(os.getenv("INTENT_STORE_PRELOAD", "1000"))  # most-hit rows loaded at startup
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "4096"))  # 0 disables
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))  # cosine similarity
+SEMANTIC_CACHE_DIM = 1024  # hashed n-gram vector size
+
+# concurrent single-query ML calls are queued and run as one batch
+ML_MICROBATCH = os.getenv("ML_MICROBATCH", "true").lower() in ("1","true","yes")
+ML_MICROBATCH_WAIT_MS = float(os.getenv("ML_MICROBATCH_WAIT_MS", "2"))
+ML_MICROBATCH_MAX = int(os.getenv("ML_MICROBATCH_MAX", str(ML_BATCH_SIZE)))
+HAIKU_BATCH_SIZE = int(os.getenv("HAIKU_BATCH_SIZE", "20"))  # queries per completion call; 1 = one call each
+NLP_STAGE_THREADS = int(os.getenv("NLP_STAGE_THREADS", "8"))
+NLP_WARMUP = os.getenv("NLP_WARMUP", "false").lower() in ("1","true","yes")
+NLP_LOAD_RETRY_S = float(os.getenv("NLP_LOAD_RETRY_S", "300"))  # wait before retrying a failed backend load
+
+# Load state per backend, reported by health checks. While a background
+# warm-up holds the load, or for NLP_LOAD_RETRY_S after a load failed,
+# requests are answered on the rules path instead of waiting for the model.
+_ml_status = {"state": "not_loaded", "load_seconds": None, "error": None}
+_haiku_status = {"state": "not_loaded", "load_seconds": None, "error": None}
+_ml_load_lock = threading.Lock()
+_haiku_load_lock = threading.Lock()
+_failed_at: Dict[str, float] = {}  # backend -> monotonic time its last load failed
+
+def _worth_loading(backend: str, status: Dict) -> bool:
+    if status["state"] == "loading":
+        return False
+    return status["state"] != "failed" or time.monotonic() - _failed_at.get(backend, 0.0) >= NLP_LOAD_RETRY_S
+
+def _load_finished(backend: str, status: Dict, loaded, start: float):
+    status.update(state="ready" if loaded else "failed", load_seconds=round(time.monotonic() - start, 3))
+    if not loaded:
+        _failed_at[backend] = time.monotonic()
 
 # lazy classifier for local zero-shot
 _classifier = None
-def _get_local_classifier():
-    global _classifier
-    if _classifier:
-        return _classifier
-    if not ENABLE_ML:
-        return None
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+
+def _build_local_classifier(backend: Optional[str] = None):
+    backend = backend or ML_BACKEND
+    if backend == "distilled":
+        # NumPy only; the large model is built lazily for low-confidence queries
+        from aws_cli_assistant.core.distilled_classifier import DISTILLED_FALLBACK, load_distilled_classifier
+        fallback = None
+        if DISTILLED_FALLBACK not in ("none", "distilled"):
+            fallback = lambda: _build_local_classifier(DISTILLED_FALLBACK)
+        return load_distilled_classifier(fallback=fallback)
+
+    if backend == "onnx":
+        # onnxruntime + tokenizer only; torch is needed just for the one-off export
+        from aws_cli_assistant.core.onnx_classifier import load_onnx_classifier
+        return load_onnx_classifier()
+
+    # Ensure PyTorch is available before using transformers' PyTorch-based pipelines.
     try:
-        # Ensure PyTorch is available before using transformers' PyTorch-based pipelines.
+        import torch  # noqa: F401
+    except Exception:
+        logger.warning("PyTorch not available; skipping local ML classifier")
+        return None
+
+    if backend == "embedding":
+        from aws_cli_assistant.core.embedding_classifier import load_embedding_classifier
+        return load_embedding_classifier()
+    from transformers import pipeline
+    from aws_cli_assistant.core.model_cache import load_model
+    # local safetensors copy, memory-mapped so forked and sibling processes share its pages
+    model, tokenizer = load_model(ZERO_SHOT_MODEL)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+def _load_local_classifier():
+    global _classifier
+    with _ml_load_lock:
+        if _classifier:
+            return _classifier
+        _ml_status.update(state="loading", error=None)
+        start = time.monotonic()
         try:
-            import torch  # noqa: F401
-        except Exception:
-            logger.warning("PyTorch not available; skipping local ML classifier")
+            _classifier = _build_local_classifier()
+            if _classifier:
+                logger.info("Local ML classifier initialized ({})", ML_BACKEND)
+        except Exception as e:
+            logger.exception("Failed to init local classifier: {}", e)
             _classifier = None
-            return _classifier
-
-        from transformers import pipeline
-        _classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-        logger.info("Local ML classifier initialized")
-    except Exception as e:
-        logger.exception("Failed to init local classifier: %s", e)
-        _classifier = None
+            _ml_status["error"] = str(e)
+        _load_finished("ml", _ml_status, _classifier, start)
     return _classifier
 
+def _ml_ready() -> bool:
+    """Whether the ML stage can answer: a loaded classifier, or a load worth trying now."""
+    return ENABLE_ML and (_classifier is not None or _worth_loading("ml", _ml_status))
+
+def _get_local_classifier():
+    if _classifier:
+        return _classifier
+    # someone else (usually the warm-up thread) may be loading; don't queue behind it
+    if not _ml_ready():
+        return None
+    return _load_local_classifier()
+
 # anthropic client (Haiku fallback)
 _haiku_client = None
-def _get_haiku_client():
+
+def _load_haiku_client():
     global _haiku_client
+    with _haiku_load_lock:
+        if _haiku_client:
+            return _haiku_client
+        _haiku_status.update(state="loading", error=None)
+        start = time.monotonic()
+        try:
+            from anthropic import Anthropic
+            key = os.getenv("ANTHROPIC_API_KEY")
+            if not key:
+                logger.warning("Haiku enabled but ANTHROPIC_API_KEY not set")
+                _haiku_status["error"] = "ANTHROPIC_API_KEY not set"
+            else:
+                _haiku_client = Anthropic(api_key=key)
+                logger.info("Anthropic Haiku client initialized")
+        except Exception as e:
+            logger.exception("Failed to init anthropic client: {}", e)
+            _haiku_client = None
+            _haiku_status["error"] = str(e)
+        _load_finished("haiku", _haiku_status, _haiku_client, start)
+    return _haiku_client
+
+def _haiku_ready() -> bool:
+    return NLP_MODE == "haiku" and (_haiku_client is not None or _async_haiku_client is not None
+                                    or _worth_loading("haiku", _haiku_status))
+
+def _get_haiku_client():
     if _haiku_client:
         return _haiku_client
-    if NLP_MODE != "haiku":
+    if NLP_MODE != "haiku" or not _worth_loading("haiku", _haiku_status):
         return None
-    try:
-        from anthropic import Anthropic
-        key = os.getenv("ANTHROPIC_API_KEY")
-        if not key:
-            logger.warning("Haiku enabled but ANTHROPIC_API_KEY not set")
-            return None
-        _haiku_client = Anthropic(api_key=key)
-        logger.info("Anthropic Haiku client initialized")
-    except Exception as e:
-        logger.exception("Failed to init anthropic client: %s", e)
-        _haiku_client = None
-    return _haiku_client
+    return _load_haiku_client()
+
+_warmup_thread: Optional[threading.Thread] = None
+
+def start_warmup(ml: bool = True, haiku: bool = True) -> Optional[threading.Thread]:
+    """Load the configured classifier / Haiku client in a daemon thread.
+
+    Idempotent: returns the running warm-up thread if there is one, or None
+    when there is nothing left to load.
+    """
+    global _warmup_thread
+    if _warmup_thread and _warmup_thread.is_alive():
+        return _warmup_thread
+
+    loaders = []
+    if ml and ENABLE_ML and not _classifier:
+        _ml_status["state"] = "loading"
+        loaders.append(_load_local_classifier)
+    if haiku and NLP_MODE == "haiku" and not _haiku_client:
+        _haiku_status["state"] = "loading"
+        loaders.append(_load_haiku_client)
+    if not loaders:
+        return None
+
+    def run():
+        for load in loaders:
+            load()
+
+    logger.info("Starting NLP model warm-up in background")
+    _warmup_thread = threading.Thread(target=run, name="nlp-warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+def model_status() -> Dict:
+    """Readiness of each NLP backend, the one currently answering queries and process memory."""
+    from aws_cli_assistant.core.model_cache import memory_usage
+    if NLP_MODE == "haiku" and _haiku_client:
+        active = "haiku"
+    elif ENABLE_ML and _classifier:
+        active = ML_BACKEND
+    else:
+        active = "rules"
+    return {
+        "mode": NLP_MODE,
+        "active_backend": active,
+        "ml": dict(_ml_status, enabled=ENABLE_ML, backend=ML_BACKEND,
+                   microbatch=_ml_batcher.stats() if ML_MICROBATCH else None),
+        "haiku": dict(_haiku_status, enabled=NLP_MODE == "haiku"),
+        "memory": memory_usage(),
+    }
+
+# classifier labels: every registered intent offered for classification, plus "unknown"
+INTENTS = intent_names() + ["unknown"]
+
+# --- Rule engine -----------------------------------------------------------
+# Rules are declared as data and compiled once at import. A single token scan
+# over the query finds the matching rule, then only that rule's entities are
+# extracted, instead of a cascade of backtracking `.*` regexes.
+
+_ENTITY_STOPWORDS = r"(?!(?:named|called|in)\b)"
 
-INTENTS = [
-    "create_s3_bucket", "list_s3_buckets",
-    "create_dynamodb_table", "list_dynamodb_tables",
-    "start_ec2_instance", "stop_ec2_instance", "list_ec2_instances", "describe_ec2_instances",
-    "create_iam_user", "list_iam_users",
-    "invoke_lambda", "list_lambda_functions",
-    "unknown"
-]
+def _named_pattern(noun: str, value: str) -> "re.Pattern":
+    """Match `<noun> named X`, `called X` or `<noun> X`, capturing X."""
+    return re.compile(
+        rf"(?:\b(?:named|called)\s+|\b(?:{noun})\s+{_ENTITY_STOPWORDS})({value})"
+    )
+
+_REGION_RE = re.compile(rf"(?:in\s+|region\s+)({REGION_NAME})\b")
+_TAG_RE = re.compile(r"tag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)")
+_BUCKET_RE = _named_pattern("bucket", r"[a-z0-9][a-z0-9\-\.]{2,62}")
+_TABLE_RE = _named_pattern("table", r"[A-Za-z0-9_\-]+")
+_USER_RE = _named_pattern("user", r"[A-Za-z0-9_\-]+")
+_FUNCTION_RE = _named_pattern("function", r"[A-Za-z0-9_\-]+")
+
+
+class _Rule(NamedTuple):
+    intent: str
+    verbs: Tuple[str, ...]
+    nouns: Tuple[str, ...]
+    entities: Tuple[str, ...]
+    needs_instance_id: bool = False
+
+
+# Order matters: the first matching rule wins, as in the original cascade.
+_RULES = (
+    _Rule("create_s3_bucket", ("create", "make"), ("s3", "bucket"), ("bucket", "region")),
+    _Rule("list_s3_buckets", ("list", "show"), ("s3", "buckets"), ("region",)),
+    _Rule("create_dynamodb_table", ("create", "make"), ("dynamo", "dynamodb", "table"), ("table", "region")),
+    _Rule("list_dynamodb_tables", ("list", "show"), ("dynamo", "tables"), ("region",)),
+    _Rule("start_ec2_instance", ("start", "run"), ("ec2", "instance"), ("instance_id", "region"), True),
+    _Rule("stop_ec2_instance", ("stop", "terminate"), ("ec2", "instance"), ("instance_id", "region"), True),
+    _Rule("describe_ec2_instances", ("list", "show", "describe"), ("ec2", "instances"), ("region", "tag")),
+    _Rule("create_iam_user", ("create", "add"), ("iam", "user"), ("user",)),
+    _Rule("list_iam_users", ("list", "show"), ("iam", "users"), ()),
+    _Rule("invoke_lambda", ("invoke", "call"), ("lambda",), ("function", "region")),
+    _Rule("list_lambda_functions", ("list", "show"), ("lambda", "functions"), ("region",)),
+)
+
+def _compile_rules(rules: Tuple[_Rule, ...]) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """keyword -> (bitmask of rules using it as a verb, bitmask of rules using it as a noun), and the
+    bitmask of rules that need an instance id."""
+    bits: Dict[str, Tuple[int, int]] = {}
+    for i, rule in enumerate(rules):
+        for w in rule.verbs:
+            v, n = bits.get(w, (0, 0))
+            bits[w] = (v | 1 << i, n)
+        for w in rule.nouns:
+            v, n = bits.get(w, (0, 0))
+            bits[w] = (v, n | 1 << i)
+    return bits, sum(1 << i for i, rule in enumerate(rules) if rule.needs_instance_id)
+
+_KEYWORD_BITS, _NEEDS_ID_MASK = _compile_rules(_RULES)
+
+# instance ids are tried first so `i-0abc` stays one token; everything else is a word
+_TOKEN_RE = re.compile(r"i-[0-9a-f]+\b|\w+")
+
+
+def _first_group(pattern: "re.Pattern", t: str) -> Optional[str]:
+    m = pattern.search(t)
+    if not m:
+        return None
+    return next((g for g in m.groups() if g), None)
+
+
+_ENTITY_RES = {
+    "region": _REGION_RE,
+    "bucket": _BUCKET_RE,
+    "table": _TABLE_RE,
+    "user": _USER_RE,
+    "function": _FUNCTION_RE,
+}
+
+def _extract(name: str, t: str, instance_id: Optional[str]):
+    if name == "instance_id":
+        return instance_id
+    if name == "tag":
+        m = _TAG_RE.search(t)
+        return {m.group(1): m.group(2)} if m else None
+    return _first_group(_ENTITY_RES[name], t)
+
+
+def _slip_of(tok: str, word: str) -> bool:
+    """Whether `tok` reads as a mistyped `word` rather than another English word.
+
+    Plenty of real words sit one edit from a keyword ("shop"/"show",
+    "last"/"list"); few are two swapped neighbouring letters away, and from
+    five letters on few differ by one edit that keeps the first letter.
+    """
+    if edit_distance(tok, word, 1) != 1:
+        return False
+    if len(tok) == len(word) and sorted(tok) == sorted(word):
+        return True             # a single edit with the same letters is an adjacent swap
+    return len(tok) >= 5 and tok[0] == word[0]
+
+def _fuzzy_keyword(tok: str, t: str) -> Optional[str]:
+    """The keyword a misspelled standalone token in `t` stands for, if any."""
+    if not RULE_FUZZY_KEYWORDS or len(tok) < 4:
+        return None
+    fixed = _keyword_index.correct(tok)
+    if fixed is None or fixed == tok or not _slip_of(tok, fixed):
+        return None
+    # parts of names ("my-lsit-bucket", "named tabels") are left alone
+    if re.search(rf"(?<![\w.-])(?<!named )(?<!called ){tok}(?![\w.-])", t):
+        return fixed
+    return None
 
 def _rule_intent_and_entities(text: str) -> Tuple[str, Dict]:
     t = text.lower()
-    r = re.search(r"(?:in\s+|region\s+)(us-[a-z0-9-]+)", t)
-    region = r.group(1) if r else None
-
-    # S3
-    if re.search(r"\b(create|make)\b.*\b(s3|bucket)\b", t):
-        m = re.search(r"(?:named|called|name(?:d)?|bucket\s+named|bucket\s+)([a-z0-9][a-z0-9\-\.]{2,62})", t)
-        bucket = m.group(1) if m else None
-        return "create_s3_bucket", {"bucket": bucket, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(s3|buckets)\b", t):
-        return "list_s3_buckets", {"region": region}
-
-    # DynamoDB
-    if re.search(r"\b(create|make)\b.*\b(dynamo|dynamodb|table)\b", t):
-        m = re.search(r"(?:table\s+named|table\s+)([A-Za-z0-9_\-]+)", t)
-        return "create_dynamodb_table", {"table": m.group(1) if m else None, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(dynamo|tables)\b", t):
-        return "list_dynamodb_tables", {"region": region}
-
-    # EC2
-    m_start = re.search(r"\b(start|run)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
-    if m_start:
-        return "start_ec2_instance", {"instance_id": m_start.group(3), "region": region}
-    m_stop = re.search(r"\b(stop|terminate)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
-    if m_stop:
-        return "stop_ec2_instance", {"instance_id": m_stop.group(3), "region": region}
-    if re.search(r"\b(list|show|describe)\b.*\b(ec2|instances)\b", t):
-        m_tag = re.search(r"tag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)", t)
-        tag = {m_tag.group(1): m_tag.group(2)} if m_tag else None
-        return "describe_ec2_instances", {"region": region, "tag": tag}
-
-    # IAM
-    if re.search(r"\b(create|add)\b.*\b(iam|user)\b", t):
-        m = re.search(r"(?:user\s+named|user\s+)([A-Za-z0-9_\-]+)", t)
-        return "create_iam_user", {"user": m.group(1) if m else None}
-    if re.search(r"\b(list|show)\b.*\b(iam|users)\b", t):
-        return "list_iam_users", {}
-
-    # Lambda
-    if re.search(r"\b(invoke|call)\b.*\b(lambda)\b", t):
-        m = re.search(r"(?:function\s+named|function\s+|named\s+)([A-Za-z0-9_\-]+)", t)
-        return "invoke_lambda", {"function": m.group(1) if m else None, "region": region}
-    if re.search(r"\b(list|show)\b.*\b(lambda|functions)\b", t):
-        return "list_lambda_functions", {"region": region}
-
-    return ("unknown", {})
-
-def _ml_intent(text: str):
+
+    # A rule matches when one of its verbs precedes one of its nouns (and, for
+    # start/stop, an instance id follows that noun). Track that with bitmasks
+    # over a single token scan.
+    seen_verbs = matched = with_id = 0
+    instance_id = None
+    corrections = None
+    for tok in _TOKEN_RE.findall(t):
+        if tok.startswith("i-"):
+            instance_id = tok
+            with_id |= matched
+            continue
+        bits = _KEYWORD_BITS.get(tok)
+        if bits is None:
+            fixed = _fuzzy_keyword(tok, t)
+            if fixed:
+                corrections = corrections or {}
+                corrections[tok] = fixed
+                bits = _KEYWORD_BITS.get(fixed)
+        if bits:
+            matched |= bits[1] & seen_verbs
+            seen_verbs |= bits[0]
+
+    hits = (matched & ~_NEEDS_ID_MASK) | (with_id & _NEEDS_ID_MASK)
+    if not hits:
+        return ("unknown", {})
+
+    # lowest bit = first rule in table order
+    rule = _RULES[(hits & -hits).bit_length() - 1]
+    if corrections:
+        # entity patterns key off the nouns too ("bucket foo"), so match on the corrected text
+        t = re.sub(r"(?<![\w.-])(?<!named )(?<!called )([a-z]+)(?![\w.-])",
+                   lambda m: corrections.get(m.group(1), m.group(1)), t)
+    entities = {name: _extract(name, t, instance_id) for name in rule.entities}
+    if "region" in rule.entities:
+        # "in all us regions", "in us-east-1 and eu-west-1": one command per region
+        regions = region_set(t)
+        if regions:
+            entities["regions"] = regions
+    return rule.intent, entities
+
+
+def _threshold(n_labels: int) -> float:
+    """ML_CONF_THRESHOLD for a softmax over `n_labels` instead of every INTENTS label.
+
+    Scores are normalised over the labels actually scored, so pruning to three
+    candidates inflates the top score. The threshold keeps the same margin over
+    a uniform guess: (p - 1/k) / (1 - 1/k) must reach what ML_CONF_THRESHOLD is
+    over 1/N for the full N labels. With every label scored it is unchanged.
+    """
+    n_full = max(len(INTENTS), n_labels)
+    if n_labels < 2 or n_labels >= n_full:
+        return ML_CONF_THRESHOLD
+    margin = (ML_CONF_THRESHOLD - 1 / n_full) / (1 - 1 / n_full)
+    return 1 / n_labels + margin * (1 - 1 / n_labels)
+
+# (label, score) of an answer; Haiku and the rules give no score
+Scored = Tuple[Optional[str], Optional[float]]
+
+def _scored_label(res) -> Scored:
+    # bart-large-mnli returns dict with labels + scores
+    labels = res.get("labels", [])
+    scores = res.get("scores", [])
+    if labels and scores and float(scores[0]) >= _threshold(len(labels)):
+        return labels[0], float(scores[0])
+    return None, None
+
+def _top_label(res) -> Optional[str]:
+    return _scored_label(res)[0]
+
+# --- Candidate-label pruning -------------------------------------------------
+# Cheap service/verb detection so the NLI model only scores plausible labels.
+# Intent names are `<verb>_<service>[_<noun>]`; anything unrecognised keeps
+# the full label set.
+
+_SERVICE_WORDS = {
+    "s3": "s3", "bucket": "s3", "buckets": "s3",
+    "dynamo": "dynamodb", "dynamodb": "dynamodb", "table": "dynamodb", "tables": "dynamodb",
+    "ec2": "ec2", "instance": "ec2", "instances": "ec2", "server": "ec2", "servers": "ec2",
+    "iam": "iam", "user": "iam", "users": "iam",
+    "lambda": "lambda", "lambdas": "lambda", "function": "lambda", "functions": "lambda",
+}
+_VERB_WORDS = {
+    "create": ("create",), "make": ("create",), "add": ("create",), "new": ("create",),
+    "list": ("list", "describe"), "show": ("list", "describe"), "describe": ("describe", "list"),
+    "start": ("start",), "boot": ("start",), "run": ("start", "invoke"),
+    "stop": ("stop",), "terminate": ("stop",), "shut": ("stop",),
+    "invoke": ("invoke",), "call": ("invoke",), "trigger": ("invoke",), "execute": ("invoke",),
+}
+
+# Typo tolerance: tokens that are not keywords are matched against the rule
+# and pruning keywords through a trigram index ("lsit dynamdb tabels"). Verbs
+# of write intents are left out, so a typo can make a query read-only or
+# unknown but never turn it into a create/start/stop/invoke.
+_READ_VERBS = ("list", "describe", "get")
+
+def _fuzzy_index() -> TrigramIndex:
+    write = {v for r in _RULES if r.intent.split("_", 1)[0] not in _READ_VERBS for v in r.verbs}
+    write.update(w for w, verbs in _VERB_WORDS.items() if not set(verbs) & set(_READ_VERBS))
+    return TrigramIndex(set(_KEYWORD_BITS).union(_SERVICE_WORDS, _VERB_WORDS) - write)
+
+_keyword_index = _fuzzy_index()
+
+def _add_plugin_intent(spec):
+    """Make an intent registered after import a classifier label and, given keywords, a rule."""
+    global _RULES, _KEYWORD_BITS, _NEEDS_ID_MASK, _keyword_index
+    if spec.classify and spec.name not in INTENTS:
+        INTENTS.insert(len(INTENTS) - 1 if INTENTS[-1:] == ["unknown"] else len(INTENTS), spec.name)
+    if spec.verbs and spec.nouns:
+        names = [f.name for f in spec.entities]
+        rule = _Rule(spec.name, tuple(spec.verbs), tuple(spec.nouns),
+                     tuple(n for n in names if n in _ENTITY_RES or n in ("instance_id", "tag")),
+                     "instance_id" in names)
+        _RULES = tuple(r for r in _RULES if r.intent != spec.name) + (rule,)
+        _KEYWORD_BITS, _NEEDS_ID_MASK = _compile_rules(_RULES)
+        for noun in spec.nouns:
+            _SERVICE_WORDS.setdefault(noun, spec.service)
+        _keyword_index = _fuzzy_index()
+
+on_register(_add_plugin_intent)
+
+def _services_and_verbs(text: str) -> Tuple[set, set]:
+    """Services and intent verbs (`create`, `list`, ...) the words of `text` point at."""
+    services, verbs = set(), set()
+    t = text.lower()
+    for tok in _TOKEN_RE.findall(t):
+        if tok not in _SERVICE_WORDS and tok not in _VERB_WORDS:
+            tok = _fuzzy_keyword(tok, t) or tok
+        if tok in _SERVICE_WORDS:
+            services.add(_SERVICE_WORDS[tok])
+        elif tok in _VERB_WORDS:
+            verbs.update(_VERB_WORDS[tok])
+    return services, verbs
+
+def _candidate_labels(text: str) -> List[str]:
+    """Subset of INTENTS worth scoring for `text`; the full list when unsure."""
+    if not ML_LABEL_PRUNING:
+        return INTENTS
+    services, verbs = _services_and_verbs(text)
+    if not services:
+        return INTENTS
+
+    labels = []
+    for intent in INTENTS:
+        spec = get_intent(intent)
+        if spec is None or spec.service not in services:
+            continue
+        if not verbs or intent.split("_")[0] in verbs:
+            labels.append(intent)
+    if not labels:
+        # a verb we know but no intent for it on that service: don't guess
+        return INTENTS
+    if "unknown" in INTENTS:
+        labels.append("unknown")
+    return labels
+
+_ml_batcher = MicroBatcher(lambda texts: _ml_intents(texts, ML_MICROBATCH_MAX), ML_MICROBATCH_MAX,
+                           ML_MICROBATCH_WAIT_MS, name="nlp-ml-batcher")
+
+def _ml_intent(text: str) -> Scored:
+    # batching pays off only against a loaded model; a first load runs inline
+    if ML_MICROBATCH and _classifier is not None:
+        return _ml_batcher.submit(text).result()
+    return _ml_intent_single(text)
+
+def _ml_intent_single(text: str) -> Scored:
     classifier = _get_local_classifier()
     if not classifier:
+        return None, None
+    try:
+        res = classifier(text, candidate_labels=_candidate_labels(text), multi_label=False)
+        return _scored_label(res)
+    except Exception as e:
+        logger.exception("ML classification failed: {}", e)
+    return None, None
+
+def _ml_intents(texts: List[str], batch_size: int) -> List[Scored]:
+    """Classify many texts with batched pipeline calls; (None, None) for any text below threshold."""
+    classifier = _get_local_classifier()
+    if not classifier or not texts:
+        return [(None, None)] * len(texts)
+
+    # the pipeline takes one label set per call, so batch texts that share one
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i, text in enumerate(texts):
+        groups.setdefault(tuple(_candidate_labels(text)), []).append(i)
+
+    labels: List[Scored] = [(None, None)] * len(texts)
+    for candidates, idxs in groups.items():
+        try:
+            results = classifier([texts[i] for i in idxs], candidate_labels=list(candidates),
+                                 multi_label=False, batch_size=batch_size)
+            if isinstance(results, dict):
+                results = [results]
+            for i, res in zip(idxs, results):
+                labels[i] = _scored_label(res)
+        except Exception as e:
+            logger.exception("Batched ML classification failed: {}", e)
+    return labels
+
+def _haiku_prompt(text: str) -> str:
+    return f"Extract intent from this user request. Return a single label from: {', '.join(INTENTS)}. Request: {text}\nLabel:"
+
+def _haiku_label(completion: str) -> Optional[str]:
+    words = completion.strip().split()
+    return words[0] if words and words[0] in INTENTS else None
+
+def _haiku_intent(text: str):
+    client = _get_haiku_client()
+    if not client:
         return None
     try:
-        res = classifier(text, candidate_labels=INTENTS, multi_label=False)
-        # bart-large-mnli returns dict with labels + scores
-        labels = res.get("labels", [])
-        scores = res.get("scores", [])
-        if labels and scores and float(scores[0]) >= ML_CONF_THRESHOLD:
-            return labels[0]
+        resp = client.completions.create(model="claude-3-haiku", prompt=_haiku_prompt(text), max_tokens_to_sample=32)
+        return _haiku_label(resp.completion)
     except Exception as e:
-        logger.exception("ML classification failed: %s", e)
+        logger.exception("Haiku classification failed: {}", e)
     return None
 
-def _haiku_intent(text: str):
+# Batch Haiku: N numbered queries in one prompt, one "<n>: <label>" line back per query
+_HAIKU_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[:.)]\s*(\S+)", re.M)
+
+def _haiku_batch_prompt(texts: List[str]) -> str:
+    lines = "\n".join(f"{n}. {' '.join(t.split())}" for n, t in enumerate(texts, 1))
+    return (f"Extract the intent of each numbered user request. Labels: {', '.join(INTENTS)}.\n"
+            f"Answer with one line per request in the form \"<number>: <label>\".\n{lines}\nAnswers:\n")
+
+def _haiku_batch_labels(completion: str, n: int) -> List[Optional[str]]:
+    labels: List[Optional[str]] = [None] * n
+    for num, word in _HAIKU_ANSWER_RE.findall(completion):
+        i = int(num) - 1
+        if 0 <= i < n and labels[i] is None:
+            labels[i] = _haiku_label(word.strip(".,;"))
+    return labels
+
+def _haiku_intents(texts: List[str], batch_size: Optional[int] = None) -> List[Optional[str]]:
+    """`_haiku_intent` for many queries with one completion call per `batch_size`.
+
+    Queries the batch answer leaves out or mislabels are retried one by one.
+    """
+    batch_size = batch_size or HAIKU_BATCH_SIZE
+    if batch_size <= 1:
+        return [_haiku_intent(t) for t in texts]
     client = _get_haiku_client()
+    if not client:
+        return [None] * len(texts)
+    labels: List[Optional[str]] = []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        try:
+            resp = client.completions.create(model="claude-3-haiku", prompt=_haiku_batch_prompt(chunk),
+                                             max_tokens_to_sample=16 * len(chunk))
+            got = _haiku_batch_labels(resp.completion, len(chunk))
+        except Exception as e:
+            logger.exception("Batched Haiku classification failed: {}", e)
+            got = [None] * len(chunk)
+        labels.extend(lbl if lbl else _haiku_intent(t) for t, lbl in zip(chunk, got))
+    return labels
+
+# async Haiku path: one pooled client per event loop (httpx connections are
+# loop-bound). Servers close it from their shutdown path (the HTTP lifespan,
+# the MCP stdio runner). For any other loop, each client comes with an async
+# generator that is started on that loop and suspended in `try`. asyncio.run()
+# and uvicorn call `loop.shutdown_asyncgens()` before closing a loop, which
+# finalizes the generator, so its `finally` closes the client while the loop
+# can still close the connections.
+_async_haiku_clients = weakref.WeakKeyDictionary()     # loop -> (client, its closer)
+_async_haiku_client = None                             # the latest one, for the readiness checks
+
+async def _close_at_shutdown(client):
+    try:
+        yield
+    finally:
+        # the generator refers back to its loop, so the weak key alone would never drop
+        _async_haiku_clients.pop(asyncio.get_running_loop(), None)
+        await client.aclose()
+
+async def _get_async_haiku_client():
+    global _async_haiku_client
+    if NLP_MODE != "haiku":
+        return None
+    loop = asyncio.get_running_loop()
+    entry = _async_haiku_clients.get(loop)
+    if entry is None:
+        from aws_cli_assistant.core.haiku_client import load_async_haiku_client
+        client = load_async_haiku_client()
+        closer = _close_at_shutdown(client) if client is not None else None
+        entry = _async_haiku_clients[loop] = (client, closer)
+        _async_haiku_client = client
+        if closer is not None:
+            await anext(closer)         # first iteration registers it with this loop
+    return entry[0]
+
+async def close_async_haiku_client():
+    """Close the running loop's Haiku client; servers call it on shutdown."""
+    global _async_haiku_client
+    client, closer = _async_haiku_clients.pop(asyncio.get_running_loop(), (None, None))
+    if closer is not None:
+        await closer.aclose()
+    if client is _async_haiku_client:
+        _async_haiku_client = None
+
+async def _haiku_intent_async(text: str):
+    client = await _get_async_haiku_client()
     if not client:
         return None
     try:
-        prompt = f"Extract intent from this user request. Return a single label from: {', '.join(INTENTS)}. Request: {text}\nLabel:"
-        resp = client.completions.create(model="claude-3-haiku", prompt=prompt, max_tokens_to_sample=32)
-        lbl = resp.completion.strip().split()[0]
-        if lbl in INTENTS:
-            return lbl
+        return _haiku_label(await client.complete(_haiku_prompt(text)))
     except Exception as e:
-        logger.exception("Haiku classification failed: %s", e)
+        logger.exception("Haiku classification failed: {}", e)
     return None
 
 def nlp_mode_summary():
-    return {"mode": NLP_MODE, "enable_ml": ENABLE_ML}
+    return {"mode": NLP_MODE, "enable_ml": ENABLE_ML, "ml_backend": ML_BACKEND}
 
-def parse_nlp(text: str) -> Tuple[str, Dict]:
-    text = text.strip()
-    # 1) If haiku selected, try it first
-    if NLP_MODE == "haiku":
+# --- Intent cache ----------------------------------------------------------
+_intent_cache = IntentCache(INTENT_CACHE_SIZE, INTENT_CACHE_TTL)
+_intents_version_memo: Tuple[Tuple[str, ...], str] = ((), "")
+
+def intents_version() -> str:
+    """Short stable digest of the current INTENTS list."""
+    global _intents_version_memo
+    current = tuple(INTENTS)
+    if current != _intents_version_memo[0]:
+        digest = hashlib.sha1("\n".join(current).encode("utf-8")).hexdigest()[:12]
+        _intents_version_memo = (current, digest)
+    return _intents_version_memo[1]
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def _config_key() -> Tuple:
+    # anything that can change the label for the same text
+    return (NLP_MODE, ENABLE_ML, ML_BACKEND, ML_LABEL_PRUNING, RULE_FUZZY_KEYWORDS, ML_CONF_THRESHOLD,
+            intents_version())
+
+def _cache_key(text: str) -> Tuple:
+    # backend readiness too, so rules-only answers given during warm-up aren't served once models load
+    ready = (_classifier is not None, _haiku_client is not None or _async_haiku_client is not None)
+    return (_normalize(text),) + _config_key() + (ready,)
+
+def intent_cache_stats() -> Dict:
+    return _intent_cache.stats()
+
+def clear_intent_cache() -> int:
+    """Invalidate every cached classification; returns the number of entries dropped."""
+    dropped = _intent_cache.invalidate()
+    with _semantic_lock:
+        if _semantic is not None:
+            _semantic[1].clear()
+    _preloaded.clear()
+    return dropped
+
+# --- Persistent intent store -----------------------------------------------
+# Optional (INTENT_STORE_PATH). Answers given once every configured backend is
+# loaded are written behind to SQLite; at startup the most-hit rows of the
+# current version are preloaded into memory and served ahead of the models,
+# even while they are still warming up. Disk is never touched per request.
+
+_store = None
+_store_lock = threading.Lock()
+_preloaded: Dict[str, Tuple[str, Dict]] = {}
+_store_version_memo: Tuple[Tuple, str] = ((), "")
+
+def _model_identity() -> str:
+    if not ENABLE_ML:
+        return ""
+    return {
+        "zero-shot": ZERO_SHOT_MODEL,
+        "embedding": os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+        "onnx": os.getenv("ONNX_SOURCE_MODEL", "facebook/bart-large-mnli") + ":int8",
+        "distilled": os.getenv("DISTILLED_MODEL_PATH", "distilled") + ":" + os.getenv("DISTILLED_FALLBACK", "zero-shot"),
+    }.get(ML_BACKEND, ML_BACKEND)
+
+def intent_store_version() -> str:
+    """Stamp of everything a stored answer depends on: INTENTS, NLP config and model."""
+    global _store_version_memo
+    parts = _config_key() + (_model_identity(),)
+    if parts != _store_version_memo[0]:
+        _store_version_memo = (parts, hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:12])
+    return _store_version_memo[1]
+
+def _get_intent_store():
+    global _store
+    if not INTENT_STORE_PATH:
+        return None
+    version = intent_store_version()
+    if _store is None or _store.version != version or _store.path != INTENT_STORE_PATH:
+        with _store_lock:
+            if _store is None or _store.version != version or _store.path != INTENT_STORE_PATH:
+                from aws_cli_assistant.core.intent_store import IntentStore
+                if _store is not None:
+                    _store.close()
+                _preloaded.clear()
+                try:
+                    store = IntentStore(INTENT_STORE_PATH, version)
+                    for query, intent, entities, _, _ in store.top(INTENT_STORE_PRELOAD):
+                        _preloaded[query] = (intent, entities)
+                except Exception as e:
+                    logger.exception("Could not open intent store {}: {}", INTENT_STORE_PATH, e)
+                    return None
+                logger.info("Intent store {}: preloaded {} entries", INTENT_STORE_PATH, len(_preloaded))
+                _store = store
+    return _store
+
+def _backends_ready() -> bool:
+    return ((not ENABLE_ML or _classifier is not None)
+            and (NLP_MODE != "haiku" or _haiku_client is not None or _async_haiku_client is not None))
+
+def _lookup(key: Tuple) -> Tuple[Optional[Tuple[str, Dict]], str]:
+    """Memory cache, then preloaded store rows: (answer or None, stage)."""
+    store = _get_intent_store()
+    cached = _intent_cache.get(key)
+    stage = "cache"
+    if cached is None and store is not None:
+        cached = _preloaded.get(key[0])
+        stage = "store"
+        if cached is not None:
+            _intent_cache.put(key, cached)
+    if cached is not None and store is not None:
+        store.hit(key[0])
+    return cached, stage
+
+def _remember(key: Tuple, intent: str, entities: Dict, stage: str, score: Optional[float] = None):
+    _intent_cache.put(key, (intent, entities))
+    store = _get_intent_store()
+    # answers given before every backend is up would pin rules-only labels on disk
+    if store is not None and stage in ("haiku", "ml", "rules") and _backends_ready():
+        store.record(key[0], intent, entities, stage, score)
+
+def intent_store_stats() -> Optional[Dict]:
+    store = _get_intent_store()
+    return dict(store.stats(), preloaded=len(_preloaded)) if store is not None else None
+
+def open_intent_store() -> Optional[Dict]:
+    """Open the store and preload its most-hit rows at server startup rather than on the first request.
+
+    Call it in the serving process (after any fork: the SQLite connection is
+    not fork-safe). Returns `intent_store_stats()`, None when disabled.
+    """
+    return intent_store_stats()
+
+# --- Semantic near-duplicate cache -----------------------------------------
+# Past model answers keyed by the vector of the query with its entity values
+# masked out. A new query whose vector is close enough to one of them reuses
+# that intent, provided the rule engine finds the same entity fields in it and
+# the intent is the rule engine's own or starts with a verb the query uses
+# (so "start instance X" never inherits "stop instance X", pruning or not).
+# It must also survive candidate-label pruning. Vectors come from
+# the embedding encoder when ML_BACKEND=embedding is loaded, otherwise from
+# hashed word/char n-grams, which catch reorderings, filler words and typos.
+
+_semantic = None  # (namespace, SemanticCache); rebuilt when anything in the cache key changes
+_semantic_lock = threading.Lock()
+
+def _entity_template(text: str, entities: Dict) -> str:
+    """`text` with extracted entity values replaced by their field names."""
+    out = text.lower()
+    for name, value in entities.items():
+        if isinstance(value, str) and value:
+            out = out.replace(value.lower(), f" {name} ")
+    return out
+
+_semantic_available = None  # numpy importable; without it there is no semantic cache
+
+def _semantic_enabled() -> bool:
+    global _semantic_available
+    if _semantic_available is None:
+        try:
+            import numpy  # noqa: F401
+            _semantic_available = True
+        except ImportError:
+            logger.warning("numpy not installed; semantic cache disabled")
+            _semantic_available = False
+    return _semantic_available and SEMANTIC_CACHE_SIZE > 0
+
+def _semantic_vector(text: str):
+    encoder = getattr(_classifier, "encoder", None) if ML_BACKEND == "embedding" else None
+    if encoder is not None:
+        return encoder.encode([text])[0].astype("float32")
+    from aws_cli_assistant.core.semantic_cache import hashed_vector
+    return hashed_vector(text, SEMANTIC_CACHE_DIM)
+
+def _semantic_cache(dim: int):
+    global _semantic
+    namespace = _cache_key("")[1:]
+    with _semantic_lock:
+        if _semantic is None or _semantic[0] != namespace or _semantic[1].dim != dim:
+            from aws_cli_assistant.core.semantic_cache import SemanticCache
+            _semantic = (namespace, SemanticCache(dim, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD))
+        return _semantic[1]
+
+def _semantic_get(text: str, rule_intent: str, entities: Dict):
+    """(cached intent or None, query vector for a later put)."""
+    if not text or not _semantic_enabled():
+        return None, None
+    vec = _semantic_vector(_entity_template(text, entities))
+    template = tuple(sorted(entities))
+    candidates = set(_candidate_labels(text))
+    verbs = _services_and_verbs(text)[1]
+
+    def accept(value):
+        intent, fields = value
+        return (fields == template and intent in candidates
+                and (intent == rule_intent or intent.split("_")[0] in verbs))
+
+    hit = _semantic_cache(len(vec)).get(vec, accept=accept)
+    return (hit[0][0] if hit else None), vec
+
+def _semantic_put(vec, intent: str, entities: Dict):
+    if vec is not None:
+        _semantic_cache(len(vec)).put(vec, (intent, tuple(sorted(entities))))
+
+def semantic_cache_stats() -> Dict:
+    with _semantic_lock:
+        cache = _semantic[1] if _semantic is not None else None
+    if cache is None:
+        if not _semantic_enabled():
+            return {"size": 0, "capacity": 0, "threshold": SEMANTIC_CACHE_THRESHOLD, "hits": 0, "misses": 0,
+                    "evictions": 0, "ann_lookups": 0, "hit_rate": 0.0}
+        from aws_cli_assistant.core.semantic_cache import SemanticCache
+        cache = SemanticCache(1, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD)
+    return cache.stats()
+
+# --- Deadline-aware cascade -------------------------------------------------
+# With a latency budget the rules answer immediately, Haiku and the local model
+# run concurrently (hedged) on a shared pool, and the best label available at
+# the deadline wins: haiku > ml > rules, as in the sequential cascade.
+
+class ParseResult(NamedTuple):
+    intent: str
+    entities: Dict
+    stage: str          # haiku | ml | rules | cache | store | semantic
+    elapsed_ms: float
+
+_stage_pool = ThreadPoolExecutor(max_workers=NLP_STAGE_THREADS, thread_name_prefix="nlp-stage")
+# EWMA of how long each model stage takes once its backend is loaded
+_stage_latency_ms: Dict[str, Optional[float]] = {"haiku": None, "ml": None}
+
+def _record_latency(stage: str, ms: float):
+    prev = _stage_latency_ms.get(stage)
+    _stage_latency_ms[stage] = ms if prev is None else 0.8 * prev + 0.2 * ms
+
+def _affordable(stage: str, remaining_ms: Optional[float]) -> bool:
+    est = _stage_latency_ms.get(stage)
+    if remaining_ms is None or est is None or est <= remaining_ms:
+        return True
+    # decay, so one slow spell doesn't rule the stage out forever
+    _stage_latency_ms[stage] = est * 0.9
+    return False
+
+def _haiku_stage(text: str) -> Scored:
+    loaded = _haiku_client is not None
+    start = time.monotonic()
+    with span("nlp.haiku"):
         lbl = _haiku_intent(text)
-        if lbl:
-            _, entities = _rule_intent_and_entities(text)
-            return lbl, entities
-
-    # 2) Local ml attempt
-    if ENABLE_ML:
-        lbl = _ml_intent(text)
-        if lbl:
-            _, entities = _rule_intent_and_entities(text)
-            return lbl, entities
-
-    # 3) fallback rules
-    intent, entities = _rule_intent_and_entities(text)
-    return intent, entities
+    if loaded:
+        _record_latency("haiku", (time.monotonic() - start) * 1000)
+    return lbl, None
+
+def _ml_stage(text: str) -> Scored:
+    # a first call may load the model; only time calls against a loaded one
+    loaded = _classifier is not None
+    start = time.monotonic()
+    with span("nlp.ml", backend=ML_BACKEND):
+        answer = _ml_intent(text)
+    if loaded:
+        _record_latency("ml", (time.monotonic() - start) * 1000)
+    return answer
+
+class _Cascade:
+    """The steps `_run_cascade` and `_run_cascade_async` share; only how they call and wait on
+    the Haiku/ML stages differs.
+
+    Rules run once up front (entities always come from them), then the
+    semantic cache; `hit` is set when it answered. `stages` are the model
+    stages to try in order, `affordable()` those worth launching before the
+    deadline, and `accept()` takes a stage's (label, score), if it has a
+    label. `outcome()` is (intent, entities, stage, score, complete);
+    complete is False if the budget cut a stage short.
+    """
+
+    def __init__(self, text: str, budget_ms: Optional[float], haiku, ml):
+        self.start = time.monotonic()
+        self.deadline = self.start + budget_ms / 1000 if budget_ms else None
+        with span("nlp.rules"):
+            self.rule_intent, self.entities = _rule_intent_and_entities(text)
+        self.result = (self.rule_intent, "rules", None)
+        self.complete = True
+        self.stages = []
+        if _haiku_ready():
+            self.stages.append(("haiku", haiku))
+        if _ml_ready():
+            self.stages.append(("ml", ml))
+        self.hit = self.vec = None
+        if self.stages:
+            with span("nlp.semantic"):
+                self.hit, self.vec = _semantic_get(text, self.rule_intent, self.entities)
+            if self.hit:
+                self.result = (self.hit, "semantic", None)
+
+    def remaining_s(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def affordable(self):
+        for name, run in self.stages:
+            if _affordable(name, self.remaining_s() * 1000):
+                yield name, run
+            else:
+                self.complete = False
+
+    def accept(self, name: str, answer: Scored) -> bool:
+        lbl, score = answer
+        if not lbl:
+            return False
+        self.result = (lbl, name, score)
+        _semantic_put(self.vec, lbl, self.entities)
+        return True
+
+    def failed(self, name: str, e: Exception):
+        logger.exception("NLP stage {} failed: {}", name, e)
+
+    def outcome(self) -> Tuple[str, Dict, str, Optional[float], bool]:
+        intent, stage, score = self.result
+        return intent, self.entities, stage, score, self.complete
+
+def _run_cascade(text: str, budget_ms: Optional[float]) -> Tuple[str, Dict, str, Optional[float], bool]:
+    """Returns (intent, entities, stage, score, complete); see `_Cascade`."""
+    c = _Cascade(text, budget_ms, _haiku_stage, _ml_stage)
+    if c.hit:
+        return c.outcome()
+    if c.deadline is None:
+        # no deadline: the original sequential cascade
+        for name, run in c.stages:
+            if c.accept(name, run(text)):
+                break
+        return c.outcome()
+
+    # copy the context so each stage's spans land in this request's trace
+    launched = [(name, _stage_pool.submit(contextvars.copy_context().run, run, text))
+                for name, run in c.affordable()]
+    for name, fut in launched:
+        try:
+            answer = fut.result(timeout=c.remaining_s())
+        except FuturesTimeout:
+            c.complete = False
+            continue
+        except Exception as e:
+            c.failed(name, e)
+            continue
+        if c.accept(name, answer):
+            break
+
+    for _, fut in launched:
+        fut.cancel()  # drops queued work; a running stage finishes in the background
+    return c.outcome()
+
+def parse_nlp_detailed(text: str, budget_ms: Optional[float] = None) -> ParseResult:
+    """`parse_nlp` plus the stage that answered and how long it took.
+
+    `budget_ms` bounds the wait for Haiku/ML; None or 0 waits for them.
+    """
+    start = time.monotonic()
+    text = text.strip()
+    with span("nlp") as s:
+        key = _cache_key(text)
+        cached, stage = _lookup(key)
+        if cached is not None:
+            intent, entities = cached
+        else:
+            intent, entities, stage, score, complete = _run_cascade(text, budget_ms)
+            # an answer cut short by the deadline shouldn't stick for the TTL
+            if complete:
+                _remember(key, intent, entities, stage, score)
+        s.set(backend=stage)
+    # callers own the entities dict they get back
+    return ParseResult(intent, copy.deepcopy(entities), stage, round((time.monotonic() - start) * 1000, 3))
+
+async def _haiku_stage_async(text: str) -> Scored:
+    loaded = _async_haiku_client is not None
+    start = time.monotonic()
+    with span("nlp.haiku"):
+        lbl = await _haiku_intent_async(text)
+    if loaded:
+        _record_latency("haiku", (time.monotonic() - start) * 1000)
+    return lbl, None
+
+async def _ml_stage_async(text: str) -> Scored:
+    return await asyncio.to_thread(_ml_stage, text)
+
+async def _run_cascade_async(text: str, budget_ms: Optional[float]) -> Tuple[str, Dict, str, Optional[float], bool]:
+    """`_run_cascade` on the event loop: Haiku is awaited, the local model runs in a thread."""
+    c = _Cascade(text, budget_ms, _haiku_stage_async, _ml_stage_async)
+    if c.hit:
+        return c.outcome()
+    if c.deadline is None:
+        for name, run in c.stages:
+            if c.accept(name, await run(text)):
+                break
+        return c.outcome()
+
+    launched = [(name, asyncio.ensure_future(run(text))) for name, run in c.affordable()]
+    for name, task in launched:
+        try:
+            answer = await asyncio.wait_for(asyncio.shield(task), timeout=c.remaining_s())
+        except asyncio.TimeoutError:
+            c.complete = False
+            continue
+        except Exception as e:
+            c.failed(name, e)
+            continue
+        if c.accept(name, answer):
+            break
+
+    for _, task in launched:
+        task.cancel()
+    return c.outcome()
+
+async def parse_nlp_detailed_async(text: str, budget_ms: Optional[float] = None) -> ParseResult:
+    """`parse_nlp_detailed` for async callers; Haiku calls don't hold a thread."""
+    start = time.monotonic()
+    text = text.strip()
+    with span("nlp") as s:
+        key = _cache_key(text)
+        cached, stage = _lookup(key)
+        if cached is not None:
+            intent, entities = cached
+        else:
+            intent, entities, stage, score, complete = await _run_cascade_async(text, budget_ms)
+            if complete:
+                _remember(key, intent, entities, stage, score)
+        s.set(backend=stage)
+    return ParseResult(intent, copy.deepcopy(entities), stage, round((time.monotonic() - start) * 1000, 3))
+
+def parse_nlp(text: str, budget_ms: Optional[float] = None) -> Tuple[str, Dict]:
+    result = parse_nlp_detailed(text, budget_ms)
+    return result.intent, result.entities
+
+def parse_nlp_batch(texts: Iterable[str], batch_size: int = ML_BATCH_SIZE) -> List[Tuple[str, Dict]]:
+    """Batched `parse_nlp`: same cascade and cache, results in input order.
+
+    Queries the model could not label confidently fall back to the rule
+    engine individually, exactly as `parse_nlp` would.
+    """
+    with span("nlp.batch") as s:
+        results, stages = _parse_nlp_batch([t.strip() for t in texts], batch_size)
+        s.set(size=len(results), backends=dict(Counter(stages)))
+    return results
+
+def _parse_nlp_batch(texts: List[str], batch_size: int) -> Tuple[List[Tuple[str, Dict]], List[str]]:
+    keys = [_cache_key(t) for t in texts]
+    looked_up = [_lookup(k) for k in keys]
+    results: List[Optional[Tuple[str, Dict]]] = [r for r, _ in looked_up]
+    misses = [i for i, r in enumerate(results) if r is None]
+
+    with span("nlp.rules", batch=len(misses)):
+        ruled = {i: _rule_intent_and_entities(texts[i]) for i in misses}
+    labels: Dict[int, Optional[str]] = dict.fromkeys(misses)
+    scores: Dict[int, Optional[float]] = dict.fromkeys(misses)
+    vectors: Dict[int, Optional[object]] = dict.fromkeys(misses)
+    haiku, ml = _haiku_ready(), _ml_ready()
+
+    # 0) near-duplicates of past model answers skip the models
+    if haiku or ml:
+        for i in misses:
+            if texts[i]:
+                labels[i], vectors[i] = _semantic_get(texts[i], *ruled[i])
+    answered = {i for i in misses if labels[i]}
+    stages = {i: stage for i, (r, stage) in enumerate(looked_up) if r is not None}
+    stages.update(dict.fromkeys(answered, "semantic"))
+
+    # 1) haiku: queries packed into shared completion calls
+    if haiku:
+        pending = [i for i in misses if labels[i] is None]
+        with span("nlp.haiku", batch=len(pending)):
+            labels.update(zip(pending, _haiku_intents([texts[i] for i in pending])))
+        stages.update((i, "haiku") for i in pending if labels[i])
+
+    # 2) everything still unlabelled goes through the local model in padded batches
+    if ml:
+        pending = [i for i in misses if labels[i] is None and texts[i]]
+        with span("nlp.ml", backend=ML_BACKEND, batch=len(pending)):
+            ml_labels = _ml_intents([texts[i] for i in pending], batch_size)
+        for i, (lbl, score) in zip(pending, ml_labels):
+            labels[i], scores[i] = lbl, score
+            if lbl:
+                stages[i] = "ml"
+
+    for i in misses:
+        if labels[i] and i not in answered:
+            _semantic_put(vectors[i], labels[i], ruled[i][1])
+
+    # 3) fallback rules per item
+    for i in misses:
+        intent, entities = ruled[i]
+        results[i] = (labels[i] or intent, entities)
+        stages.setdefault(i, "rules")
+        _remember(keys[i], *results[i], stages[i], scores[i])
+
+    return [(intent, copy.deepcopy(entities)) for intent, entities in results], [stages[i] for i in range(len(texts))]
@@ -0,0 +1,142 @@
+# src/core/onnx_classifier.py
+"""Zero-shot NLI classifier on ONNX Runtime with int8 dynamic quantization
+(`ML_BACKEND=onnx`).
+
+The NLI model is exported to ONNX once (this step needs torch), quantized
+with `onnxruntime.quantization.quantize_dynamic`, and stored in
+ONNX_MODEL_DIR together with its tokenizer and config. Later processes load
+only onnxruntime + the tokenizer, never torch.
+
+Scoring mirrors the transformers zero-shot pipeline with multi_label=False:
+one premise/hypothesis pair per candidate label, softmax over the
+entailment logits, and the same ``{"labels", "scores"}`` result.
+
+Export ahead of time with:
+    python -m aws_cli_assistant.core.onnx_classifier --export
+"""
+import argparse
+import json
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+ONNX_SOURCE_MODEL = os.getenv("ONNX_SOURCE_MODEL", "facebook/bart-large-mnli")
+ONNX_MODEL_DIR = os.getenv(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-cli-assistant", "onnx", "bart-large-mnli"),
+)
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = onnxruntime default
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+_MODEL_FILE = "model.int8.onnx"
+
+
+def export_quantized_model(source: str = ONNX_SOURCE_MODEL, out_dir: str = ONNX_MODEL_DIR) -> str:
+    """Export `source` to ONNX, quantize weights to int8 and save next to the tokenizer."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    from aws_cli_assistant.core.model_cache import load_model
+
+    os.makedirs(out_dir, exist_ok=True)
+    model, tokenizer = load_model(source)
+
+    sample = tokenizer(["premise"], ["hypothesis"], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.fp32.onnx")
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+        )
+
+    out_path = os.path.join(out_dir, _MODEL_FILE)
+    quantize_dynamic(fp32_path, out_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump({"label2id": {k.lower(): v for k, v in model.config.label2id.items()}}, f)
+    logger.info("Exported quantized ONNX model to {}", out_path)
+    return out_path
+
+
+class OnnxZeroShotClassifier:
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+                 session=None, tokenizer=None, entailment_id: Optional[int] = None):
+        if session is None:
+            import onnxruntime as ort
+
+            opts = ort.SessionOptions()
+            if intra_op_threads > 0:
+                opts.intra_op_num_threads = intra_op_threads
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(os.path.join(model_dir, _MODEL_FILE), opts,
+                                           providers=["CPUExecutionProvider"])
+        if tokenizer is None:
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        if entailment_id is None:
+            with open(os.path.join(model_dir, "labels.json"), encoding="utf-8") as f:
+                entailment_id = json.load(f)["label2id"]["entailment"]
+
+        self.session = session
+        self.tokenizer = tokenizer
+        self.entailment_id = entailment_id
+        self._input_names = {i.name for i in session.get_inputs()}
+
+    def _entailment_logits(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        enc = self.tokenizer(premises, hypotheses, padding=True, truncation="only_first", return_tensors="np")
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return logits[:, self.entailment_id]
+
+    def __call__(self, inputs, candidate_labels: Sequence[str], multi_label=False, batch_size=None):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        labels = list(candidate_labels)
+        hypotheses = [HYPOTHESIS_TEMPLATE.format(label) for label in labels]
+
+        # one session.run per chunk of whole texts, each with all its label pairs
+        per_run = max(1, (batch_size or 1))
+        results = []
+        for start in range(0, len(texts), per_run):
+            chunk = texts[start:start + per_run]
+            premises = [t for t in chunk for _ in labels]
+            logits = self._entailment_logits(premises, hypotheses * len(chunk)).reshape(len(chunk), len(labels))
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            for row in probs:
+                order = np.argsort(-row, kind="stable")
+                results.append({"labels": [labels[j] for j in order], "scores": [float(row[j]) for j in order]})
+        return results[0] if single else results
+
+
+def load_onnx_classifier() -> OnnxZeroShotClassifier:
+    if not os.path.exists(os.path.join(ONNX_MODEL_DIR, _MODEL_FILE)):
+        logger.info("No quantized ONNX model in {}; exporting from {}", ONNX_MODEL_DIR, ONNX_SOURCE_MODEL)
+        export_quantized_model()
+    return OnnxZeroShotClassifier()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantized ONNX zero-shot backend")
+    parser.add_argument("--export", action="store_true", help="export + quantize the model into ONNX_MODEL_DIR")
+    parser.add_argument("--source", default=ONNX_SOURCE_MODEL)
+    parser.add_argument("--out-dir", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+    if args.export:
+        print(export_quantized_model(args.source, args.out_dir))
+    else:
+        parser.print_help()
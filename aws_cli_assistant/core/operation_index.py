@@ -0,0 +1,286 @@
+# src/core/operation_index.py
+"""Compact SQLite index of every AWS CLI operation, built from botocore's models.
+
+botocore ships a JSON service model per service (hundreds of files, seconds
+to parse). The build step reads them once and keeps only what command
+generation needs: the CLI service and operation names, the required
+parameters and a keyword table for lookup by words. At runtime the index is
+opened read-only; opening it and answering a lookup takes milliseconds and
+never touches the JSON models.
+
+Build (or rebuild after upgrading botocore) with:
+    python -m aws_cli_assistant.core.operation_index --build [--path FILE]
+
+`generate_command` falls back to the index for intents the registry does not
+know, so "list_sns_topics" or "sns.list-topics" resolve to
+`aws sns list-topics`. A missing index just disables the fallback.
+Free-text search is deliberately narrow: the query has to name an indexed
+service and mention every word of the operation name, and it never returns a
+delete/terminate/remove-style operation, so anything else still gets the
+"unknown" answer.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+OPERATION_INDEX_PATH = os.getenv(
+    "OPERATION_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-cli-assistant", "operations.sqlite"),
+)
+
+# botocore model name -> AWS CLI command, where the CLI renames the service
+_CLI_SERVICE_NAMES = {"s3": "s3api", "config": "configservice", "codedeploy": "deploy"}
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE operations (
+    id          INTEGER PRIMARY KEY,
+    service     TEXT NOT NULL,      -- CLI service ("s3api")
+    operation   TEXT NOT NULL,      -- CLI operation ("create-bucket")
+    api_name    TEXT NOT NULL,      -- API operation ("CreateBucket")
+    required    TEXT NOT NULL,      -- required parameters as CLI options, space-separated ("bucket")
+    n_words     INTEGER NOT NULL,   -- keywords in the operation name
+    UNIQUE (service, operation)
+);
+CREATE INDEX operations_by_api_name ON operations (service, api_name);
+CREATE TABLE keywords (
+    word    TEXT NOT NULL,
+    op      INTEGER NOT NULL,
+    op_word INTEGER NOT NULL,       -- 1: from the operation name, 0: from the service name
+    PRIMARY KEY (word, op)
+) WITHOUT ROWID;
+"""
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SYNONYMS = {"show": "list", "display": "list", "remove": "delete", "make": "create"}
+# in nearly every service's full name, so they carry no signal
+_NOISE = frozenset({"aws", "amazon", "service", "for"})
+# English filler; dropped from indexed names and queries alike, so "what is
+# the weather in paris" shares nothing with `identitystore is-member-in-groups`
+_STOPWORDS = frozenset({
+    "a", "about", "all", "an", "and", "any", "are", "as", "at", "be", "by", "can", "could", "do", "does", "from",
+    "give", "have", "how", "i", "if", "in", "into", "is", "it", "its", "me", "my", "need", "no", "not", "of", "on",
+    "or", "our", "please", "should", "so", "some", "that", "the", "their", "them", "there", "these", "this", "to",
+    "up", "us", "want", "was", "we", "what", "when", "where", "which", "who", "why", "will", "with", "would", "you",
+    "your",
+})
+# operations free-text search never offers: a guess must not destroy anything
+_DESTRUCTIVE = ("delete", "terminate", "remove", "purge", "destroy", "deregister")
+
+# Ranking: each query word found in the operation name scores 2, one found in
+# the service name 1, and each operation-name word the query did not mention
+# costs 1, so "invoke lambda" prefers `lambda invoke` over
+# `lambda get-function-event-invoke-config`. Ties go to the shorter name. A
+# match has to contain every word of the operation name and reach _MIN_SCORE
+# (one operation word plus the service).
+_MIN_SCORE = 4
+_SEARCH = """
+SELECT o.service, o.operation, o.required,
+       3 * sum(k.op_word) + count(*) - o.n_words AS score
+FROM keywords k JOIN operations o ON o.id = k.op
+WHERE k.word IN ({words}) {where}
+GROUP BY o.id HAVING sum(k.op_word) = o.n_words AND o.n_words > 0 AND score >= ?
+ORDER BY score DESC, length(o.operation), length(o.service) LIMIT ?
+"""
+_NOT_DESTRUCTIVE = "AND NOT (" + " OR ".join(f"(o.operation || '-') GLOB '{v}-*'" for v in _DESTRUCTIVE) + ")"
+
+
+class Operation(NamedTuple):
+    service: str                 # CLI service name
+    operation: str               # CLI operation name
+    required: Tuple[str, ...]    # required parameters as CLI options, without the "--"
+
+    def command(self, entities: Dict) -> str:
+        """The command with each required option filled from `entities` (matched on the option's
+        snake_case name, also without an _name/_id/_arn suffix or plural s) or a <placeholder>."""
+        from aws_cli_assistant.core.aws_parsers.command_template import command_template
+
+        text, values = f"aws {self.service} {self.operation}", {}
+        for i, option in enumerate(self.required):
+            key = option.replace("-", "_")
+            candidates = (key, re.sub(r"_(name|id|arn)s?$", "", key), key.rstrip("s"))
+            values[f"p{i}"] = next((entities[k] for k in candidates if entities.get(k)), f"<{option}>")
+            text += f" --{option} {{p{i}}}"
+        if entities.get("region"):
+            values["region"] = entities["region"]
+            text += " --region {region}"
+        return command_template(text)(values)
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding, applied alike to indexed names and queries."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _keywords(*texts: str) -> set:
+    return {_stem(_SYNONYMS.get(w, w)) for text in texts for w in _WORD_RE.findall(text.lower())
+            if w not in _STOPWORDS} - _NOISE
+
+
+# --- build ------------------------------------------------------------------
+def _load_models(services: Optional[Iterable[str]] = None):
+    from botocore.loaders import Loader
+
+    loader = Loader()
+    for name in sorted(services or loader.list_available_services("service-2")):
+        yield name, loader.load_service_model(name, "service-2")
+
+
+def build_index(path: str = OPERATION_INDEX_PATH, services: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Write the index for every installed botocore service (or just `services`) to `path`."""
+    import botocore
+    from botocore import xform_name
+
+    start = time.monotonic()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    conn.executescript(_SCHEMA)
+    n_services = n_operations = 0
+    with conn:
+        for name, model in _load_models(services):
+            n_services += 1
+            cli_service = _CLI_SERVICE_NAMES.get(name, name)
+            meta = model.get("metadata", {})
+            service_words = _keywords(name, cli_service, meta.get("serviceId", ""), meta.get("serviceFullName", ""))
+            shapes = model.get("shapes", {})
+            for op_name, op in model["operations"].items():
+                if op.get("deprecated"):
+                    continue
+                input_shape = shapes.get(op.get("input", {}).get("shape"), {})
+                cli_name = xform_name(op_name, "-")
+                required = " ".join(xform_name(p, "-") for p in input_shape.get("required", []))
+                op_words = _keywords(cli_name.replace("-", " "))
+                cur = conn.execute("INSERT INTO operations (service, operation, api_name, required, n_words) "
+                                   "VALUES (?, ?, ?, ?, ?)", (cli_service, cli_name, op_name, required, len(op_words)))
+                conn.executemany("INSERT INTO keywords (word, op, op_word) VALUES (?, ?, ?)",
+                                 [(w, cur.lastrowid, int(w in op_words)) for w in service_words | op_words])
+                n_operations += 1
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                         [("botocore", botocore.__version__), ("built", str(int(time.time())))])
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp, path)
+    stats = {"services": n_services, "operations": n_operations, "bytes": os.path.getsize(path),
+             "seconds": round(time.monotonic() - start, 2)}
+    logger.info("Built operation index {}: {}", path, stats)
+    return stats
+
+
+# --- lookup -----------------------------------------------------------------
+class OperationIndex:
+    """Read-only view of a built index; one SQLite connection per thread."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._local = threading.local()
+        self.services = frozenset(r[0] for r in self._db().execute("SELECT DISTINCT service FROM operations"))
+        self.meta = dict(self._db().execute("SELECT key, value FROM meta"))
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _row(self, row) -> Operation:
+        return Operation(row[0], row[1], tuple(row[2].split()))
+
+    def get(self, service: str, operation: str) -> Optional[Operation]:
+        """By CLI name ("list-topics") or API name ("ListTopics")."""
+        column = "operation" if operation.islower() else "api_name"
+        row = self._db().execute(f"SELECT service, operation, required FROM operations WHERE service = ? "
+                                 f"AND {column} = ?", (_CLI_SERVICE_NAMES.get(service, service), operation)).fetchone()
+        return self._row(row) if row else None
+
+    def search(self, text: str, service: Optional[str] = None, limit: int = 5) -> List[Operation]:
+        """Best matches for free text `text` by shared keywords (see _SEARCH).
+
+        Only searches within a service the text names ("invoke lambda
+        function") or `service`; without one, or for destructive operations,
+        there is no match.
+        """
+        if service is None:
+            service = next((w for w in _WORD_RE.findall(text.lower())
+                            if _CLI_SERVICE_NAMES.get(w, w) in self.services), None)
+            if service is None:
+                return []
+        return self._search(sorted(_keywords(text)), service, limit, destructive=False)
+
+    def _search(self, words: List[str], service: str, limit: int, destructive: bool = True) -> List[Operation]:
+        if not words:
+            return []
+        where = "AND o.service = ?" + ("" if destructive else " " + _NOT_DESTRUCTIVE)
+        rows = self._db().execute(_SEARCH.format(words=",".join("?" * len(words)), where=where),
+                                  [*words, _CLI_SERVICE_NAMES.get(service, service), _MIN_SCORE, limit]).fetchall()
+        return [self._row(r) for r in rows]
+
+    def resolve(self, intent: str) -> Optional[Operation]:
+        """Operation named by an intent: "sns.list-topics", "sns:ListTopics" or "list_sns_topics"."""
+        m = re.fullmatch(r"([a-z0-9-]+)[.:]([A-Za-z0-9-]+)", intent)
+        if m:
+            return self.get(m.group(1), m.group(2))
+        words = intent.lower().split("_")
+        for i, word in enumerate(words):
+            if _CLI_SERVICE_NAMES.get(word, word) in self.services:
+                rest = words[:i] + words[i + 1:]
+                if not rest:
+                    return None
+                return self.get(word, "-".join(rest)) or next(iter(self._search(sorted(_keywords(*words)), word, 1)), None)
+        return None
+
+
+_index: Optional[OperationIndex] = None
+_index_lock = threading.Lock()
+_missing_logged = False
+
+
+def get_index() -> Optional[OperationIndex]:
+    """The index at OPERATION_INDEX_PATH, opened on first use; None if it was never built."""
+    global _index, _missing_logged
+    if _index is not None and _index.path == OPERATION_INDEX_PATH:
+        return _index
+    with _index_lock:
+        if _index is None or _index.path != OPERATION_INDEX_PATH:
+            start = time.perf_counter()
+            try:
+                _index = OperationIndex(OPERATION_INDEX_PATH)
+            except (OSError, sqlite3.Error) as e:
+                if not _missing_logged:
+                    logger.info("No operation index at {} ({}); build it with "
+                                "`python -m aws_cli_assistant.core.operation_index --build`",
+                                OPERATION_INDEX_PATH, e)
+                    _missing_logged = True
+                return None
+            logger.debug("Opened operation index {} ({} services) in {:.1f} ms", OPERATION_INDEX_PATH,
+                         len(_index.services), (time.perf_counter() - start) * 1000)
+    return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AWS CLI operation index")
+    parser.add_argument("--build", action="store_true", help="(re)build the index from botocore's service models")
+    parser.add_argument("--path", default=OPERATION_INDEX_PATH)
+    parser.add_argument("--services", nargs="+", help="index only these botocore services")
+    parser.add_argument("--search", metavar="TEXT", help="print the best matching operations")
+    args = parser.parse_args()
+    if args.build:
+        print(build_index(args.path, args.services))
+    if args.search:
+        for op in OperationIndex(args.path).search(args.search):
+            print(f"aws {op.service} {op.operation}", *(f"--{p} <{p}>" for p in op.required))
@@ -0,0 +1,34 @@
+# src/core/regions.py
+"""Region sets named in a query: lists, "all regions" and configured groups.
+
+"in us-east-1 and eu-west-1", "across all us regions" and "in every region"
+name several regions; `region_set` turns them into an ordered list. Groups
+come from `region_groups` in config/defaults.json ("all" is their union).
+"""
+import re
+from typing import List, Optional
+
+from aws_cli_assistant.config.settings import REGION_GROUPS
+
+REGION_NAME = r"(?:us|eu|ap|sa|ca|me|af|il|mx)(?:-gov)?-[a-z]+-\d"
+
+_REGION_NAME_RE = re.compile(rf"\b{REGION_NAME}\b")
+# "all regions", "every us region", "all of the eu regions" / "eu regions"
+_ALL_RE = re.compile(r"\b(?:all|every|each)\s+(?:of\s+)?(?:the\s+)?(?:([a-z]+)\s+)?regions?\b")
+_GROUP_RE = re.compile(r"\b([a-z]+)\s+regions\b")
+
+
+def region_set(text: str) -> Optional[List[str]]:
+    """Regions a query asks for, when it names a group or more than one region; else None."""
+    t = text.lower()
+    regions = list(dict.fromkeys(_REGION_NAME_RE.findall(t)))
+    grouped = False
+    for m in _ALL_RE.finditer(t):
+        regions += REGION_GROUPS.get(m.group(1), REGION_GROUPS["all"])
+        grouped = True
+    for m in _GROUP_RE.finditer(t):
+        if m.group(1) in REGION_GROUPS:
+            regions += REGION_GROUPS[m.group(1)]
+            grouped = True
+    regions = list(dict.fromkeys(regions))
+    return regions if grouped or len(regions) > 1 else None
@@ -0,0 +1,161 @@
+# src/core/semantic_cache.py
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def hashed_features(text: str, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed, L2-normalized bag of word 1-2-grams and char 3-5-grams, as (indices, values)."""
+    words = _WORD_RE.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [f"c:{padded[i:i + n]}" for n in (3, 4, 5) for i in range(len(padded) - n + 1)]
+    counts: Dict[int, float] = {}
+    for g in grams:
+        # crc32, not hash(): stable across processes
+        h = zlib.crc32(g.encode("utf-8")) % dim
+        counts[h] = counts.get(h, 0.0) + 1.0
+    if not counts:
+        return np.zeros(0, np.int64), np.zeros(0, np.float32)
+    idx = np.fromiter(counts.keys(), np.int64, len(counts))
+    val = np.fromiter(counts.values(), np.float32, len(counts))
+    return idx, val / np.linalg.norm(val)
+
+
+def hashed_vector(text: str, dim: int) -> np.ndarray:
+    """`hashed_features` as a dense unit vector (zero for text without words)."""
+    idx, val = hashed_features(text, dim)
+    vec = np.zeros(dim, np.float32)
+    np.add.at(vec, idx, val)
+    return vec
+
+
+class SemanticCache:
+    """Thread-safe bounded nearest-neighbour cache over unit-length query vectors.
+
+    Vectors live in one float32 matrix (grown by doubling up to `capacity`);
+    a lookup is a single matrix-vector product over the filled rows. Past `ann_min` entries
+    (default: an eighth of `capacity`, at least 256) the
+    scan is narrowed first with random-hyperplane LSH (`ann_tables` tables of
+    `ann_bits`-bit signatures) and only the colliding rows are scored. The
+    least recently used slot is reused once `capacity` is reached.
+
+    `accept(value)` lets the caller reject a neighbour that is close but not
+    usable for this query (e.g. a different entity shape).
+    """
+
+    def __init__(self, dim: int, capacity: int = 4096, threshold: float = 0.9, ann_min: Optional[int] = None,
+                 ann_tables: int = 8, ann_bits: int = 12, seed: int = 0):
+        self.dim = dim
+        self.capacity = max(0, capacity)
+        self.threshold = threshold
+        self.ann_min = ann_min if ann_min is not None else max(256, self.capacity // 8)
+        self._matrix = np.zeros((min(self.capacity, 256), dim), dtype=np.float32)
+        self._values: List[Any] = [None] * self.capacity
+        self._lru: "OrderedDict[int, None]" = OrderedDict()   # filled slots, oldest first
+        self._lock = threading.Lock()
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((ann_tables, dim, ann_bits)).astype(np.float32)
+        self._bit_weights = 1 << np.arange(ann_bits, dtype=np.int64)
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(ann_tables)]
+        self._signatures: Dict[int, np.ndarray] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ann_lookups = 0
+
+    def _signature(self, vector: np.ndarray) -> np.ndarray:
+        bits = np.einsum("d,tdb->tb", vector, self._planes) > 0
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def _candidates(self, vector: np.ndarray) -> np.ndarray:
+        if len(self._lru) < self.ann_min:
+            return np.fromiter(self._lru, np.int64, len(self._lru))
+        self.ann_lookups += 1
+        rows = set()
+        for table, sig in zip(self._buckets, self._signature(vector)):
+            rows |= table.get(int(sig), set())
+        return np.fromiter(rows, np.int64, len(rows))
+
+    def get(self, vector: np.ndarray, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Tuple[Any, float]]:
+        """(value, similarity) of the closest acceptable entry at or above the threshold."""
+        with self._lock:
+            rows = self._candidates(vector) if self._lru else np.zeros(0, np.int64)
+            if len(rows):
+                sims = self._matrix[rows] @ vector
+                for j in np.argsort(-sims, kind="stable"):
+                    if sims[j] < self.threshold:
+                        break
+                    slot = int(rows[j])
+                    if accept is None or accept(self._values[slot]):
+                        self._lru.move_to_end(slot)
+                        self.hits += 1
+                        return self._values[slot], float(sims[j])
+            self.misses += 1
+            return None
+
+    def put(self, vector: np.ndarray, value: Any) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            if len(self._lru) < self.capacity:
+                slot = len(self._lru)
+                if slot == len(self._matrix):
+                    grown = np.zeros((min(self.capacity, 2 * slot), self.dim), dtype=np.float32)
+                    grown[:slot] = self._matrix
+                    self._matrix = grown
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                self._unindex(slot)
+                self.evictions += 1
+            self._matrix[slot] = vector
+            self._values[slot] = value
+            self._lru[slot] = None
+            sig = self._signature(vector)
+            self._signatures[slot] = sig
+            for table, s in zip(self._buckets, sig):
+                table.setdefault(int(s), set()).add(slot)
+
+    def _unindex(self, slot: int):
+        for table, s in zip(self._buckets, self._signatures.pop(slot)):
+            bucket = table.get(int(s))
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del table[int(s)]
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._lru)
+            self._lru.clear()
+            self._values = [None] * self.capacity
+            self._buckets = [{} for _ in self._buckets]
+            self._signatures.clear()
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._lru),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "ann_lookups": self.ann_lookups,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._lru)
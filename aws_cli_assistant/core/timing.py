@@ -0,0 +1,171 @@
+# src/core/timing.py
+"""Per-request stage timings and in-process latency histograms.
+
+A front end opens a `trace` per request; code anywhere below it wraps work in
+`span(name)` and the span lands in that request's trace (found through a
+context variable, so it follows asyncio tasks and `asyncio.to_thread`; pass
+`contextvars.copy_context().run` to plain executors). Every span, traced or
+not, is also added to a process-wide histogram for its name, so p50/p95/p99
+per stage are available from `latency_stats()` at any time.
+
+Durations come from `time.perf_counter`, a monotonic clock.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# log-spaced buckets from 10 us to ~10 min, 5% apart: percentiles within 5%
+_BUCKET_MIN_MS = 0.01
+_BUCKET_GROWTH = 1.05
+_BUCKET_BOUNDS = [_BUCKET_MIN_MS * _BUCKET_GROWTH ** i
+                  for i in range(int(math.log(600_000 / _BUCKET_MIN_MS, _BUCKET_GROWTH)) + 2)]
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of durations in milliseconds."""
+
+    def __init__(self):
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        i = bisect.bisect_left(_BUCKET_BOUNDS, ms)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(self.count * q / 100))
+            seen = 0
+            for i, n in enumerate(self._counts):
+                seen += n
+                if seen >= rank:
+                    bound = _BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else self.max_ms
+                    return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(name: str) -> LatencyHistogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, LatencyHistogram())
+    return hist
+
+
+def record_latency(name: str, ms: float):
+    _histogram(name).record(ms)
+
+
+def latency_stats() -> Dict[str, Dict[str, float]]:
+    """count / mean / p50 / p95 / p99 / max per span name since start (or the last reset)."""
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    return {name: hist.summary() for name, hist in items}
+
+
+def reset_latency_stats():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "ms")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.ms: Optional[float] = None
+
+    def set(self, **attrs):
+        """Attach attributes known only once the work is done (e.g. the backend that answered)."""
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """Spans and AWS API calls of one request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.ms: Optional[float] = None
+        self.spans: List[Span] = []
+        self.aws_calls: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        ms = self.ms if self.ms is not None else (time.perf_counter() - self.start) * 1000
+        return {
+            "total_ms": round(ms, 3),
+            "spans": [dict(s.attrs, name=s.name, ms=round(s.ms, 3))
+                      for s in sorted(self.spans, key=lambda s: s.start) if s.ms is not None],
+            "aws_calls": list(self.aws_calls),
+        }
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("aws_cli_assistant_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """Collect the spans of one request; its total is recorded under `name`."""
+    t = Trace(name)
+    token = _current.set(t)
+    try:
+        yield t
+    finally:
+        _current.reset(token)
+        t.ms = (time.perf_counter() - t.start) * 1000
+        record_latency(name, t.ms)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    s = Span(name, attrs)
+    try:
+        yield s
+    finally:
+        s.ms = (time.perf_counter() - s.start) * 1000
+        record_latency(name, s.ms)
+        t = _current.get()
+        if t is not None:
+            t.spans.append(s)
+
+
+def record_aws_call(service: str, operation: str, ms: float, status: Optional[int] = None):
+    """One AWS API call: added to the current trace and the `aws.<service>.<operation>` histogram."""
+    record_latency(f"aws.{service}.{operation}", ms)
+    t = _current.get()
+    if t is not None:
+        t.aws_calls.append({"service": service, "operation": operation, "ms": round(ms, 3), "status": status})
@@ -1,29 +1,70 @@
 # src/http_adapter.py
-import uvicorn
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from core.nlp_utils import parse_nlp
-from core.command_generator import generate_command, list_supported_services
-from core.aws_validator import validate_command_safe
-from core.telemetry import telemetry_log_event
+from typing import List
+from aws_cli_assistant.core import nlp_utils
+from aws_cli_assistant.core.nlp_utils import parse_nlp_detailed_async, parse_nlp_batch, model_status
+from aws_cli_assistant.config.settings import NLP_BUDGET_MS
+from aws_cli_assistant.core.command_generator import list_supported_services
+from aws_cli_assistant.core.fanout import generate_and_validate
+from aws_cli_assistant.core.telemetry import telemetry_log_event
+from aws_cli_assistant.core.timing import latency_stats, trace
 
-app = FastAPI(title="MCP AWS CLI Adapter")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # runs in each pre-forked worker, so every worker opens its own store connection
+    await asyncio.to_thread(nlp_utils.open_intent_store)
+    if nlp_utils.NLP_WARMUP:
+        nlp_utils.start_warmup()
+    yield
+    await nlp_utils.close_async_haiku_client()
+
+app = FastAPI(title="MCP AWS CLI Adapter", lifespan=lifespan)
 
 class GenerateRequest(BaseModel):
     query: str
 
+class BatchGenerateRequest(BaseModel):
+    queries: List[str]
+
 @app.post("/generate")
 async def generate(req: GenerateRequest):
     telemetry_log_event("http.request", {"path": "/generate", "query": req.query})
-    intent, entities = parse_nlp(req.query)
-    command, explanation = generate_command(intent, entities)
-    validation = validate_command_safe(intent, entities)
-    return {"command": command, "explanation": explanation, "validation": validation}
+    with trace("http.generate") as t:
+        parsed = await parse_nlp_detailed_async(req.query, NLP_BUDGET_MS["http"])
+        intent, entities = parsed.intent, parsed.entities
+        # validation blocks on boto3 calls, and fan-out on its deadline: keep them off the event loop
+        response = await asyncio.to_thread(generate_and_validate, intent, entities, req.query)
+    timings = t.to_dict()
+    telemetry_log_event("http.nlp", {"query": req.query, "intent": intent, "nlp_stage": parsed.stage, "nlp_ms": parsed.elapsed_ms,
+                                     "timings": timings})
+    return dict(response, timings=timings)
+
+def _generate_batch(queries: List[str]) -> List[dict]:
+    parsed = parse_nlp_batch(queries)
+    return [generate_and_validate(intent, entities, query) for query, (intent, entities) in zip(queries, parsed)]
+
+@app.post("/generate/batch")
+async def generate_batch(req: BatchGenerateRequest):
+    telemetry_log_event("http.request", {"path": "/generate/batch", "count": len(req.queries)})
+    with trace("http.generate_batch") as t:
+        # batched inference and every validation run off the event loop, as in the MCP batch tool
+        results = await asyncio.to_thread(_generate_batch, req.queries)
+    timings = t.to_dict()
+    telemetry_log_event("http.batch", {"count": len(results), "timings": timings})
+    return {"results": results, "timings": timings}
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "model": model_status(), "intent_store": nlp_utils.intent_store_stats()}
+
+@app.get("/stats/latency")
+async def latency():
+    """p50/p95/p99 per pipeline stage and AWS API call since startup."""
+    return {"stages": latency_stats()}
 
 @app.get("/services")
 async def services():
@@ -92,7 +133,12 @@ async def web_interface():
     from fastapi.responses import HTMLResponse
     return HTMLResponse(content=html_content)
 
-def run_http_app(app: FastAPI, host: str="127.0.0.1", port: int=8000):
+def run_http_app(app: FastAPI, host: str="127.0.0.1", port: int=8000, workers: int=1):
     print(f"🌐 Web interface available at: http://{host}:{port}")
-    print(f"📡 API endpoints: /generate, /health, /services")
+    print(f"📡 API endpoints: /generate, /generate/batch, /health, /services, /stats/latency")
+    if workers > 1:
+        from aws_cli_assistant.prefork import run_http_prefork
+        run_http_prefork(app, host=host, port=port, workers=workers)
+        return
+    import uvicorn
     uvicorn.run(app, host=host, port=port)
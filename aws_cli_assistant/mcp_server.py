@@ -6,86 +6,166 @@ import sys
 from loguru import logger
 import json
 
-USE_HAIKU = bool(os.getenv("USE_HAIKU", "false").lower() in ["true", "1", "yes"])
-
-
 # ensure src on path (if running from repo root)
 sys.path.insert(0, os.path.dirname(__file__))
 
-from fastmcp import FastMCP
-
-from aws_cli_assistant.core.nlp_utils import parse_nlp, nlp_mode_summary
-from aws_cli_assistant.core.command_generator import generate_command, list_supported_services
-from aws_cli_assistant.core.aws_validator import validate_command_safe
+# fastmcp, boto3 and the ML stack are imported on first use, not at startup
+from aws_cli_assistant.core import nlp_utils
+from aws_cli_assistant.core.nlp_utils import parse_nlp_detailed_async, parse_nlp_batch, nlp_mode_summary, model_status
+from aws_cli_assistant.config.settings import NLP_BUDGET_MS, TELEMETRY_LOG_PATH
+from aws_cli_assistant.core.fanout import generate_and_validate
+from aws_cli_assistant.core.intent_registry import supported_services
 from aws_cli_assistant.core.telemetry import telemetry_log_event
+from aws_cli_assistant.core.timing import latency_stats, trace
 
 # ensure logs go to stderr and file (telemetry.log)
 logger.remove()
 logger.add(sys.stderr, level="INFO")
-logger.add("telemetry/telemetry.log", rotation="10 MB", serialize=True, retention="30 days", level="INFO")
-
-mcp = FastMCP("aws-cli-generator")
+if TELEMETRY_LOG_PATH:
+    logger.add(TELEMETRY_LOG_PATH, rotation="10 MB", serialize=True, retention="30 days", level="INFO")
 
 # Tool: generate aws cli
-@mcp.tool()
 async def generate_aws_cli(query: str):
     # imports already done at module level
-    # parse_nlp is a synchronous helper that returns (intent, entities)
-    intent, entities = await asyncio.to_thread(parse_nlp, query)
+    with trace("mcp.generate_aws_cli") as t:
+        # Haiku is awaited on the pooled async client; the local model runs in a worker thread
+        parsed = await parse_nlp_detailed_async(query, NLP_BUDGET_MS["mcp"])
+        intent, entities = parsed.intent, parsed.entities
+
+        # synchronous (boto3, and a region-set query waits on its fan-out deadline), so in a worker thread
+        response = await asyncio.to_thread(generate_and_validate, intent, entities, query)
+
+    response["timings"] = t.to_dict()
+    validation = response["validation"]
+    telemetry_log_event("response.emitted", {"query": query,
+                                             "result_summary": {"intent": intent, "status": validation.get("status"),
+                                                                "nlp_stage": parsed.stage, "nlp_ms": parsed.elapsed_ms},
+                                             "timings": response["timings"]})
+    return response
 
-    # generate_command is synchronous and returns (command, explanation)
-    command, explanation = generate_command(intent, entities)
-    validation = validate_command_safe(intent, entities)
+def _generate_batch(queries: list[str]) -> list[dict]:
+    # classify all queries in padded batches, then generate/validate each in order
+    parsed = parse_nlp_batch(queries)
+    return [generate_and_validate(intent, entities, query) for query, (intent, entities) in zip(queries, parsed)]
 
-    response = {"command": command, "explanation": explanation, "validation": validation}
-    telemetry_log_event("response.emitted", {"result_summary": {"intent": intent, "status": validation.get("status")}})
-    return response
+async def generate_aws_cli_batch(queries: list[str]):
+    with trace("mcp.generate_aws_cli_batch") as t:
+        # the whole batch, boto3 validations included, runs in one worker thread
+        responses = await asyncio.to_thread(_generate_batch, queries)
+    telemetry_log_event("response.emitted", {"result_summary": {"batch_size": len(responses)}, "timings": t.to_dict()})
+    return responses
 
-@mcp.tool()
 async def health_check():
-    return {"status": "ok", "model": "haiku" if USE_HAIKU else "local-transformer"}
+    return {"status": "ok", "model": model_status(), "intent_store": nlp_utils.intent_store_stats()}
 
-@mcp.tool()
 async def list_supported_services():
-    return ["s3", "dynamodb", "ec2", "lambda", "iam"]
+    return supported_services()
+
+async def latency_report():
+    """p50/p95/p99 per pipeline stage and AWS API call since the server started."""
+    return latency_stats()
+
+_mcp = None
+
+def _get_mcp():
+    """The FastMCP server with every tool registered, built on first use."""
+    global _mcp
+    if _mcp is None:
+        from fastmcp import FastMCP
+        _mcp = FastMCP("aws-cli-generator")
+        for tool in (generate_aws_cli, generate_aws_cli_batch, health_check, list_supported_services, latency_report):
+            _mcp.tool()(tool)
+    return _mcp
+
+def __getattr__(name):
+    # keeps `mcp_server:mcp` working for tools that load the server object by name
+    if name == "mcp":
+        return _get_mcp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def run_stdio():
     logger.info("Starting MCP stdio server")
-    await mcp.run_stdio_async()
+    try:
+        await _get_mcp().run_stdio_async()
+    finally:
+        await nlp_utils.close_async_haiku_client()
 
-def run_http():
+def run_http(workers=1):
     # lazy import to avoid bringing FastAPI when running stdio-only
-    from http_adapter import app, run_http_app
-    run_http_app(app)
+    from aws_cli_assistant.http_adapter import app, run_http_app
+    run_http_app(app, workers=workers)
 
-def run_cli():
+def run_cli(batch_file=None, workers=1):
     # lazy import for CLI interface
-    from cli_interface import run_cli_interface
+    if batch_file:
+        from aws_cli_assistant.cli_interface import run_cli_batch
+        run_cli_batch(batch_file, workers=workers)
+        return
+    from aws_cli_assistant.cli_interface import run_cli_interface
     run_cli_interface()
 
+def run_batch(source="-", dest="-", ordered=True, concurrency=8, validate=True):
+    # lazy import: the bulk pipeline pulls in the validator's thread pool
+    from aws_cli_assistant.core.bulk_generator import write_jsonl
+    counts = write_jsonl(source, dest, ordered=ordered, concurrency=concurrency, validate=validate)
+    logger.info("Batch done: {queries} queries, {errors} errors in {seconds}s", **counts)
+
 def main():
     parser = argparse.ArgumentParser(description="AWS CLI Assistant - Multiple modes")
-    parser.add_argument("--mode", choices=["mcp", "web", "cli"], default="mcp", 
-                       help="Mode: mcp (Claude Desktop), web (HTTP server), cli (interactive)")
+    parser.add_argument("--mode", choices=["mcp", "web", "cli", "batch"], default="mcp", 
+                       help="Mode: mcp (Claude Desktop), web (HTTP server), cli (interactive), "
+                            "batch (JSONL for every line of --input)")
     # Keep backward compatibility
     parser.add_argument("--http", action="store_true", help="Start HTTP adapter (deprecated, use --mode web)")
+    parser.add_argument("--batch", metavar="FILE",
+                       help="With --mode cli: generate commands for every line of FILE ('-' for stdin)")
+    parser.add_argument("--input", default="-", help="With --mode batch: query file, one per line ('-' for stdin)")
+    parser.add_argument("--output", default="-", help="With --mode batch: JSONL results file ('-' for stdout)")
+    parser.add_argument("--unordered", action="store_true",
+                       help="With --mode batch: write each result as soon as it completes instead of in input order")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="With --mode batch: queries generated and validated at once")
+    parser.add_argument("--no-validate", action="store_true", help="With --mode batch: skip AWS validation")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Pre-fork N workers sharing one loaded model (web mode and --batch)")
+    parser.add_argument("--warmup", action="store_true",
+                       help="Load NLP models in the background at startup (same as NLP_WARMUP=true)")
+    parser.add_argument("--profile-startup", action="store_true",
+                       help="Print a per-module import-time breakdown of the selected mode's cold start and exit")
     args = parser.parse_args()
 
+    if args.profile_startup:
+        from aws_cli_assistant.utils.startup_profile import print_startup_profile
+        print_startup_profile("web" if args.http else args.mode)
+        return
+
+    if args.workers <= 1:
+        # the web server opens it per worker in its lifespan instead
+        if args.mode != "web" and not args.http:
+            nlp_utils.open_intent_store()
+        # rules answer requests until the models are ready; pre-fork loads synchronously instead
+        if args.warmup or nlp_utils.NLP_WARMUP:
+            nlp_utils.start_warmup()
+
     # Handle backward compatibility
     if args.http:
         print("⚠️  --http is deprecated, use --mode web")
-        run_http()
+        run_http(args.workers)
     elif args.mode == "web":
         print("🌐 Starting HTTP server mode...")
-        run_http()
+        run_http(args.workers)
     elif args.mode == "cli":
-        print("💻 Starting interactive CLI mode...")
-        run_cli()
+        if not args.batch:
+            print("💻 Starting interactive CLI mode...")
+        run_cli(args.batch, args.workers)
+    elif args.mode == "batch":
+        # stdout carries the JSONL, so no banner
+        run_batch(args.input, args.output, not args.unordered, args.concurrency, not args.no_validate)
     else:  # mcp mode (default)
         print("🔗 Starting MCP server for Claude Desktop...")
         asyncio.run(run_stdio())
 
 if __name__ == "__main__":
     main()
-    __all__ = ["generate_aws_cli", "list_supported_services", "health_check"]
+    __all__ = ["generate_aws_cli", "generate_aws_cli_batch", "list_supported_services", "health_check"]
 
@@ -0,0 +1,140 @@
+# src/prefork.py
+"""Pre-fork worker pool sharing one copy of the NLP model.
+
+The parent process loads the classifier once, switches it to inference-only
+(eval mode, no gradients) and freezes the GC so collections in the children
+don't touch the shared pages. It then forks N workers that inherit the
+weights copy-on-write instead of each loading their own model.
+
+Two entry points use it:
+ - `run_http_prefork`: N uvicorn workers accepting on one shared socket
+ - `parse_nlp_pool`: batch classification spread over N forked workers
+
+POSIX only; on platforms without `os.fork` both fall back to one process.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import Dict, Iterable, List, Tuple
+
+from loguru import logger
+
+from aws_cli_assistant.core import nlp_utils
+
+PREFORK_WORKERS = int(os.getenv("PREFORK_WORKERS", "0")) or (os.cpu_count() or 1)
+CAN_FORK = hasattr(os, "fork")
+
+
+def _torch_module(classifier):
+    """The torch.nn.Module inside any of the local backends, if there is one."""
+    for path in (("model",), ("encoder", "_model")):
+        obj = classifier
+        for attr in path:
+            obj = getattr(obj, attr, None)
+        if obj is not None:
+            return obj
+    return None
+
+
+def prepare_shared_model():
+    """Load the classifier in this (parent) process and make it safe to share."""
+    classifier = nlp_utils._load_local_classifier() if nlp_utils.ENABLE_ML else None
+    # only touch torch if a backend already imported it
+    torch = sys.modules.get("torch")
+    if classifier is not None and torch is not None:
+        torch.set_grad_enabled(False)
+        module = _torch_module(classifier)
+        if isinstance(module, torch.nn.Module):
+            module.eval()
+            for param in module.parameters():
+                param.requires_grad_(False)
+    # move everything allocated so far out of the collector's reach so
+    # refcount/GC bookkeeping in the children doesn't dirty shared pages
+    gc.collect()
+    gc.freeze()
+    return classifier
+
+
+def _threads_per_worker(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(threads: int):
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+        torch.set_grad_enabled(False)
+
+
+@contextmanager
+def worker_pool(workers: int = PREFORK_WORKERS):
+    """A fork-based multiprocessing pool whose workers share the parent's model."""
+    prepare_shared_model()
+    pool = get_context("fork").Pool(workers, initializer=_init_worker,
+                                     initargs=(_threads_per_worker(workers),))
+    try:
+        yield pool
+    finally:
+        pool.close()
+        pool.join()
+        gc.unfreeze()
+
+
+def parse_nlp_pool(texts: Iterable[str], workers: int = PREFORK_WORKERS,
+                   chunk_size: int = nlp_utils.ML_BATCH_SIZE) -> List[Tuple[str, Dict]]:
+    """`parse_nlp_batch` over forked workers; results keep input order."""
+    texts = list(texts)
+    if workers <= 1 or not CAN_FORK:
+        return nlp_utils.parse_nlp_batch(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results: List[Tuple[str, Dict]] = []
+    with worker_pool(workers) as pool:
+        for part in pool.imap(nlp_utils.parse_nlp_batch, chunks):
+            results.extend(part)
+    return results
+
+
+def run_http_prefork(app, host: str = "127.0.0.1", port: int = 8000, workers: int = PREFORK_WORKERS):
+    """Serve `app` from N forked uvicorn workers sharing one listening socket."""
+    import uvicorn
+
+    if workers <= 1 or not CAN_FORK:
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    prepare_shared_model()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    threads = _threads_per_worker(workers)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            _init_worker(threads)
+            uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+    logger.info("Pre-forked {} HTTP workers (pids {})", workers, children)
+
+    def forward(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for child in children:
+        os.waitpid(child, 0)
+    sock.close()
@@ -0,0 +1,83 @@
+# src/utils/startup_profile.py
+"""Per-module import-time breakdown of an entry point's cold start.
+
+`python -X importtime` only reports on a fresh interpreter, so the entry
+point is imported in a child process and its stderr report is parsed:
+
+    python -m aws_cli_assistant.mcp_server --profile-startup [--mode web]
+"""
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+# what each mode has to import before it can serve the first request
+MODE_IMPORTS = {
+    "mcp": "import aws_cli_assistant.mcp_server as m; m._get_mcp()",
+    "web": "import aws_cli_assistant.http_adapter",
+    "cli": "import aws_cli_assistant.cli_interface",
+    "batch": "import aws_cli_assistant.core.bulk_generator",
+}
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class StartupProfile(NamedTuple):
+    imports: List[ImportTime]
+    wall_ms: float          # child interpreter start to exit, including startup itself
+
+    @property
+    def modules(self) -> Dict[str, ImportTime]:
+        return {row.module: row for row in self.imports}
+
+    @property
+    def total_ms(self) -> float:
+        """Time spent importing: the sum of every top-level import's cumulative time."""
+        return sum(row.cumulative_us for row in self.imports if row.depth == 0) / 1000
+
+
+def _parse(stderr: str) -> List[ImportTime]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile_imports(code: str, env: Dict[str, str] = None) -> StartupProfile:
+    """Run `code` in a fresh interpreter with -X importtime and parse the report."""
+    start = time.monotonic()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=dict(os.environ, **(env or {})))
+    wall_ms = (time.monotonic() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"profiled import failed:\n{proc.stderr[-2000:]}")
+    return StartupProfile(_parse(proc.stderr), wall_ms)
+
+
+def format_profile(profile: StartupProfile, top: int = 25) -> str:
+    by_package: Dict[str, int] = {}
+    for row in profile.imports:
+        package = row.module.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + row.self_us
+    lines = [f"Cold start: {profile.total_ms:.1f} ms importing, {profile.wall_ms:.1f} ms wall "
+             f"({len(profile.imports)} modules)", "", f"{'package':<32}{'self ms':>10}"]
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"{package:<32}{us / 1000:>10.1f}")
+    lines += ["", f"{'module':<48}{'self ms':>10}{'cumul ms':>10}"]
+    for row in sorted(profile.imports, key=lambda r: -r.self_us)[:top]:
+        lines.append(f"{row.module:<48}{row.self_us / 1000:>10.1f}{row.cumulative_us / 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def print_startup_profile(mode: str, top: int = 25):
+    print(format_profile(profile_imports(MODE_IMPORTS[mode]), top))
@@ -0,0 +1,133 @@
+"""
+scripts/aws_stub.py
+----------------------------------------
+Local stand-in for the AWS API endpoints the validator calls (S3
+ListBuckets/HeadBucket, DynamoDB ListTables, EC2 DescribeInstances, IAM
+ListUsers/GetUser, Lambda ListFunctions/GetFunction), for tests and
+benchmarks of validation without network access or credentials.
+
+Every request is recorded (operation, client port, so new connections are
+countable); `delay` slows every answer down. Point boto3 at it with
+AWS_ENDPOINT_URL and any static credentials.
+
+Usage:
+    python scripts/aws_stub.py [--port 8788]
+    AWS_ENDPOINT_URL=http://127.0.0.1:8788 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub ...
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+_XML = '<?xml version="1.0" encoding="UTF-8"?>'
+
+_QUERY_ANSWERS = {
+    # EC2 / IAM: form-encoded POST, XML answer
+    "DescribeInstances": '<DescribeInstancesResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">'
+                         '<requestId>stub</requestId><reservationSet/></DescribeInstancesResponse>',
+    "ListUsers": '<ListUsersResponse xmlns="https://iam.amazonaws.com/doc/2010-05-08/"><ListUsersResult>'
+                 '<Users><member><UserName>stub-user</UserName><Path>/</Path><UserId>AIDSTUB</UserId>'
+                 '<Arn>arn:aws:iam::123456789012:user/stub-user</Arn><CreateDate>2024-01-01T00:00:00Z</CreateDate>'
+                 '</member></Users><IsTruncated>false</IsTruncated></ListUsersResult></ListUsersResponse>',
+}
+
+
+class AwsStub:
+    def __init__(self, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+            disable_nagle_algorithm = True
+
+            def _record(self, operation):
+                with stub._lock:
+                    stub.requests.append({"operation": operation, "port": self.client_address[1]})
+                time.sleep(stub.delay)
+
+            def _send(self, status, body="", content_type="application/xml"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def do_HEAD(self):
+                # S3 HeadBucket: every bucket name is free
+                self._record("HeadBucket")
+                self._send(404)
+
+            def do_GET(self):
+                if self.path.startswith("/2015-03-31/functions/") and self.path.rstrip("/") != "/2015-03-31/functions":
+                    self._record("GetFunction")
+                    self._send(404, json.dumps({"Type": "User", "Message": "Function not found"}), "application/json")
+                elif self.path.startswith("/2015-03-31/functions"):
+                    self._record("ListFunctions")
+                    self._send(200, json.dumps({"Functions": [{"FunctionName": "stub-fn"}]}), "application/json")
+                else:
+                    self._record("ListBuckets")
+                    self._send(200, _XML + '<ListAllMyBucketsResult><Buckets><Bucket><Name>stub-bucket</Name>'
+                                           '</Bucket></Buckets></ListAllMyBucketsResult>')
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                target = self.headers.get("X-Amz-Target")
+                if target:
+                    # DynamoDB: JSON protocol, operation in the target header
+                    operation = target.split(".")[-1]
+                    self._record(operation)
+                    answer = {"TableNames": ["stub-table"]} if operation == "ListTables" else {}
+                    self._send(200, json.dumps(answer), "application/x-amz-json-1.0")
+                    return
+                operation = parse_qs(body).get("Action", [""])[0]
+                self._record(operation)
+                if operation in _QUERY_ANSWERS:
+                    self._send(200, _XML + _QUERY_ANSWERS[operation], "text/xml")
+                else:
+                    self._send(400, _XML + f"<ErrorResponse><Error><Code>InvalidAction</Code>"
+                                           f"<Message>{operation} is not stubbed</Message></Error></ErrorResponse>")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def connections(self) -> int:
+        """Distinct client connections seen so far."""
+        with self._lock:
+            return len({r["port"] for r in self.requests})
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    with AwsStub(delay=args.delay, port=args.port) as stub:
+        print(f"AWS stub listening on {stub.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+scripts/bench_aws_clients.py
+----------------------------------------
+Per-validation latency of the pooled boto3 clients in `core.aws_validator`
+against the old path (a fresh `boto3.Session()` and client for every
+validation, kept below as `fresh_client`), one validation at a time and from
+a thread pool. Validations run against `aws_stub.AwsStub`, so the numbers
+are the client-side cost plus a loopback round trip; the stub also counts
+the TCP connections each path opened.
+
+Usage:
+    python scripts/bench_aws_clients.py [--repeat N] [--threads N] [--delay SECONDS]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from aws_stub import AwsStub
+from aws_cli_assistant.core import aws_validator
+
+INTENTS = [("list_s3_buckets", {}), ("list_dynamodb_tables", {}), ("list_lambda_functions", {}),
+           ("list_iam_users", {}), ("list_ec2_instances", {})]
+
+
+def fresh_client(service, region):
+    import boto3
+    return aws_validator._instrument(boto3.Session().client(service, region_name=region))
+
+
+def run(stub, repeat, threads):
+    calls = [INTENTS[n % len(INTENTS)] for n in range(repeat)]
+    before = stub.connections()
+
+    def one(call):
+        start = time.perf_counter()
+        result = aws_validator.validate_command_safe(*call)
+        assert result["status"] == "valid", result
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if threads == 1:
+        ms = [one(c) for c in calls]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            ms = list(pool.map(one, calls))
+    wall = time.perf_counter() - start
+    return {"mean": statistics.mean(ms), "p50": statistics.median(ms),
+            "p95": statistics.quantiles(ms, n=20)[-1], "per_s": repeat / wall,
+            "connections": stub.connections() - before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.0, help="stub answer delay in seconds")
+    args = parser.parse_args()
+
+    with AwsStub(delay=args.delay) as stub:
+        os.environ.update(AWS_ENDPOINT_URL=stub.url, AWS_ACCESS_KEY_ID="stub", AWS_SECRET_ACCESS_KEY="stub")
+        os.environ.pop("AWS_PROFILE", None)
+        pooled = aws_validator._session_client
+        aws_validator.validate_command_safe(*INTENTS[0])     # import boto3 before timing anything
+
+        print(f"{'path':<8}{'threads':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls/s':>10}{'conns':>8}")
+        for threads in (1, args.threads):
+            for name, factory in (("fresh", fresh_client), ("pooled", pooled)):
+                aws_validator._session_client = factory
+                aws_validator.evict_clients()
+                r = run(stub, args.repeat, threads)
+                print(f"{name:<8}{threads:>8}{r['mean']:>10.2f}{r['p50']:>10.2f}{r['p95']:>10.2f}"
+                      f"{r['per_s']:>10.0f}{r['connections']:>8}")
+        aws_validator._session_client = pooled
+
+
+if __name__ == "__main__":
+    main()
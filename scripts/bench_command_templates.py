@@ -0,0 +1,75 @@
+"""
+scripts/bench_command_templates.py
+----------------------------------------
+Render throughput of the pre-parsed command templates in
+`core.aws_parsers` against the f-string builders they replaced (kept below
+as `LEGACY`), for the shell string and for the argv list. The legacy argv
+is `command.split()`, which is what the CLI executed before. The templates
+also shell-quote every entity value, which the f-strings never did.
+
+Usage:
+    python scripts/bench_command_templates.py [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.intent_registry import get_intent
+
+LEGACY = {
+    "create_s3_bucket": lambda e: f"aws s3api create-bucket --bucket {e['bucket']} --region {e['region']}",
+    "start_ec2_instance": lambda e: f"aws ec2 start-instances --instance-ids {e['instance_id']} --region {e['region']}",
+    "create_dynamodb_table": lambda e: (
+        f"aws dynamodb create-table --table-name {e['table']} "
+        "--attribute-definitions AttributeName=Id,AttributeType=S "
+        "--key-schema AttributeName=Id,KeyType=HASH "
+        "--provisioned-throughput ReadCapacityUnits=5,WriteCapacityUnits=5 "
+        f"--region {e['region']}"),
+    "create_iam_user": lambda e: f"aws iam create-user --user-name {e['user_name']}",
+    "invoke_lambda": lambda e: f"aws lambda invoke --function-name {e['function']} response.json --region {e['region']}",
+    "list_s3_buckets": lambda e: "aws s3api list-buckets",
+}
+
+ENTITIES = {"bucket": "phase3-test-bucket", "region": "us-west-2", "instance_id": "i-0abc1234def567890",
+            "table": "Orders", "user_name": "alice", "function": "resize-images"}
+
+
+def throughput(fn, repeat):
+    cases = list(LEGACY)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for intent in cases:
+            fn(intent)
+    return len(cases) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50_000)
+    args = parser.parse_args()
+
+    builders = {intent: get_intent(intent).build for intent in LEGACY}
+    for intent, build in builders.items():
+        assert build(ENTITIES) == LEGACY[intent](ENTITIES), intent
+
+    rows = [
+        ("f-string", lambda i: LEGACY[i](ENTITIES)),
+        ("f-string + split", lambda i: LEGACY[i](ENTITIES).split()),
+        ("template", lambda i: builders[i](ENTITIES)),
+        ("template + argv", lambda i: (builders[i](ENTITIES), builders[i].argv(ENTITIES))),
+    ]
+    base = None
+    print(f"{len(LEGACY)} intents x {args.repeat}")
+    for name, fn in rows:
+        rate = throughput(fn, args.repeat)
+        base = base or rate
+        print(f"{name:<22}{rate:12,.0f} renders/s  ({rate / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+scripts/bench_fuzzy_keywords.py
+----------------------------------------
+How many queries still need ML/Haiku once the rule engine tolerates typos.
+
+Builds a noisy copy of the sample corpus by putting one typo (adjacent
+swap, dropped, doubled or substituted letter) into each word of 4+ letters
+with probability `--noise`, then compares the rule engine with
+RULE_FUZZY_KEYWORDS off and on:
+
+ - needs model: the rules answer "unknown", so only ML/Haiku can label it
+ - rule accuracy: rule intent equals the corpus label
+ - labels/query: candidate labels left for the zero-shot model after pruning
+ - cold/warm us: rule engine time per query on the first pass and once
+   typo lookups are memoized
+
+Usage:
+    python scripts/bench_fuzzy_keywords.py [--noise 0.5] [--copies 20] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import nlp_utils
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+def typo(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("swap", "drop", "double", "sub"))
+    if kind == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "double":
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def noisy(query, rng, noise):
+    return " ".join(typo(w, rng) if len(w) >= 4 and w.isalpha() and rng.random() < noise else w
+                    for w in query.split())
+
+
+def measure(rows):
+    nlp_utils._keyword_index.correct.cache_clear()
+    timings = []
+    for _ in range(2):  # cold (every typo looked up once), then memoized
+        start = time.perf_counter()
+        intents = [nlp_utils._rule_intent_and_entities(r["query"])[0] for r in rows]
+        timings.append((time.perf_counter() - start) / len(rows) * 1e6)
+    labels = sum(len(nlp_utils._candidate_labels(r["query"])) for r in rows)
+    return {
+        "needs_model": sum(i == "unknown" for i in intents) / len(rows),
+        "accuracy": sum(i == r["intent"] for i, r in zip(intents, rows)) / len(rows),
+        "labels": labels / len(rows),
+        "cold_us": timings[0],
+        "warm_us": timings[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        clean = [json.loads(line) for line in f if line.strip()]
+    rng = random.Random(args.seed)
+    corpora = {
+        "clean": clean,
+        "noisy": [dict(r, query=noisy(r["query"], rng, args.noise)) for _ in range(args.copies) for r in clean],
+    }
+
+    print(f"{'corpus':<7} {'fuzzy':<6} {'needs model':>12} {'rule acc':>9} {'labels/q':>9} {'cold us':>8} {'warm us':>8}")
+    for name, rows in corpora.items():
+        for fuzzy in (False, True):
+            nlp_utils.RULE_FUZZY_KEYWORDS = fuzzy
+            m = measure(rows)
+            print(f"{name:<7} {'on' if fuzzy else 'off':<6} {m['needs_model']:>12.1%} {m['accuracy']:>9.1%} "
+                  f"{m['labels']:>9.1f} {m['cold_us']:>8.1f} {m['warm_us']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
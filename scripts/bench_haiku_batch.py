@@ -0,0 +1,97 @@
+"""
+scripts/bench_haiku_batch.py
+----------------------------------------
+Completion calls and prompt/completion tokens per 1,000 queries for the Haiku
+batch path (`parse_nlp_batch` with NLP_MODE=haiku) at different
+HAIKU_BATCH_SIZE values, against the local completions stub. The stub
+answers with the rule engine's label; `--drop` makes it leave out that
+fraction of batch answers to exercise the single-query fallback.
+
+Tokens are estimated at 4 characters per token.
+
+Usage:
+    python scripts/bench_haiku_batch.py [--batch-sizes 1 5 10 20 40] [--queries 1000] [--drop 0.02]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from haiku_stub import HaikuStub
+from aws_cli_assistant.core import nlp_utils
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+class StubCompletions:
+    """Just enough of `anthropic.Anthropic` for `nlp_utils`: completions.create over HTTP."""
+
+    def __init__(self, url):
+        self._http = httpx.Client(base_url=url)
+        self.completions = self
+        self.completion_chars = 0
+
+    def create(self, model, prompt, max_tokens_to_sample):
+        resp = self._http.post("/v1/complete", json={"model": model, "prompt": prompt,
+                                                      "max_tokens_to_sample": max_tokens_to_sample})
+        resp.raise_for_status()
+        text = resp.json()["completion"]
+        self.completion_chars += len(text)
+        return type("Completion", (), {"completion": text})()
+
+
+def make_answer(drop, rng):
+    def answer(prompt):
+        if "Answers:" not in prompt:
+            query = prompt.split("Request: ", 1)[1].rsplit("\nLabel:", 1)[0]
+            return " " + nlp_utils._rule_intent_and_entities(query)[0]
+        lines = [line.split(". ", 1) for line in prompt.split("Answers:")[0].splitlines() if line[:1].isdigit()]
+        return "\n".join(f"{n}: {nlp_utils._rule_intent_and_entities(q)[0]}"
+                         for n, q in lines if rng.random() >= drop)
+    return answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 5, 10, 20, 40])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--drop", type=float, default=0.02)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line)["query"] for line in f if line.strip()]
+    # distinct strings so the intent cache can't answer repeats
+    queries = [f"{corpus[i % len(corpus)]} #{i}" for i in range(args.queries)]
+
+    nlp_utils.NLP_MODE, nlp_utils.ENABLE_ML = "haiku", False
+    print(f"{'batch':>5} {'calls':>7} {'prompt tok':>11} {'compl tok':>10} {'fallbacks':>10} {'wall s':>7} {'agree':>7}")
+    reference = None
+    for size in args.batch_sizes:
+        with HaikuStub(answer=make_answer(args.drop, random.Random(0))) as stub:
+            client = StubCompletions(stub.url)
+            nlp_utils._haiku_client, nlp_utils.HAIKU_BATCH_SIZE = client, size
+            nlp_utils.clear_intent_cache()
+            start = time.perf_counter()
+            labels = [intent for intent, _ in nlp_utils.parse_nlp_batch(queries)]
+            elapsed = time.perf_counter() - start
+            prompts = [r["prompt"] for r in stub.requests]
+        reference = reference or labels
+        fallbacks = sum("Answers:" not in p for p in prompts) if size > 1 else 0
+        scale = 1000 / len(queries)
+        agree = sum(a == b for a, b in zip(labels, reference)) / len(labels)
+        print(f"{size:>5} {len(prompts) * scale:>7.0f} {sum(map(len, prompts)) / 4 * scale:>11,.0f} "
+              f"{client.completion_chars / 4 * scale:>10,.0f} {fallbacks * scale:>10.0f} {elapsed:>7.2f} {agree:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+scripts/bench_label_pruning.py
+----------------------------------------
+Accuracy/latency report for candidate-label pruning in `core.nlp_utils`.
+
+Always reports, without loading any model:
+ - how many labels the detector passes on average (vs the full INTENTS set)
+ - recall: how often the labelled intent survives pruning
+ - how often detection is ambiguous and falls back to the full set
+
+With --model it also classifies every query twice (full vs pruned labels)
+with the configured ML_BACKEND and reports final-label agreement, accuracy
+and latency. Both runs go through `_top_label`, whose threshold is scaled to
+the number of labels scored (see `nlp_utils._threshold`), so agreement is
+what the cascade would see. Requires torch + transformers for that part.
+
+Usage:
+    python scripts/bench_label_pruning.py [--corpus PATH] [--model]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import nlp_utils
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def classify(classifier, query, labels):
+    start = time.perf_counter()
+    res = classifier(query, candidate_labels=labels, multi_label=False)
+    return nlp_utils._top_label(res) or "unknown", (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--model", action="store_true", help="also run the classifier with full vs pruned labels")
+    args = parser.parse_args()
+
+    rows = load_corpus(args.corpus)
+    pruned = [nlp_utils._candidate_labels(r["query"]) for r in rows]
+    full = len(nlp_utils.INTENTS)
+    recall = sum(r["intent"] in labels for r, labels in zip(rows, pruned)) / len(rows)
+    fallback = sum(len(labels) == full for labels in pruned) / len(rows)
+
+    print(f"corpus:              {len(rows)} queries")
+    print(f"labels per query:    {statistics.mean(map(len, pruned)):.1f} (full set: {full})")
+    print(f"full-set fallback:   {fallback:.1%}")
+    print(f"candidate recall:    {recall:.1%}")
+
+    if not args.model:
+        return
+
+    classifier = nlp_utils._get_local_classifier()
+    if classifier is None:
+        raise SystemExit("local classifier could not be loaded (see log)")
+    classify(classifier, rows[0]["query"], nlp_utils.INTENTS)  # warm-up
+
+    full_ms, pruned_ms, agree, acc_full, acc_pruned = [], [], 0, 0, 0
+    for row, labels in zip(rows, pruned):
+        a, t_full = classify(classifier, row["query"], nlp_utils.INTENTS)
+        b, t_pruned = classify(classifier, row["query"], labels)
+        full_ms.append(t_full)
+        pruned_ms.append(t_pruned)
+        agree += a == b
+        acc_full += a == row["intent"]
+        acc_pruned += b == row["intent"]
+        if a != b:
+            print(f"  changed: {row['query']!r}: {a} -> {b}")
+
+    n = len(rows)
+    print(f"label agreement:     {agree / n:.1%}")
+    print(f"accuracy full:       {acc_full / n:.1%}   p50 {statistics.median(full_ms):.1f} ms")
+    print(f"accuracy pruned:     {acc_pruned / n:.1%}   p50 {statistics.median(pruned_ms):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
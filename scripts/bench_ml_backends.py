@@ -0,0 +1,94 @@
+"""
+scripts/bench_ml_backends.py
+----------------------------------------
+Load time, per-query latency, peak RSS and label agreement of the local ML
+backends on the sample query corpus. Each backend runs in its own process so
+RSS figures are not polluted by the others; the first backend listed is the
+reference for agreement.
+
+Requires torch + transformers (onnxruntime for `onnx`) and the models
+downloaded or cached.
+
+Usage:
+    python scripts/bench_ml_backends.py [--backends zero-shot onnx embedding] [--corpus PATH]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(backend, corpus):
+    os.environ["ML_BACKEND"] = backend
+    from aws_cli_assistant.core import nlp_utils
+
+    rows = load_corpus(corpus)
+    start = time.perf_counter()
+    classifier = nlp_utils._get_local_classifier()
+    load_s = time.perf_counter() - start
+    if classifier is None:
+        raise SystemExit(f"backend {backend!r} could not be loaded (see log)")
+
+    latencies, labels = [], []
+    for i, row in enumerate([rows[0]] + rows):  # first call is warm-up
+        start = time.perf_counter()
+        res = classifier(row["query"], candidate_labels=nlp_utils.INTENTS, multi_label=False)
+        if i:
+            latencies.append((time.perf_counter() - start) * 1000)
+            labels.append(nlp_utils._top_label(res) or "unknown")
+    print(json.dumps({"load_s": load_s, "latencies": latencies, "labels": labels, "rss_mb": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["zero-shot", "onnx", "embedding"])
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.corpus)
+        return
+
+    rows = load_corpus(args.corpus)
+    reference = None
+    print(f"{'backend':<12} {'load s':>8} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>8} {'accuracy':>9} {'agree':>7}")
+    for name in args.backends:
+        out = subprocess.run([sys.executable, __file__, "--worker", name, "--corpus", args.corpus],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{name:<12} failed: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        stats = json.loads(out.stdout.strip().splitlines()[-1])
+        labels, latencies = stats["labels"], stats["latencies"]
+        reference = reference or labels
+        accuracy = sum(l == r["intent"] for l, r in zip(labels, rows)) / len(rows)
+        agree = sum(a == b for a, b in zip(labels, reference)) / len(rows)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:<12} {stats['load_s']:8.1f} {statistics.median(latencies):8.1f} {p95:8.1f} "
+              f"{stats['rss_mb']:8.0f} {accuracy:9.1%} {agree:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
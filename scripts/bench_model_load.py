@@ -0,0 +1,127 @@
+"""
+scripts/bench_model_load.py
+----------------------------------------
+Cold-load time and shared vs private RSS of N independent processes loading
+the same model, with memory-mapped safetensors weights (MODEL_MMAP=true) and
+with regular deserialization (MODEL_MMAP=false).
+
+Each process is a fresh interpreter (spawn, like separate containers on one
+host). It loads the model, waits until every sibling has loaded, then reads
+its own /proc/self/smaps_rollup.
+
+Without torch/transformers, --synthetic-mb writes a safetensors file of
+that many MB of float32 weights and compares `model_cache.mmap_arrays`
+against reading every tensor into private memory; this isolates the weight
+loading path from model construction.
+
+Linux only. Usage:
+    python scripts/bench_model_load.py [--procs 4] [--synthetic-mb 400]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TENSOR_MB = 16
+
+
+def write_synthetic(path, total_mb):
+    import numpy as np
+
+    n = TENSOR_MB * 1024 * 1024 // 4
+    count = max(1, total_mb // TENSOR_MB)
+    header = {f"layer.{i}.weight": {"dtype": "F32", "shape": [n], "data_offsets": [i * n * 4, (i + 1) * n * 4]}
+              for i in range(count)}
+    raw = json.dumps(header).encode()
+    rng = np.random.default_rng(0)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(raw)) + raw)
+        for _ in range(count):
+            f.write(rng.standard_normal(n, dtype=np.float32).tobytes())
+
+
+def load_synthetic(path, mmap):
+    import numpy as np
+    from aws_cli_assistant.core import model_cache
+
+    if mmap:
+        arrays = model_cache.mmap_arrays(path)
+    else:
+        header, start = model_cache.read_header(path)
+        arrays = {}
+        with open(path, "rb") as f:
+            for name, info in header.items():
+                begin, end = info["data_offsets"]
+                f.seek(start + begin)
+                arrays[name] = np.frombuffer(f.read(end - begin), dtype=np.float32).copy()
+    # touch every weight, as the first forward pass would
+    checksum = sum(float(a.sum()) for a in arrays.values())
+    return arrays, checksum
+
+
+def child(synthetic, mmap, barrier, results):
+    os.environ["MODEL_MMAP"] = "true" if mmap else "false"
+    start = time.monotonic()
+    if synthetic:
+        model = load_synthetic(synthetic, mmap)
+    else:
+        from aws_cli_assistant.core import nlp_utils
+        model = nlp_utils._build_local_classifier("zero-shot")
+        model("warm up", ["list_s3_buckets", "unknown"])
+    load_s = time.monotonic() - start
+    barrier.wait()
+    from aws_cli_assistant.core.model_cache import memory_usage
+    results.put(dict(memory_usage(), load_s=round(load_s, 3), pid=os.getpid()))
+    barrier.wait()           # keep the mapping alive until every sibling has measured
+    del model
+
+
+def run(procs, synthetic, mmap):
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(procs), ctx.Queue()
+    workers = [ctx.Process(target=child, args=(synthetic, mmap, barrier, results)) for _ in range(procs)]
+    for w in workers:
+        w.start()
+    rows = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+    return sorted(rows, key=lambda r: r["load_s"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--synthetic-mb", type=int, default=0,
+                        help="benchmark a synthetic safetensors file of this size instead of the zero-shot model")
+    args = parser.parse_args()
+
+    synthetic = None
+    if args.synthetic_mb:
+        synthetic = os.path.join(tempfile.mkdtemp(), "model.safetensors")
+        write_synthetic(synthetic, args.synthetic_mb)
+
+    print(f"{'weights':<8}{'procs':>6}{'load s (min/max)':>20}{'rss MB':>9}{'shared MB':>11}{'private MB':>12}{'host MB':>9}")
+    for mmap in (False, True):
+        rows = run(args.procs, synthetic, mmap)
+        loads = [r["load_s"] for r in rows]
+        avg = lambda key: sum(r[key] for r in rows) / len(rows)
+        # host cost: what the processes hold between them, shared pages counted once
+        host = sum(r["pss_mb"] for r in rows)
+        print(f"{'mmap' if mmap else 'copy':<8}{args.procs:>6}{f'{min(loads):.2f}/{max(loads):.2f}':>20}"
+              f"{avg('rss_mb'):>9.0f}{avg('shared_mb'):>11.0f}{avg('private_mb'):>12.0f}{host:>9.0f}")
+
+    if synthetic:
+        os.remove(synthetic)
+
+
+if __name__ == "__main__":
+    main()
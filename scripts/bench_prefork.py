@@ -0,0 +1,80 @@
+"""
+scripts/bench_prefork.py
+----------------------------------------
+Per-worker memory and aggregate throughput of the pre-fork pool as the
+worker count grows. The model is loaded once in the parent; each worker
+reports its RSS, PSS (RSS with shared pages split between sharers) and
+private bytes from /proc/self/smaps_rollup after classifying its share of
+the corpus.
+
+Linux only (fork + smaps_rollup). Without torch the pool still runs on the
+rules path, which measures pool overhead rather than model sharing.
+
+Usage:
+    python scripts/bench_prefork.py [--workers 1 2 4] [--repeat 20] [--corpus PATH]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant import prefork
+from aws_cli_assistant.core import nlp_utils
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+def smaps_mb():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss": fields.get("Rss", 0), "pss": fields.get("Pss", 0), "private": private}
+
+
+def classify_chunk(chunk):
+    # no cache: every query must pay for classification
+    nlp_utils.clear_intent_cache()
+    nlp_utils.parse_nlp_batch(chunk)
+    return os.getpid(), smaps_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=nlp_utils.ML_BATCH_SIZE)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        queries = [json.loads(line)["query"] for line in f if line.strip()] * args.repeat
+    chunks = [queries[i:i + args.chunk_size] for i in range(0, len(queries), args.chunk_size)]
+
+    start = time.perf_counter()
+    prefork.prepare_shared_model()
+    print(f"model: {nlp_utils.model_status()['active_backend']}, loaded in {time.perf_counter() - start:.1f}s")
+    print(f"parent: {smaps_mb()['rss']:.0f} MB RSS")
+    print(f"{'workers':>7} {'q/s':>10} {'RSS/worker':>11} {'PSS/worker':>11} {'private/worker':>15}")
+
+    for n in args.workers:
+        with prefork.worker_pool(n) as pool:
+            start = time.perf_counter()
+            reports = dict(pool.imap_unordered(classify_chunk, chunks))
+            elapsed = time.perf_counter() - start
+        mean = {k: sum(r[k] for r in reports.values()) / len(reports) for k in ("rss", "pss", "private")}
+        print(f"{n:>7} {len(queries) / elapsed:>10,.0f} {mean['rss']:>8.0f} MB {mean['pss']:>8.0f} MB "
+              f"{mean['private']:>12.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+scripts/bench_rule_engine.py
+----------------------------------------
+Microbenchmark for the rule engine in `core.nlp_utils`.
+
+Compares the compiled single-pass rule table against the previous cascade of
+`re.search` calls (kept below verbatim as `legacy_rule_intent_and_entities`)
+on the sample query corpus, and reports intent agreement between the two.
+
+Usage:
+    python scripts/bench_rule_engine.py [--corpus PATH] [--repeat N]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.nlp_utils import _rule_intent_and_entities
+
+DEFAULT_CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+def legacy_rule_intent_and_entities(text):
+    t = text.lower()
+    r = re.search(r"(?:in\s+|region\s+)(us-[a-z0-9-]+)", t)
+    region = r.group(1) if r else None
+    if re.search(r"\b(create|make)\b.*\b(s3|bucket)\b", t):
+        m = re.search(r"(?:named|called|name(?:d)?|bucket\s+named|bucket\s+)([a-z0-9][a-z0-9\-\.]{2,62})", t)
+        return "create_s3_bucket", {"bucket": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(s3|buckets)\b", t):
+        return "list_s3_buckets", {"region": region}
+    if re.search(r"\b(create|make)\b.*\b(dynamo|dynamodb|table)\b", t):
+        m = re.search(r"(?:table\s+named|table\s+)([A-Za-z0-9_\-]+)", t)
+        return "create_dynamodb_table", {"table": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(dynamo|tables)\b", t):
+        return "list_dynamodb_tables", {"region": region}
+    m_start = re.search(r"\b(start|run)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
+    if m_start:
+        return "start_ec2_instance", {"instance_id": m_start.group(3), "region": region}
+    m_stop = re.search(r"\b(stop|terminate)\b.*\b(ec2|instance)\b.*\b(i-[0-9a-fA-F]+)\b", t)
+    if m_stop:
+        return "stop_ec2_instance", {"instance_id": m_stop.group(3), "region": region}
+    if re.search(r"\b(list|show|describe)\b.*\b(ec2|instances)\b", t):
+        m_tag = re.search(r"tag\s+([A-Za-z0-9\-_]+)=([A-Za-z0-9\-_]+)", t)
+        return "describe_ec2_instances", {"region": region, "tag": {m_tag.group(1): m_tag.group(2)} if m_tag else None}
+    if re.search(r"\b(create|add)\b.*\b(iam|user)\b", t):
+        m = re.search(r"(?:user\s+named|user\s+)([A-Za-z0-9_\-]+)", t)
+        return "create_iam_user", {"user": m.group(1) if m else None}
+    if re.search(r"\b(list|show)\b.*\b(iam|users)\b", t):
+        return "list_iam_users", {}
+    if re.search(r"\b(invoke|call)\b.*\b(lambda)\b", t):
+        m = re.search(r"(?:function\s+named|function\s+|named\s+)([A-Za-z0-9_\-]+)", t)
+        return "invoke_lambda", {"function": m.group(1) if m else None, "region": region}
+    if re.search(r"\b(list|show)\b.*\b(lambda|functions)\b", t):
+        return "list_lambda_functions", {"region": region}
+    return ("unknown", {})
+
+
+def load_queries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["query"] for line in f if line.strip()]
+
+
+def throughput(fn, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    elapsed = time.perf_counter() - start
+    return len(queries) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    queries = load_queries(args.corpus)
+    agree = sum(legacy_rule_intent_and_entities(q)[0] == _rule_intent_and_entities(q)[0] for q in queries)
+
+    before = throughput(legacy_rule_intent_and_entities, queries, args.repeat)
+    after = throughput(_rule_intent_and_entities, queries, args.repeat)
+
+    print(f"corpus:          {len(queries)} queries x {args.repeat}")
+    print(f"intent agreement: {agree}/{len(queries)}")
+    print(f"legacy cascade:  {before:12,.0f} queries/s")
+    print(f"compiled rules:  {after:12,.0f} queries/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+scripts/haiku_stub.py
+----------------------------------------
+Local stand-in for the Anthropic text completions endpoint
+(`POST /v1/complete`), for tests and benchmarks of the Haiku path without
+network access or an API key.
+
+Every request is recorded (prompt, client port); `fail_with` queues HTTP
+status codes to return before answering normally, `delay` slows every
+answer down, and `answer(prompt) -> completion` decides what comes back.
+
+Usage:
+    python scripts/haiku_stub.py [--port 8787]
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8787 ANTHROPIC_API_KEY=stub NLP_MODE=haiku ...
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class HaikuStub:
+    def __init__(self, answer=None, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.answer = answer or (lambda prompt: " unknown")
+        self.delay = delay
+        self.fail_with = []
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append({"prompt": body["prompt"], "port": self.client_address[1],
+                                          "api_key": self.headers.get("x-api-key")})
+                    status = stub.fail_with.pop(0) if stub.fail_with else 200
+                time.sleep(stub.delay)
+                if self.path != "/v1/complete":
+                    status = 404
+                payload = {"completion": stub.answer(body["prompt"]), "stop_reason": "stop_sequence",
+                           "model": body.get("model")} if status == 200 else {"error": {"type": "stub_error"}}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    with HaikuStub(delay=args.delay, port=args.port) as stub:
+        print(f"Haiku stub listening on {stub.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
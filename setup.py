@@ -37,6 +37,8 @@ setup(
         'transformers>=4.57.0',
         'torch>=2.5.0',
         'anthropic>=0.70.0',
+        'httpx>=0.27.0',
+        'numpy>=1.24.0',
         'python-dotenv>=1.2.0',
     ],
     
@@ -45,6 +47,10 @@ setup(
             'pytest>=7.0.0',
             'pytest-cov>=4.0.0',
         ],
+        'onnx': [
+            'onnxruntime>=1.17.0',
+            'onnx>=1.15.0',
+        ],
     },
     
     python_requires='>=3.10',
@@ -56,7 +62,7 @@ setup(
     },
     
     package_data={
-        'aws_cli_assistant.config': ['defaults.json'],
+        'aws_cli_assistant.config': ['defaults.json', 'intent_examples.json'],
     },
     
     classifiers=[
@@ -0,0 +1,5 @@
+"""Shared test setup."""
+import os
+
+# importing mcp_server adds the telemetry file sink; keep test runs from writing logs into the repo
+os.environ["TELEMETRY_LOG_PATH"] = ""
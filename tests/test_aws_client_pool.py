@@ -0,0 +1,100 @@
+"""Pooled boto3 clients in aws_validator: reuse, thread-safe creation and eviction, against the local AWS stub."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import threading
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+boto3 = pytest.importorskip("boto3")
+
+from aws_stub import AwsStub
+from aws_cli_assistant.core import aws_validator
+from aws_cli_assistant.core.timing import trace
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with AwsStub() as s:
+        monkeypatch.setenv("AWS_ENDPOINT_URL", s.url)
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "stub")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "stub")
+        monkeypatch.delenv("AWS_PROFILE", raising=False)
+        monkeypatch.setattr(aws_validator, "AWS_CREDENTIAL_CHECK_S", 0)
+        aws_validator.evict_clients()
+        yield s
+    aws_validator.evict_clients()
+
+
+def test_client_reused_per_service_and_region(stub):
+    s3 = aws_validator._session_client("s3", "us-east-1")
+    assert aws_validator._session_client("s3", "us-east-1") is s3
+    assert aws_validator._session_client("s3", "us-west-2") is not s3
+    assert aws_validator._session_client("dynamodb", "us-east-1") is not s3
+    assert s3.meta.config.max_pool_connections == aws_validator.AWS_MAX_POOL_CONNECTIONS
+
+
+def test_concurrent_first_use_creates_one_client(stub, monkeypatch):
+    made = []
+    real = boto3.Session.client
+
+    def client(self, *args, **kwargs):
+        made.append(args)
+        return real(self, *args, **kwargs)
+
+    monkeypatch.setattr(boto3.Session, "client", client)
+    barrier = threading.Barrier(8)
+
+    def get(_):
+        barrier.wait()
+        return aws_validator._session_client("lambda", "us-east-1")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(get, range(8)))
+    assert len(made) == 1
+    assert all(c is clients[0] for c in clients)
+
+
+def test_credential_change_evicts(stub, monkeypatch):
+    iam = aws_validator._session_client("iam", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "rotated")
+    fresh = aws_validator._session_client("iam", "us-east-1")
+    assert fresh is not iam
+    assert fresh._request_signer._credentials.access_key == "rotated"
+
+
+def test_evict_clients_by_profile(stub):
+    aws_validator._session_client("s3", "us-east-1")
+    aws_validator._session_client("ec2", "us-east-1")
+    assert aws_validator.evict_clients("other") == 0
+    assert aws_validator.evict_clients(None) == 2
+    assert aws_validator._clients == {}
+
+
+def test_auth_error_evicts(stub, monkeypatch):
+    aws_validator._session_client("s3", "us-east-1")
+
+    def rejected(e, result):
+        from botocore.exceptions import ClientError
+        raise ClientError({"Error": {"Code": "ExpiredToken", "Message": "expired"}}, "ListBuckets")
+
+    spec = aws_validator.get_intent("list_s3_buckets")._replace(validate=rejected)
+    monkeypatch.setattr(aws_validator, "get_intent", lambda intent: spec)
+    assert aws_validator.validate_command_safe("list_s3_buckets", {})["status"] == "error"
+    assert aws_validator._clients == {}
+
+
+def test_validations_share_connections(stub):
+    queries = [("list_s3_buckets", {}), ("list_dynamodb_tables", {}), ("list_lambda_functions", {}),
+               ("list_iam_users", {}), ("list_ec2_instances", {})] * 4
+    with trace("req") as t:
+        results = [aws_validator.validate_command_safe(*q) for q in queries]
+    assert {r["status"] for r in results} == {"valid"}
+    assert results[0]["detail"] == {"buckets": ["stub-bucket"]}
+    assert results[1]["detail"] == {"tables": ["stub-table"]}
+    assert len(stub.requests) == 20
+    assert stub.connections() == 5                    # one keep-alive connection per client
+    assert len(t.to_dict()["aws_calls"]) == 20         # pooled clients are still timed
@@ -0,0 +1,94 @@
+"""Streaming bulk generation: ordering, bounded reads, concurrency and JSONL output."""
+from pathlib import Path
+import itertools
+import json
+import sys
+import time
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import fanout
+from aws_cli_assistant.core.bulk_generator import generate_commands, write_jsonl
+
+QUERIES = ["list my s3 buckets", "list lambda functions", "create s3 bucket named foo", "list iam users"]
+
+
+@pytest.fixture
+def slow_validation(monkeypatch):
+    """Validation that sleeps `delays[intent]` seconds (default 0) instead of calling AWS."""
+    delays = {}
+
+    def validate(intent, entities):
+        time.sleep(delays.get(intent, 0))
+        return {"status": "valid", "reason": "stub"}
+
+    monkeypatch.setattr(fanout, "validate_command_safe", validate)
+    return delays
+
+
+def test_ordered_output_keeps_input_order(slow_validation):
+    slow_validation["list_s3_buckets"] = 0.2
+    results = list(generate_commands(["", *QUERIES], batch_size=2, concurrency=4))
+    assert [r["query"] for r in results] == QUERIES
+    assert [r["line"] for r in results] == [2, 3, 4, 5]     # blank line skipped, still counted
+    assert results[0]["command"] == "aws s3api list-buckets"
+    assert results[0]["validation"]["status"] == "valid"
+
+
+def test_unordered_output_yields_as_completed(slow_validation):
+    slow_validation["list_s3_buckets"] = 0.3
+    results = list(generate_commands(QUERIES, batch_size=4, concurrency=4, ordered=False))
+    assert sorted(r["query"] for r in results) == sorted(QUERIES)
+    assert results[-1]["query"] == "list my s3 buckets"
+
+
+def test_validation_runs_concurrently(slow_validation):
+    for intent in ("list_s3_buckets", "list_lambda_functions", "create_s3_bucket", "list_iam_users"):
+        slow_validation[intent] = 0.1
+    start = time.perf_counter()
+    assert len(list(generate_commands(QUERIES * 4, batch_size=4, concurrency=16))) == 16
+    assert time.perf_counter() - start < 0.8      # 1.6 s one at a time
+
+
+def test_input_read_lazily(slow_validation):
+    read = 0
+
+    def endless():
+        nonlocal read
+        for n in itertools.count():
+            read += 1
+            yield QUERIES[n % len(QUERIES)]
+
+    stream = generate_commands(endless(), batch_size=4, concurrency=2, window=8)
+    first = list(itertools.islice(stream, 10))
+    stream.close()
+    assert len(first) == 10
+    # in flight + the batch being classified + the batch just read
+    assert read <= 10 + 8 + 2 * 4
+
+
+def test_failing_query_reported_not_raised(slow_validation, monkeypatch):
+    real = fanout.generate_command
+
+    def generate(intent, entities, query):
+        if intent == "list_iam_users":
+            raise RuntimeError("boom")
+        return real(intent, entities, query)
+
+    monkeypatch.setattr(fanout, "generate_command", generate)
+    results = list(generate_commands(QUERIES))
+    assert results[3]["error"] == "boom"
+    assert all("error" not in r for r in results[:3])
+
+
+def test_write_jsonl(tmp_path, slow_validation):
+    src, dest = tmp_path / "queries.txt", tmp_path / "out.jsonl"
+    src.write_text("\n".join(QUERIES) + "\n")
+    counts = write_jsonl(str(src), str(dest), validate=False)
+    assert counts["queries"] == 4 and counts["errors"] == 0
+    rows = [json.loads(line) for line in dest.read_text().splitlines()]
+    assert [r["intent"] for r in rows] == ["list_s3_buckets", "list_lambda_functions", "create_s3_bucket",
+                                          "list_iam_users"]
+    assert "validation" not in rows[0]
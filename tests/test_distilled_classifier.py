@@ -0,0 +1,118 @@
+"""Tests for the distilled n-gram classifier: dataset building, training and deferral."""
+import json
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip("numpy")
+
+from aws_cli_assistant.core import distilled_classifier as dc
+from aws_cli_assistant.core import nlp_utils
+
+CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+@pytest.fixture(scope="module")
+def model():
+    return dc.train(dc.build_dataset([str(CORPUS)]), nlp_utils.INTENTS, epochs=200)
+
+
+def _telemetry_line(event, details):
+    payload = {"timestamp": 0, "event": event, "details": details}
+    return json.dumps({"text": "...", "record": {"message": repr(payload)}})
+
+
+def test_build_dataset_from_logs(tmp_path):
+    log = tmp_path / "telemetry.log"
+    log.write_text("\n".join([
+        _telemetry_line("http.request", {"path": "/generate", "query": "list iam users"}),
+        _telemetry_line("cli.interaction", {"query": "what storage do i own", "intent": "list_s3_buckets",
+                                            "nlp_stage": "haiku"}),
+        _telemetry_line("cli.interaction", {"query": "list my buckets", "intent": "invoke_lambda",
+                                            "nlp_stage": "rules"}),
+        _telemetry_line("cli.batch", {"count": 2}),
+        _telemetry_line("response.emitted", {"query": "which tables have i got",
+                                             "result_summary": {"intent": "list_dynamodb_tables", "nlp_stage": "ml"}}),
+        _telemetry_line("http.nlp", {"query": "what code runs for me", "intent": "list_lambda_functions",
+                                     "nlp_stage": "haiku"}),
+        "not json",
+    ]))
+    queries = tmp_path / "requests.jsonl"
+    queries.write_text(json.dumps({"query": "tell me a joke"}) + "\n"
+                       + json.dumps({"query": "halt the box", "intent": "stop_ec2_instance"}) + "\n")
+
+    data = dc.build_dataset([str(log), str(queries)], examples_path=None)
+    assert data == [
+        ("list iam users", "list_iam_users"),            # unlabelled -> rules
+        ("what storage do i own", "list_s3_buckets"),    # model-labelled telemetry is trusted
+        ("list my buckets", "list_s3_buckets"),          # rules-stage label is re-derived
+        ("which tables have i got", "list_dynamodb_tables"),   # MCP response
+        ("what code runs for me", "list_lambda_functions"),    # HTTP /generate
+        ("halt the box", "stop_ec2_instance"),           # explicit label
+    ]                                                    # rule "unknown" rows are dropped
+
+
+def test_trained_model_fits_corpus(model):
+    rows = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    hits = sum(model.labels[int(np.argmax(model.probabilities(r["query"])))] == r["intent"] for r in rows)
+    assert hits / len(rows) > 0.9
+
+
+def test_save_load_roundtrip(model, tmp_path):
+    path = tmp_path / "distilled.npz"
+    model.save(str(path))
+    loaded = dc.DistilledModel.load(str(path))
+    assert loaded.labels == model.labels and loaded.digest == model.digest
+    assert np.allclose(loaded.probabilities("list iam users"), model.probabilities("list iam users"), atol=1e-2)
+    assert path.stat().st_size < 512 * 1024
+
+
+def test_classifier_pipeline_contract(model):
+    clf = dc.DistilledClassifier(model, threshold=0.0)
+    res = clf("list my s3 buckets", candidate_labels=["list_s3_buckets", "list_iam_users"])
+    assert res["labels"][0] == "list_s3_buckets"
+    assert set(res["labels"]) == {"list_s3_buckets", "list_iam_users"}
+    assert sum(res["scores"]) == pytest.approx(1.0)
+    assert len(clf(["list iam users", "list my s3 buckets"], candidate_labels=nlp_utils.INTENTS)) == 2
+
+
+def test_low_confidence_defers_to_fallback(model):
+    calls = []
+
+    def big_model(inputs, candidate_labels, multi_label=False, batch_size=None):
+        calls.append(list(inputs))
+        return [{"labels": ["invoke_lambda"], "scores": [0.99]} for _ in inputs]
+
+    loads = []
+    clf = dc.DistilledClassifier(model, threshold=0.999, fallback=lambda: loads.append(1) or big_model)
+    res = clf(["list my s3 buckets", "zzzz qqqq"], candidate_labels=nlp_utils.INTENTS)
+    assert [r["labels"][0] for r in res] == ["invoke_lambda", "invoke_lambda"]
+    assert calls and clf.deferred == 2
+
+    confident = dc.DistilledClassifier(model, threshold=0.0, fallback=lambda: loads.append(1) or big_model)
+    confident("list my s3 buckets", candidate_labels=nlp_utils.INTENTS)
+    assert loads == [1]    # only the unsure classifier ever loaded the big model
+
+
+def test_unknown_candidate_labels_go_to_fallback(model):
+    def big_model(inputs, candidate_labels, multi_label=False, batch_size=None):
+        return [{"labels": list(candidate_labels), "scores": [1.0]} for _ in inputs]
+
+    res = dc.DistilledClassifier(model, fallback=lambda: big_model)("list sns topics", candidate_labels=["list_sns_topics"])
+    assert res == {"labels": ["list_sns_topics"], "scores": [1.0]}
+    alone = dc.DistilledClassifier(model)("list sns topics", candidate_labels=["list_sns_topics"])
+    assert alone == {"labels": [], "scores": []}
+
+
+def test_backend_bootstraps_model_file(tmp_path, monkeypatch):
+    path = tmp_path / "model.npz"
+    monkeypatch.setattr(dc, "DISTILLED_FALLBACK", "none")
+    monkeypatch.setattr(nlp_utils, "ML_BACKEND", "distilled")
+    monkeypatch.setattr(dc, "load_distilled_classifier",
+                        lambda fallback=None, load=dc.load_distilled_classifier: load(str(path), fallback))
+    clf = nlp_utils._build_local_classifier()
+    assert path.exists()
+    assert clf("list iam users", candidate_labels=nlp_utils.INTENTS)["labels"][0] == "list_iam_users"
@@ -0,0 +1,83 @@
+"""Tests for the embedding-similarity backend with a deterministic fake encoder."""
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip("numpy")
+
+from aws_cli_assistant.core.embedding_classifier import EmbeddingClassifier, load_examples
+
+
+class BagOfWordsEncoder:
+    """Hashes words into a fixed-size vector; similar wording -> high cosine."""
+
+    name = "bag-of-words"
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.encoded = 0
+
+    def encode(self, texts, batch_size=32):
+        self.encoded += len(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, hash(word) % self.dim] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+EXAMPLES = {
+    "list_s3_buckets": ["list my s3 buckets", "show all buckets"],
+    "list_iam_users": ["list iam users", "show all users"],
+    "unknown": ["what is the weather"],
+}
+
+
+def test_classifies_with_pipeline_contract(tmp_path):
+    clf = EmbeddingClassifier(BagOfWordsEncoder(), EXAMPLES, index_path=str(tmp_path / "idx.npz"))
+    res = clf("please list my s3 buckets")
+    assert res["labels"][0] == "list_s3_buckets"
+    assert sorted(res["labels"]) == sorted(EXAMPLES)
+    assert res["scores"] == sorted(res["scores"], reverse=True)
+    assert sum(res["scores"]) == pytest.approx(1.0)
+
+
+def test_batch_input_returns_list_in_order(tmp_path):
+    clf = EmbeddingClassifier(BagOfWordsEncoder(), EXAMPLES, index_path=None)
+    res = clf(["show all users", "list my s3 buckets"], candidate_labels=list(EXAMPLES), batch_size=4)
+    assert [r["labels"][0] for r in res] == ["list_iam_users", "list_s3_buckets"]
+
+
+def test_candidate_labels_restrict_output(tmp_path):
+    clf = EmbeddingClassifier(BagOfWordsEncoder(), EXAMPLES, index_path=None)
+    res = clf("list my s3 buckets", candidate_labels=["list_iam_users", "unknown"])
+    assert set(res["labels"]) == {"list_iam_users", "unknown"}
+    assert sum(res["scores"]) == pytest.approx(1.0)
+
+
+def test_unknown_candidate_labels_give_empty_answer():
+    clf = EmbeddingClassifier(BagOfWordsEncoder(), EXAMPLES, index_path=None)
+    assert clf("list my sns topics", candidate_labels=["list_sns_topics"]) == {"labels": [], "scores": []}
+    assert clf(["a", "b"], candidate_labels=["list_sns_topics"]) == [{"labels": [], "scores": []}] * 2
+
+
+def test_index_is_persisted_and_reused(tmp_path):
+    path = str(tmp_path / "idx.npz")
+    EmbeddingClassifier(BagOfWordsEncoder(), EXAMPLES, index_path=path)
+
+    encoder = BagOfWordsEncoder()
+    EmbeddingClassifier(encoder, EXAMPLES, index_path=path)
+    assert encoder.encoded == 0
+
+    changed = dict(EXAMPLES, unknown=["tell me a joke"])
+    EmbeddingClassifier(encoder, changed, index_path=path)
+    assert encoder.encoded == 5
+
+
+def test_shipped_examples_cover_every_intent():
+    from aws_cli_assistant.core.nlp_utils import INTENTS
+    assert set(load_examples()) == set(INTENTS)
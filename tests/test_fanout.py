@@ -0,0 +1,114 @@
+"""Region sets and multi-region fan-out with bounded, deadline-capped validation."""
+from pathlib import Path
+import sys
+import threading
+import time
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.config.settings import REGION_GROUPS
+from aws_cli_assistant.core import fanout
+from aws_cli_assistant.core.fanout import fan_out, generate_and_validate
+from aws_cli_assistant.core.nlp_utils import _rule_intent_and_entities
+from aws_cli_assistant.core.regions import region_set
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("list ec2 instances in all us regions", REGION_GROUPS["us"]),
+    ("list ec2 instances in every region", REGION_GROUPS["all"]),
+    ("list tables in eu regions", REGION_GROUPS["eu"]),
+    ("list functions in us-east-1, eu-west-1 and ap-south-1", ["us-east-1", "eu-west-1", "ap-south-1"]),
+    ("list functions in us-west-2", None),
+    ("list functions in two regions", None),
+])
+def test_region_set(query, expected):
+    assert region_set(query) == expected
+
+
+def test_rule_engine_extracts_region_set():
+    intent, entities = _rule_intent_and_entities("list lambda functions in eu-west-1 and us-east-2")
+    assert intent == "list_lambda_functions"
+    assert entities["region"] == "eu-west-1"
+    assert entities["regions"] == ["eu-west-1", "us-east-2"]
+
+
+@pytest.fixture
+def validations(monkeypatch):
+    """Stub validation: sleeps `delays[region]` seconds and tracks peak concurrency."""
+    state = {"delays": {}, "active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def validate(intent, entities):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(state["delays"].get(entities.get("region"), 0.01))
+        with lock:
+            state["active"] -= 1
+        return {"status": "valid", "region": entities.get("region")}
+
+    monkeypatch.setattr(fanout, "validate_command_safe", validate)
+    return state
+
+
+def test_one_command_per_region(validations):
+    result = generate_and_validate("list_lambda_functions", {"regions": ["us-east-1", "eu-west-1"]})
+    assert result["command"].splitlines() == ["aws lambda list-functions --region us-east-1",
+                                              "aws lambda list-functions --region eu-west-1"]
+    assert [r["region"] for r in result["regions"]] == ["us-east-1", "eu-west-1"]
+    assert all(r["ms"] >= 10 for r in result["regions"])
+    assert result["validation"]["status"] == "valid"
+    assert result["validation"]["reason"] == "Valid in 2/2 regions"
+
+
+def test_concurrency_bounded(validations):
+    fan_out("list_dynamodb_tables", {}, REGION_GROUPS["all"], concurrency=3)
+    assert validations["peak"] == 3
+
+
+def test_slow_region_reported_at_deadline(validations):
+    validations["delays"]["eu-west-1"] = 1.0
+    start = time.perf_counter()
+    result = fan_out("list_dynamodb_tables", {}, ["us-east-1", "eu-west-1", "us-west-2"], deadline_ms=200)
+    assert time.perf_counter() - start < 0.6
+    by_region = {r["region"]: r for r in result["regions"]}
+    assert by_region["eu-west-1"]["validation"]["status"] == "timeout"
+    assert by_region["eu-west-1"]["ms"] is None
+    assert by_region["us-east-1"]["validation"]["status"] == "valid"
+    assert result["validation"]["status"] == "partial"
+    assert result["validation"]["detail"]["regions"]["eu-west-1"] == "timeout"
+
+
+def test_global_service_not_fanned_out(validations):
+    result = generate_and_validate("list_iam_users", {"regions": ["us-east-1", "eu-west-1"]})
+    assert result["command"] == "aws iam list-users"
+    assert "regions" not in result
+
+
+def test_region_free_command_not_fanned_out(validations):
+    result = generate_and_validate("list_s3_buckets", {"regions": REGION_GROUPS["us"]})
+    assert result["command"] == "aws s3api list-buckets"
+    assert "regions" not in result
+
+
+@pytest.mark.parametrize("intent,entities,command", [
+    ("create_s3_bucket", {"bucket": "logs"}, "aws s3api create-bucket --bucket logs --region us-east-1"),
+    ("start_ec2_instance", {"instance_id": "i-0abc"}, "aws ec2 start-instances --instance-ids i-0abc --region us-east-1"),
+])
+def test_mutating_intent_not_fanned_out(validations, intent, entities, command):
+    result = generate_and_validate(intent, dict(entities, regions=["us-east-1", "eu-west-1"]))
+    assert result["command"] == command
+    assert "regions" not in result
+
+
+def test_fan_out_needs_regions(validations):
+    with pytest.raises(ValueError):
+        fan_out("list_dynamodb_tables", {}, [])
+
+
+def test_single_region_group(validations):
+    result = generate_and_validate("list_lambda_functions", {"region": None, "regions": ["sa-east-1"]})
+    assert result["command"] == "aws lambda list-functions --region sa-east-1"
+    assert "regions" not in result
@@ -0,0 +1,178 @@
+"""Tests for the async Haiku client against the local completions stub."""
+import asyncio
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+httpx = pytest.importorskip("httpx")
+
+from haiku_stub import HaikuStub
+from aws_cli_assistant.core import nlp_utils
+from aws_cli_assistant.core.haiku_client import AsyncHaikuClient
+
+
+@pytest.fixture
+def stub():
+    with HaikuStub(answer=lambda prompt: " list_s3_buckets") as s:
+        yield s
+
+
+def _client(stub, **kwargs):
+    kwargs.setdefault("backoff", 0.01)
+    return AsyncHaikuClient("test-key", base_url=stub.url, **kwargs)
+
+
+def test_complete_sends_prompt_and_key(stub):
+    async def run():
+        client = _client(stub)
+        try:
+            return await client.complete("hello")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == " list_s3_buckets"
+    assert stub.requests == [{"prompt": "hello", "port": stub.requests[0]["port"], "api_key": "test-key"}]
+
+
+def test_connections_are_reused(stub):
+    async def run():
+        client = _client(stub)
+        for i in range(5):
+            await client.complete(f"q{i}")
+        await client.aclose()
+
+    asyncio.run(run())
+    assert len(stub.requests) == 5
+    assert len({r["port"] for r in stub.requests}) == 1
+
+
+def test_identical_concurrent_prompts_are_coalesced(stub):
+    stub.delay = 0.2
+
+    async def run():
+        client = _client(stub)
+        results = await asyncio.gather(*[client.complete("same") for _ in range(10)],
+                                       client.complete("other"))
+        stats = client.stats()
+        await client.aclose()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert results == [" list_s3_buckets"] * 11
+    assert sorted(r["prompt"] for r in stub.requests) == ["other", "same"]
+    assert stats["coalesced"] == 9
+    assert stats["inflight"] == 0
+
+
+def test_retries_transient_errors(stub):
+    stub.fail_with = [503, 429]
+
+    async def run():
+        client = _client(stub, max_retries=2)
+        try:
+            return await client.complete("hello"), client.stats()
+        finally:
+            await client.aclose()
+
+    result, stats = asyncio.run(run())
+    assert result == " list_s3_buckets"
+    assert stats["retries"] == 2 and len(stub.requests) == 3
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.fail_with = [503, 503]
+
+    async def run():
+        client = _client(stub, max_retries=1)
+        try:
+            await client.complete("hello")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert len(stub.requests) == 2
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.fail_with = [400]
+
+    async def run():
+        client = _client(stub)
+        try:
+            await client.complete("hello")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert len(stub.requests) == 1
+
+
+def test_read_timeout(stub):
+    stub.delay = 1.0
+
+    async def run():
+        client = _client(stub, read_timeout=0.1, max_retries=0)
+        try:
+            await client.complete("hello")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(run())
+
+
+def test_parse_nlp_async_uses_haiku(stub, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr("aws_cli_assistant.core.haiku_client.HAIKU_BASE_URL", stub.url)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    nlp_utils.clear_intent_cache()
+
+    async def run():
+        try:
+            return await nlp_utils.parse_nlp_detailed_async("what do i have in storage")
+        finally:
+            await nlp_utils.close_async_haiku_client()
+
+    result = asyncio.run(run())
+    assert (result.intent, result.stage) == ("list_s3_buckets", "haiku")
+    assert stub.requests[0]["prompt"] == nlp_utils._haiku_prompt("what do i have in storage")
+    nlp_utils.clear_intent_cache()
+
+
+def test_async_client_closed_with_its_loop(monkeypatch):
+    closed = []
+
+    class FakeClient:
+        async def aclose(self):
+            asyncio.get_running_loop()          # still on an open loop
+            closed.append(self)
+
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr("aws_cli_assistant.core.haiku_client.load_async_haiku_client", FakeClient)
+
+    async def get():
+        client = await nlp_utils._get_async_haiku_client()
+        assert await nlp_utils._get_async_haiku_client() is client
+        return client
+
+    first = asyncio.run(get())
+    assert closed == [first]
+    second = asyncio.run(get())
+    assert second is not first and closed == [first, second]
+    assert len(nlp_utils._async_haiku_clients) == 0
+
+    async def closed_early():
+        client = await nlp_utils._get_async_haiku_client()
+        await nlp_utils.close_async_haiku_client()
+        return client
+
+    third = asyncio.run(closed_early())
+    assert closed == [first, second, third]
+    assert nlp_utils._async_haiku_client is None
@@ -0,0 +1,112 @@
+"""HTTP adapter tests using FastAPI's in-process TestClient.
+
+AWS validation is stubbed out so the tests never reach boto3.
+"""
+import asyncio
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from aws_cli_assistant import http_adapter
+from aws_cli_assistant.core import fanout, nlp_utils
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    nlp_utils.clear_intent_cache()
+    monkeypatch.setattr(fanout, "validate_command_safe", lambda intent, entities: {"status": "valid"})
+    return TestClient(http_adapter.app)
+
+
+def test_generate(client):
+    resp = client.post("/generate", json={"query": "list dynamodb tables"})
+    assert resp.status_code == 200
+    assert resp.json()["command"].startswith("aws dynamodb list-tables")
+
+
+def test_generate_batch_keeps_order(client):
+    queries = ["list iam users", "what is the weather", "list my s3 buckets"]
+    resp = client.post("/generate/batch", json={"queries": queries})
+    assert resp.status_code == 200
+    commands = [r["command"] for r in resp.json()["results"]]
+    assert commands == ["aws iam list-users", "echo 'Unknown service intent'", "aws s3api list-buckets"]
+
+
+def test_generate_batch_runs_off_the_event_loop(client, monkeypatch):
+    loops = []
+
+    def off_loop(real):
+        def call(*args):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return real(*args)
+        return call
+
+    monkeypatch.setattr(http_adapter, "parse_nlp_batch", off_loop(http_adapter.parse_nlp_batch))
+    monkeypatch.setattr(http_adapter, "generate_and_validate", off_loop(http_adapter.generate_and_validate))
+    assert client.post("/generate/batch", json={"queries": ["list iam users", "list s3 buckets"]}).status_code == 200
+    assert loops == [None, None, None]
+
+
+def test_generate_validates_off_the_event_loop(client, monkeypatch):
+    real, loops = http_adapter.generate_and_validate, []
+
+    def generate(*args):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return real(*args)
+
+    monkeypatch.setattr(http_adapter, "generate_and_validate", generate)
+    assert client.post("/generate", json={"query": "list lambda functions in us-east-1 and eu-west-1"}).status_code == 200
+    assert loops == [None]
+
+
+def test_health_reports_model_state(client):
+    body = client.get("/health").json()
+    assert body["status"] == "ok"
+    assert body["model"]["active_backend"] == "rules"
+    assert body["model"]["ml"]["enabled"] is False
+
+
+def test_startup_opens_intent_store(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(nlp_utils, "INTENT_STORE_PATH", str(tmp_path / "intents.sqlite3"))
+    monkeypatch.setattr(nlp_utils, "_store", None)
+    with client:                                        # runs the lifespan
+        assert nlp_utils._store is not None             # before any query
+        store = client.get("/health").json()["intent_store"]
+        assert store["path"] == str(tmp_path / "intents.sqlite3")
+        assert store["preloaded"] == 0
+    nlp_utils._store.close()
+
+
+def test_generate_reports_stage_timings(client):
+    body = client.post("/generate", json={"query": "list dynamodb tables"}).json()
+    spans = {s["name"]: s for s in body["timings"]["spans"]}
+    assert spans["nlp"]["backend"] == "rules"
+    assert spans["generate"]["intent"] == "list_dynamodb_tables"
+    assert body["timings"]["total_ms"] >= spans["nlp"]["ms"]
+    stages = client.get("/stats/latency").json()["stages"]
+    assert stages["http.generate"]["count"] >= 1
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(stages["nlp"])
+
+
+def test_generate_fans_out_region_sets(client):
+    body = client.post("/generate", json={"query": "list dynamodb tables in us-east-1 and eu-west-1"}).json()
+    assert [r["region"] for r in body["regions"]] == ["us-east-1", "eu-west-1"]
+    assert body["command"].splitlines() == ["aws dynamodb list-tables --region us-east-1",
+                                            "aws dynamodb list-tables --region eu-west-1"]
+    assert body["validation"]["status"] == "valid"
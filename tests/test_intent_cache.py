@@ -0,0 +1,57 @@
+"""Unit tests for the bounded LRU + TTL `IntentCache`."""
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.intent_cache import IntentCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_order():
+    cache = IntentCache(maxsize=2, ttl=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = IntentCache(maxsize=8, ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_disabled_when_maxsize_zero():
+    cache = IntentCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_with_predicate():
+    cache = IntentCache(maxsize=8, ttl=0)
+    for key in [("x", "local"), ("y", "local"), ("x", "haiku")]:
+        cache.put(key, key)
+    assert cache.invalidate(lambda k: k[1] == "haiku") == 1
+    assert len(cache) == 2
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
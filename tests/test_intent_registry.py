@@ -0,0 +1,89 @@
+"""Intent registry: dispatch, entity schemas and plugin registration."""
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import intent_registry, nlp_utils
+from aws_cli_assistant.core.command_generator import generate_command
+from aws_cli_assistant.core.intent_registry import (
+    EntityField, IntentSpec, get_intent, intent_names, register_intent, registered_intents, supported_services,
+)
+
+LEGACY_INTENTS = [
+    "create_s3_bucket", "list_s3_buckets",
+    "create_dynamodb_table", "list_dynamodb_tables",
+    "start_ec2_instance", "stop_ec2_instance", "list_ec2_instances", "describe_ec2_instances",
+    "create_iam_user", "list_iam_users",
+    "invoke_lambda", "list_lambda_functions",
+    "unknown",
+]
+
+
+@pytest.fixture
+def plugin_spec(monkeypatch):
+    """Register a throwaway SNS intent and undo everything it touched afterwards."""
+    monkeypatch.setattr(nlp_utils, "INTENTS", list(nlp_utils.INTENTS))
+    for name in ("_RULES", "_KEYWORD_BITS", "_NEEDS_ID_MASK", "_keyword_index"):
+        monkeypatch.setattr(nlp_utils, name, getattr(nlp_utils, name))
+    monkeypatch.setattr(nlp_utils, "_SERVICE_WORDS", dict(nlp_utils._SERVICE_WORDS))
+    spec = IntentSpec(
+        "list_sns_topics", "sns", "list-topics",
+        lambda e: f"aws sns list-topics --region {e['region']}",
+        (EntityField("region", "us-east-1"),),
+        verbs=("list", "show"), nouns=("sns", "topics"),
+    )
+    register_intent(spec)
+    yield spec
+    intent_registry._intents.pop(spec.name, None)
+
+
+def test_intents_derived_from_registry():
+    assert nlp_utils.INTENTS == LEGACY_INTENTS
+    assert intent_names() == LEGACY_INTENTS[:-1]
+
+
+def test_every_service_listed():
+    assert supported_services() == ["s3", "dynamodb", "ec2", "iam", "lambda"]
+
+
+def test_resolve_aliases_and_defaults():
+    spec = get_intent("invoke_lambda")
+    assert spec.resolve({"function_name": "fn", "region": None}) == {"function": "fn", "region": "us-east-1"}
+    assert spec.resolve({}, defaults=False) == {"function": None, "region": None}
+
+
+def test_region_none_falls_back_to_default():
+    command, _ = generate_command("list_lambda_functions", {"region": None})
+    assert command == "aws lambda list-functions --region us-east-1"
+
+
+def test_duplicate_and_reserved_names_rejected():
+    with pytest.raises(ValueError):
+        register_intent(get_intent("list_s3_buckets"))
+    with pytest.raises(ValueError):
+        register_intent(IntentSpec("unknown", "s3", "ls", lambda e: "aws s3 ls"))
+
+
+def test_unknown_intent():
+    assert get_intent("no_such_intent") is None
+    assert generate_command("no_such_intent", {})[0] == "echo 'Unknown service intent'"
+
+
+def test_unclassified_intents_still_generate():
+    hidden = [s.name for s in registered_intents() if not s.classify]
+    assert "delete_s3_bucket" in hidden
+    assert not set(hidden) & set(nlp_utils.INTENTS)
+    assert generate_command("delete_s3_bucket", {"bucket": "b1"})[0] == "aws s3api delete-bucket --bucket b1"
+
+
+def test_plugin_intent_reaches_classifier_generator_and_rules(plugin_spec):
+    assert nlp_utils.INTENTS[-2:] == ["list_sns_topics", "unknown"]
+    assert "sns" in supported_services()
+    assert generate_command("list_sns_topics", {"region": "eu-west-1"}) == (
+        "aws sns list-topics --region eu-west-1", "SNS operation: list_sns_topics")
+    intent, entities = nlp_utils._rule_intent_and_entities("show my sns topics in us-west-2")
+    assert intent == "list_sns_topics"
+    assert entities["region"] == "us-west-2"
@@ -0,0 +1,92 @@
+"""Unit tests for the persistent SQLite `IntentStore`."""
+from pathlib import Path
+import sqlite3
+import sys
+import time
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.intent_store import IntentStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "intents.sqlite3")
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT query, version, hits FROM intents ORDER BY query").fetchall()
+
+
+def test_record_is_written_behind(path):
+    store = IntentStore(path, "v1", flush_interval=3600)
+    store.record("list s3 buckets", "list_s3_buckets", {}, "ml", 0.97)
+    assert _rows(path) == []                      # nothing on disk until a flush
+    assert store.stats()["pending"] == 1
+    assert store.flush() == 1
+    assert _rows(path) == [("list s3 buckets", "v1", 1)]
+    store.close()
+
+
+def test_top_orders_by_hits_and_round_trips_entities(path):
+    store = IntentStore(path, "v1", flush_interval=3600)
+    store.record("a", "list_s3_buckets", {}, "ml")
+    store.record("b", "describe_ec2_instances", {"region": "us-west-2"}, "haiku", 0.9)
+    store.flush()
+    for _ in range(3):
+        store.hit("b")
+    store.flush()
+    assert store.top(10) == [
+        ("b", "describe_ec2_instances", {"region": "us-west-2"}, "haiku", 0.9),
+        ("a", "list_s3_buckets", {}, "ml", None),
+    ]
+    assert len(store.top(1)) == 1
+    store.close()
+
+
+def test_other_versions_are_ignored_and_compacted(path):
+    old = IntentStore(path, "v1", flush_interval=3600)
+    old.record("a", "list_s3_buckets", {}, "ml")
+    old.close()
+
+    store = IntentStore(path, "v2", flush_interval=3600)
+    assert store.top(10) == []
+    store.record("b", "list_lambda_functions", {}, "rules")
+    assert store.compact() == {"before": 2, "after": 1, "removed": 1}
+    assert _rows(path) == [("b", "v2", 1)]
+    store.close()
+
+
+def test_row_cap_drops_least_hit_rows(path):
+    store = IntentStore(path, "v1", max_rows=2, flush_interval=3600)
+    for q in "abc":
+        store.record(q, "list_s3_buckets", {}, "ml")
+    store.flush()
+    store.hit("a")
+    store.hit("c")
+    store.compact()
+    assert [r[0] for r in _rows(path)] == ["a", "c"]
+    store.close()
+
+
+def test_background_thread_flushes_full_batches(path):
+    store = IntentStore(path, "v1", flush_interval=3600, batch_size=2)
+    store.record("a", "list_s3_buckets", {}, "ml")
+    store.record("b", "list_s3_buckets", {}, "ml")
+    for _ in range(200):
+        if store.stats()["pending"] == 0:
+            break
+        time.sleep(0.01)
+    assert len(_rows(path)) == 2
+    store.close()
+
+
+def test_close_flushes_pending_rows(path):
+    store = IntentStore(path, "v1", flush_interval=3600)
+    store.record("a", "list_s3_buckets", {}, "ml")
+    store.close()
+    store.close()                                  # idempotent
+    assert _rows(path) == [("a", "v1", 1)]
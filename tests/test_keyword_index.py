@@ -0,0 +1,41 @@
+"""Tests for the trigram keyword index behind typo-tolerant rule matching."""
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.keyword_index import TrigramIndex, edit_distance
+
+VOCAB = ["list", "show", "create", "tables", "table", "dynamodb", "bucket", "buckets", "lambda", "functions",
+         "instance", "start", "stop", "describe"]
+
+
+@pytest.mark.parametrize("a,b,dist", [
+    ("list", "list", 0), ("lsit", "list", 1), ("tabels", "tables", 1), ("dynamdb", "dynamodb", 1),
+    ("fucntions", "functions", 1), ("crate", "create", 1), ("bukcett", "bucket", 2), ("abc", "xyz", 3),
+])
+def test_edit_distance(a, b, dist):
+    assert edit_distance(a, b, limit=2) == min(dist, 3)
+
+
+@pytest.mark.parametrize("token,expected", [
+    ("lsit", "list"), ("tabels", "tables"), ("dynamdb", "dynamodb"), ("bukcet", "bucket"),
+    ("lamda", "lambda"), ("fucntions", "functions"), ("instnace", "instance"), ("descirbe", "describe"),
+    ("buckets", "buckets"),
+])
+def test_corrects_typos(token, expected):
+    assert TrigramIndex(VOCAB).correct(token) == expected
+
+
+@pytest.mark.parametrize("token", ["please", "weather", "stp", "ls", "abc123"])
+def test_leaves_unrelated_and_short_tokens(token):
+    assert TrigramIndex(VOCAB).correct(token) is None
+
+
+def test_lookups_are_memoized():
+    index = TrigramIndex(VOCAB)
+    index.correct("lsit")
+    index.correct("lsit")
+    assert index.correct.cache_info().hits == 1
@@ -0,0 +1,103 @@
+"""MCP server tests: tools are plain coroutines, the FastMCP server is built lazily."""
+from pathlib import Path
+import asyncio
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant import mcp_server
+from aws_cli_assistant.core import fanout, nlp_utils
+
+
+@pytest.fixture
+def rules_only(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(fanout, "validate_command_safe", lambda intent, entities: {"status": "valid"})
+    nlp_utils.clear_intent_cache()
+
+
+def test_tools_callable_without_fastmcp(rules_only):
+    resp = asyncio.run(mcp_server.generate_aws_cli("list s3 buckets"))
+    assert resp["command"].startswith("aws s3")
+    assert resp["validation"] == {"status": "valid"}
+    assert asyncio.run(mcp_server.list_supported_services()) == ["s3", "dynamodb", "ec2", "iam", "lambda"]
+
+
+def test_generate_validates_off_the_event_loop(rules_only, monkeypatch):
+    real, loops = mcp_server.generate_and_validate, []
+
+    def generate(*args):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return real(*args)
+
+    monkeypatch.setattr(mcp_server, "generate_and_validate", generate)
+    resp = asyncio.run(mcp_server.generate_aws_cli("list lambda functions in us-east-1 and eu-west-1"))
+    assert [r["region"] for r in resp["regions"]] == ["us-east-1", "eu-west-1"]
+    assert loops == [None]
+
+
+def test_batch_runs_off_the_event_loop(rules_only, monkeypatch):
+    loops = []
+    real = mcp_server.generate_and_validate
+
+    def generate(*args):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return real(*args)
+
+    monkeypatch.setattr(mcp_server, "generate_and_validate", generate)
+    responses = asyncio.run(mcp_server.generate_aws_cli_batch(["list iam users", "list s3 buckets"]))
+    assert [r["command"] for r in responses] == ["aws iam list-users", "aws s3api list-buckets"]
+    assert loops == [None, None]
+
+
+def test_health_reports_intent_store(rules_only, monkeypatch, tmp_path):
+    monkeypatch.setattr(nlp_utils, "INTENT_STORE_PATH", "")
+    assert asyncio.run(mcp_server.health_check())["intent_store"] is None
+    monkeypatch.setattr(nlp_utils, "INTENT_STORE_PATH", str(tmp_path / "intents.sqlite3"))
+    monkeypatch.setattr(nlp_utils, "_store", None)
+    assert nlp_utils.open_intent_store()["rows"] == 0
+    assert asyncio.run(mcp_server.health_check())["intent_store"]["path"] == str(tmp_path / "intents.sqlite3")
+    nlp_utils._store.close()
+
+
+def test_stdio_runner_closes_haiku_client(monkeypatch):
+    closed, used = [], []
+
+    class FakeClient:
+        async def aclose(self):
+            closed.append(self)
+
+    class FakeServer:
+        async def run_stdio_async(self):
+            used.append(await nlp_utils._get_async_haiku_client())
+            assert closed == []
+
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr("aws_cli_assistant.core.haiku_client.load_async_haiku_client", FakeClient)
+    monkeypatch.setattr(mcp_server, "_get_mcp", FakeServer)
+
+    async def run():
+        await mcp_server.run_stdio()
+        assert closed == used                           # closed by the runner, before loop shutdown
+
+    asyncio.run(run())
+    assert len(closed) == 1
+
+
+def test_server_built_once_on_first_use(monkeypatch):
+    pytest.importorskip("fastmcp")
+    monkeypatch.setattr(mcp_server, "_mcp", None)
+    server = mcp_server._get_mcp()
+    assert mcp_server._get_mcp() is server
+    assert mcp_server.mcp is server
+    with pytest.raises(AttributeError):
+        mcp_server.not_a_thing
@@ -0,0 +1,80 @@
+"""Tests for the dynamic micro-batching queue."""
+import threading
+import time
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core.micro_batcher import MicroBatcher
+
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        return [item * 2 for item in items]
+
+
+def _submit_concurrently(batcher, items):
+    barrier = threading.Barrier(len(items))
+    results = {}
+
+    def worker(item):
+        barrier.wait()
+        results[item] = batcher.submit(item).result(5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_submits_are_batched():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch=16, max_wait_ms=100)
+    results = _submit_concurrently(batcher, list(range(8)))
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(fn.batches) < 8
+    assert sorted(i for b in fn.batches for i in b) == list(range(8))
+
+
+def test_max_batch_caps_batch_size():
+    fn = Recorder(delay=0.05)
+    batcher = MicroBatcher(fn, max_batch=3, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(10)]
+    assert [f.result(5) for f in futures] == [i * 2 for i in range(10)]
+    assert max(len(b) for b in fn.batches) <= 3
+    stats = batcher.stats()
+    assert stats["items"] == 10 and stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] >= 3
+
+
+def test_lone_request_waits_at_most_max_wait():
+    batcher = MicroBatcher(Recorder(), max_batch=16, max_wait_ms=20)
+    start = time.monotonic()
+    assert batcher.submit(21).result(5) == 42
+    assert time.monotonic() - start < 1
+    assert batcher.stats()["avg_batch_size"] == 1.0
+
+
+def test_exception_reaches_every_waiter():
+    def broken(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(broken, max_batch=4, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(3)]
+    for f in futures:
+        with pytest.raises(RuntimeError):
+            f.result(5)
+    # the dispatcher survives a failing batch
+    batcher.fn = Recorder()
+    assert batcher.submit(1).result(5) == 2
@@ -0,0 +1,88 @@
+"""Unit tests for the local safetensors model cache (no torch needed)."""
+from pathlib import Path
+import json
+import struct
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip("numpy")
+
+from aws_cli_assistant.core import model_cache
+
+
+def write_safetensors(path, tensors, dtypes=None):
+    header, blobs, offset = {"__metadata__": {"format": "pt"}}, [], 0
+    for name, array in tensors.items():
+        data = np.ascontiguousarray(array).tobytes()
+        header[name] = {"dtype": (dtypes or {}).get(name) or {"float32": "F32", "int64": "I64"}[array.dtype.name],
+                        "shape": list(array.shape), "data_offsets": [offset, offset + len(data)]}
+        blobs.append(data)
+        offset += len(data)
+    raw = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(raw)) + raw + b"".join(blobs))
+
+
+@pytest.fixture
+def weights(tmp_path):
+    tensors = {"encoder.weight": np.arange(12, dtype=np.float32).reshape(3, 4),
+               "position_ids": np.arange(5, dtype=np.int64)}
+    path = tmp_path / "model.safetensors"
+    write_safetensors(path, tensors)
+    return path, tensors
+
+
+def test_read_header_skips_metadata(weights):
+    path, tensors = weights
+    header, start = model_cache.read_header(str(path))
+    assert sorted(header) == sorted(tensors)
+    assert header["encoder.weight"]["shape"] == [3, 4]
+    assert start > 8
+
+
+def test_mmap_arrays_are_views_of_the_file(weights):
+    path, tensors = weights
+    arrays = model_cache.mmap_arrays(str(path))
+    for name, expected in tensors.items():
+        np.testing.assert_array_equal(arrays[name], expected)
+        assert arrays[name].dtype == expected.dtype
+        assert not arrays[name].flags.owndata            # no deserialized copy
+    # the mapping is copy-on-write: writes stay private to this process
+    before = path.read_bytes()
+    arrays["encoder.weight"][0, 0] = 42
+    assert path.read_bytes() == before
+
+
+def test_bf16_is_kept_as_raw_16_bit(tmp_path):
+    path = tmp_path / "model.safetensors"
+    write_safetensors(path, {"w": np.array([0x3F80, 0x4000], dtype=np.uint16)}, {"w": "BF16"})
+    w = model_cache.mmap_arrays(str(path))["w"]
+    assert w.dtype == np.uint16 and w.tolist() == [0x3F80, 0x4000]
+
+
+def test_local_model_dir_and_is_cached(tmp_path):
+    model_dir = Path(model_cache.local_model_dir("facebook/bart-large-mnli", str(tmp_path)))
+    assert model_dir == tmp_path / "facebook--bart-large-mnli"
+    assert not model_cache.is_cached("facebook/bart-large-mnli", str(tmp_path))
+    model_dir.mkdir()
+    (model_dir / "config.json").write_text("{}")
+    write_safetensors(model_dir / "model.safetensors", {"w": np.zeros(2, np.float32)})
+    assert model_cache.is_cached("facebook/bart-large-mnli", str(tmp_path))
+    assert model_cache.resolve_model("facebook/bart-large-mnli", cache_dir=str(tmp_path)) == str(model_dir)
+
+
+def test_offline_never_downloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "NLP_OFFLINE", True)
+    with pytest.raises(model_cache.ModelNotCachedError, match="--export facebook/bart-large-mnli"):
+        model_cache.resolve_model("facebook/bart-large-mnli", cache_dir=str(tmp_path))
+
+
+def test_memory_usage_splits_shared_and_private():
+    usage = model_cache.memory_usage()
+    if usage is None:
+        pytest.skip("needs /proc/self/smaps_rollup")
+    assert set(usage) == {"rss_mb", "pss_mb", "shared_mb", "private_mb"}
+    assert usage["shared_mb"] + usage["private_mb"] == pytest.approx(usage["rss_mb"], abs=0.2)
@@ -0,0 +1,651 @@
+"""Tests for the rule engine and NLP cascade in `core.nlp_utils`.
+
+The ML and Haiku backends are disabled here; these tests only exercise the
+local, dependency-free paths.
+"""
+import json
+import threading
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import nlp_utils
+from aws_cli_assistant.core.nlp_utils import _rule_intent_and_entities, parse_nlp
+
+CORPUS = ROOT / "scripts" / "data" / "sample_queries.jsonl"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    # a real load failing in an earlier test (no torch here) would hold the ML stage off
+    monkeypatch.setattr(nlp_utils, "_ml_status", {"state": "not_loaded", "load_seconds": None, "error": None})
+    monkeypatch.setattr(nlp_utils, "_haiku_status", {"state": "not_loaded", "load_seconds": None, "error": None})
+    monkeypatch.setattr(nlp_utils, "_failed_at", {})
+    nlp_utils.clear_intent_cache()
+    yield
+    nlp_utils.clear_intent_cache()
+
+
+@pytest.fixture
+def rules_only(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+
+
+def _corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+RULE_CASES = [
+    ("create an S3 bucket named phase3-test-bucket in us-west-1",
+     "create_s3_bucket", {"bucket": "phase3-test-bucket", "region": "us-west-1"}),
+    ("create s3 bucket my-logs-bucket", "create_s3_bucket", {"bucket": "my-logs-bucket", "region": None}),
+    ("list my s3 buckets", "list_s3_buckets", {"region": None}),
+    ("create dynamodb table named Orders", "create_dynamodb_table", {"table": "orders", "region": None}),
+    ("show dynamo tables in us-east-1", "list_dynamodb_tables", {"region": "us-east-1"}),
+    ("start ec2 instance i-0abc123 in us-east-1",
+     "start_ec2_instance", {"instance_id": "i-0abc123", "region": "us-east-1"}),
+    ("stop instance i-0abc i-0def", "stop_ec2_instance", {"instance_id": "i-0def", "region": None}),
+    ("list ec2 instances with tag env=prod", "describe_ec2_instances", {"region": None, "tag": {"env": "prod"}}),
+    ("create iam user named alice", "create_iam_user", {"user": "alice"}),
+    ("list iam users", "list_iam_users", {}),
+    ("invoke lambda function named process-orders",
+     "invoke_lambda", {"function": "process-orders", "region": None}),
+    ("show lambda functions in us-west-1", "list_lambda_functions", {"region": "us-west-1"}),
+]
+
+
+@pytest.mark.parametrize("query,intent,entities", RULE_CASES)
+def test_rule_intent_and_entities(query, intent, entities):
+    assert _rule_intent_and_entities(query) == (intent, entities)
+
+
+TYPO_CASES = [
+    ("lsit dynamdb tabels", "list_dynamodb_tables", {"region": None}),
+    ("shwo lamda fucntions", "list_lambda_functions", {"region": None}),
+    ("create bukcet foo-logs in us-east-1", "create_s3_bucket", {"bucket": "foo-logs", "region": "us-east-1"}),
+    ("stop ec2 instnace i-0abc", "stop_ec2_instance", {"instance_id": "i-0abc", "region": None}),
+    # name parts are never "corrected"
+    ("create bucket named my-lsit-bucket", "create_s3_bucket", {"bucket": "my-lsit-bucket", "region": None}),
+]
+
+
+@pytest.mark.parametrize("query,intent,entities", TYPO_CASES)
+def test_rule_engine_tolerates_typos(query, intent, entities):
+    assert _rule_intent_and_entities(query) == (intent, entities)
+    assert nlp_utils._candidate_labels(query) == [intent, "unknown"]
+
+
+@pytest.mark.parametrize("query", [
+    # real words a keyword away: never corrected, least of all into a write verb
+    "what runs on ec2 instance i-0abc",
+    "i want to take a new s3 bucket",
+    "take a look at my s3 bucket",
+    "fall back lambda",
+    "wall of lambda",
+    "tall lambda",
+    "shop buckets",
+    # misspelled write verbs are left to the models
+    "crete bukcet foo-logs",
+    "stpo ec2 instnace i-0abc",
+])
+def test_fuzzy_keywords_never_guess_actions(query):
+    assert _rule_intent_and_entities(query) == ("unknown", {})
+
+
+def test_fuzzy_keywords_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "RULE_FUZZY_KEYWORDS", False)
+    assert _rule_intent_and_entities("lsit dynamdb tabels") == ("unknown", {})
+
+
+@pytest.mark.parametrize("query", [
+    "what is the weather today",
+    "buckets list",                      # noun before verb does not match
+    "start ec2 instance",                # start/stop need an instance id
+    "start i-0abc123 instance",          # ...and it must follow the noun
+    "list ami-0abc123",
+])
+def test_rule_unknown(query):
+    assert _rule_intent_and_entities(query) == ("unknown", {})
+
+
+def test_rule_keywords_match_whole_words_only():
+    assert _rule_intent_and_entities("make-bucket now")[0] == "create_s3_bucket"
+    assert _rule_intent_and_entities("remake the bucketing")[0] == "unknown"
+
+
+def test_rules_cover_sample_corpus():
+    """Every corpus query the rules can answer gets its labelled intent."""
+    misses = [row for row in _corpus() if _rule_intent_and_entities(row["query"])[0] not in (row["intent"], "unknown")]
+    assert misses == []
+
+
+def test_parse_nlp_rules_only(rules_only):
+    assert parse_nlp("  list dynamodb tables in us-west-2 ") == ("list_dynamodb_tables", {"region": "us-west-2"})
+
+
+def test_parse_nlp_runs_rules_once_when_ml_wins(monkeypatch):
+    calls = []
+    real = nlp_utils._rule_intent_and_entities
+
+    def counting(text):
+        calls.append(text)
+        return real(text)
+
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_ml_intent", lambda text: ("list_s3_buckets", 0.9))
+    monkeypatch.setattr(nlp_utils, "_rule_intent_and_entities", counting)
+
+    intent, entities = parse_nlp("show s3 buckets in us-east-2")
+    assert intent == "list_s3_buckets"
+    assert entities == {"region": "us-east-2"}
+    assert len(calls) == 1
+
+
+class FakeClassifier:
+    """Stands in for the transformers zero-shot pipeline with canned answers."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+        self.label_sets = []
+
+    def __call__(self, inputs, candidate_labels, multi_label=False, batch_size=None):
+        self.calls.append((inputs, batch_size))
+        self.label_sets.append(list(candidate_labels))
+        single = isinstance(inputs, str)
+        results = [self._classify(t) for t in ([inputs] if single else inputs)]
+        return results[0] if single else results
+
+    def _classify(self, text):
+        label, score = self.answers.get(text, ("unknown", 0.1))
+        return {"labels": [label], "scores": [score]}
+
+
+def test_parse_nlp_batch_groups_pipeline_calls_in_order(monkeypatch):
+    fake = FakeClassifier({
+        "I want to see the s3 buckets I own, list them": ("list_s3_buckets", 0.95),
+        "hello": ("invoke_lambda", 0.2),   # below threshold -> rules
+    })
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: fake)
+
+    queries = ["I want to see the s3 buckets I own, list them", "hello", "  ", "list iam users", "show iam users"]
+    results = nlp_utils.parse_nlp_batch(queries, batch_size=8)
+
+    assert [intent for intent, _ in results] == [
+        "list_s3_buckets", "unknown", "unknown", "list_iam_users", "list_iam_users"]
+    # one pipeline call per distinct candidate-label set, never per query
+    assert len(fake.calls) == 3
+    inputs = [text for batch, _ in fake.calls for text in batch]
+    assert sorted(inputs) == sorted(q for q in queries if q.strip())
+    assert {batch_size for _, batch_size in fake.calls} == {8}
+
+
+def test_parse_nlp_batch_matches_parse_nlp_without_model(rules_only):
+    queries = [row["query"] for row in _corpus()]
+    assert nlp_utils.parse_nlp_batch(queries) == [parse_nlp(q) for q in queries]
+
+
+def test_parse_nlp_batch_pipeline_failure_falls_back_to_rules(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: broken)
+    messages = []
+    sink = nlp_utils.logger.add(lambda m: messages.append(m.record["message"]), level="ERROR")
+    try:
+        assert nlp_utils.parse_nlp_batch(["list my s3 buckets"]) == [("list_s3_buckets", {"region": None})]
+    finally:
+        nlp_utils.logger.remove(sink)
+    assert messages == ["Batched ML classification failed: boom"]     # loguru formats with {}, not %s
+
+
+def test_parse_nlp_cache_hits_skip_the_model(monkeypatch):
+    calls = []
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_ml_intent", lambda text: calls.append(text) or ("list_s3_buckets", 0.9))
+
+    before = nlp_utils.intent_cache_stats()
+    first = parse_nlp("Show S3 buckets in us-east-2")
+    second = parse_nlp("  show   s3 buckets in US-EAST-2 ")
+    assert first == second
+    assert len(calls) == 1
+    stats = nlp_utils.intent_cache_stats()
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 1
+
+    # returned entities are copies; mutating them must not poison the cache
+    second[1]["region"] = "tampered"
+    assert parse_nlp("show s3 buckets in us-east-2")[1] == {"region": "us-east-2"}
+
+
+@pytest.mark.parametrize("attr,value", [
+    ("NLP_MODE", "haiku"),
+    ("ML_CONF_THRESHOLD", 0.9),
+    ("INTENTS", nlp_utils.INTENTS + ["delete_s3_bucket"]),
+])
+def test_cache_key_tracks_config(monkeypatch, rules_only, attr, value):
+    key = nlp_utils._cache_key("list iam users")
+    monkeypatch.setattr(nlp_utils, attr, value)
+    assert nlp_utils._cache_key("list iam users") != key
+
+
+def test_clear_intent_cache(rules_only):
+    parse_nlp("list iam users")
+    assert nlp_utils.clear_intent_cache() == 1
+    assert nlp_utils.intent_cache_stats()["size"] == 0
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("I want to see the s3 buckets I own, list them", ["list_s3_buckets", "unknown"]),
+    ("run lambda function resize", ["invoke_lambda", "unknown"]),
+    ("which dynamodb tables exist", ["create_dynamodb_table", "list_dynamodb_tables", "unknown"]),
+    ("create a bucket and a table", ["create_s3_bucket", "create_dynamodb_table", "unknown"]),
+])
+def test_candidate_labels_pruned(query, expected):
+    assert nlp_utils._candidate_labels(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "hello there",             # no service mentioned
+    "stop the lambda",         # known verb, but no such lambda intent
+])
+def test_candidate_labels_ambiguous_keeps_full_set(query):
+    assert nlp_utils._candidate_labels(query) == nlp_utils.INTENTS
+
+
+def test_candidate_labels_pruning_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ML_LABEL_PRUNING", False)
+    assert nlp_utils._candidate_labels("list my s3 buckets") == nlp_utils.INTENTS
+
+
+def test_ml_intent_scores_only_candidates(monkeypatch):
+    fake = FakeClassifier({"show lambda functions please": ("list_lambda_functions", 0.9)})
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: fake)
+    assert nlp_utils._ml_intent("show lambda functions please") == ("list_lambda_functions", 0.9)
+    assert fake.label_sets == [["list_lambda_functions", "unknown"]]
+
+
+def test_threshold_scaled_to_scored_labels():
+    full = len(nlp_utils.INTENTS)
+    assert nlp_utils._threshold(full) == nlp_utils.ML_CONF_THRESHOLD
+    assert nlp_utils._threshold(2) > nlp_utils._threshold(3) > nlp_utils.ML_CONF_THRESHOLD
+    # 0.75 over two labels is barely better than a coin toss; over every label it clears the bar
+    pruned = {"labels": ["list_lambda_functions", "unknown"], "scores": [0.75, 0.25]}
+    assert nlp_utils._top_label(pruned) is None
+    wide = {"labels": nlp_utils.INTENTS, "scores": [0.75] + [0.25 / (full - 1)] * (full - 1)}
+    assert nlp_utils._top_label(wide) == nlp_utils.INTENTS[0]
+
+
+def test_pruned_candidates_contain_labelled_intent():
+    """On the sample corpus pruning never drops the correct label."""
+    dropped = [row["query"] for row in _corpus() if row["intent"] not in nlp_utils._candidate_labels(row["query"])]
+    assert dropped == []
+
+
+@pytest.fixture
+def slow_model(monkeypatch):
+    """A local backend whose load blocks until the test releases it."""
+    release = threading.Event()
+    loads = []
+
+    def build():
+        loads.append(1)
+        release.wait(5)
+        return FakeClassifier({"what buckets do i have": ("list_s3_buckets", 0.99)})
+
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_classifier", None)
+    monkeypatch.setattr(nlp_utils, "_warmup_thread", None)
+    monkeypatch.setattr(nlp_utils, "_ml_status", {"state": "not_loaded", "load_seconds": None, "error": None})
+    monkeypatch.setattr(nlp_utils, "_build_local_classifier", build)
+    yield release, loads
+    release.set()
+
+
+def test_warmup_serves_rules_until_ready(slow_model):
+    release, loads = slow_model
+    thread = nlp_utils.start_warmup()
+    assert nlp_utils.start_warmup() is thread          # idempotent while running
+
+    assert nlp_utils.model_status()["ml"]["state"] == "loading"
+    assert nlp_utils.model_status()["active_backend"] == "rules"
+    # requests don't wait for the model
+    assert parse_nlp("what buckets do i have") == ("unknown", {})
+
+    release.set()
+    thread.join(5)
+    status = nlp_utils.model_status()
+    assert status["ml"]["state"] == "ready"
+    assert status["ml"]["load_seconds"] is not None
+    assert status["active_backend"] == "zero-shot"
+    assert loads == [1]
+    # the rules-only answer from warm-up is not served from cache anymore
+    assert parse_nlp("what buckets do i have")[0] == "list_s3_buckets"
+
+
+def test_failed_load_backs_off_to_rules(monkeypatch):
+    loads = []
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_classifier", None)
+    monkeypatch.setattr(nlp_utils, "_build_local_classifier", lambda: loads.append(1))
+
+    def untouched(*args):
+        raise AssertionError("model-only step ran without a model")
+
+    assert parse_nlp("list my s3 buckets")[0] == "list_s3_buckets"
+    assert loads == [1] and nlp_utils.model_status()["ml"]["state"] == "failed"
+
+    # no retry per request, and neither the semantic cache nor the batcher is consulted
+    monkeypatch.setattr(nlp_utils, "_semantic_get", untouched)
+    monkeypatch.setattr(nlp_utils._ml_batcher, "submit", untouched)
+    assert parse_nlp("list my dynamodb tables")[0] == "list_dynamodb_tables"
+    assert nlp_utils.parse_nlp_batch(["list iam users"]) == [("list_iam_users", {})]
+    assert loads == [1]
+
+    monkeypatch.setitem(nlp_utils._failed_at, "ml", nlp_utils._failed_at["ml"] - nlp_utils.NLP_LOAD_RETRY_S)
+    monkeypatch.setattr(nlp_utils, "_semantic_get", lambda *args: (None, None))
+    parse_nlp("list my lambda functions")
+    assert loads == [1, 1]
+
+
+def test_warmup_noop_when_ml_disabled(rules_only):
+    assert nlp_utils.start_warmup() is None
+
+
+@pytest.fixture
+def staged(monkeypatch):
+    """Haiku and ML stages replaced by fakes whose delay each test controls."""
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "_stage_latency_ms", {"haiku": None, "ml": None})
+    delays = {"haiku": 0.0, "ml": 0.0}
+    release = threading.Event()
+
+    def fake(stage, answer):
+        def run(text):
+            release.wait(delays[stage])
+            return answer
+        return run
+
+    monkeypatch.setattr(nlp_utils, "_haiku_intent", fake("haiku", "list_iam_users"))
+    monkeypatch.setattr(nlp_utils, "_ml_intent", fake("ml", ("list_s3_buckets", 0.9)))
+    yield delays
+    release.set()
+
+
+def test_budget_none_waits_for_preferred_stage(staged):
+    staged["haiku"] = 0.05
+    result = nlp_utils.parse_nlp_detailed("what do i have")
+    assert (result.intent, result.stage) == ("list_iam_users", "haiku")
+
+
+def test_budget_falls_back_to_ml_when_haiku_is_slow(staged):
+    staged["haiku"] = 5
+    result = nlp_utils.parse_nlp_detailed("what do i have", budget_ms=200)
+    assert (result.intent, result.stage) == ("list_s3_buckets", "ml")
+    assert result.elapsed_ms < 2000
+
+
+def test_budget_falls_back_to_rules_when_both_are_slow(staged):
+    staged["haiku"] = staged["ml"] = 5
+    result = nlp_utils.parse_nlp_detailed("list iam users", budget_ms=100)
+    assert (result.intent, result.stage) == ("list_iam_users", "rules")
+    assert result.elapsed_ms < 2000
+
+
+def test_hedged_stage_spans_join_the_request_trace(staged):
+    from aws_cli_assistant.core.timing import trace
+    with trace("req") as t:
+        result = nlp_utils.parse_nlp_detailed("what do i have", budget_ms=2000)
+    names = [s.name for s in t.spans]
+    assert {"nlp", "nlp.rules", "nlp.haiku"} <= set(names)
+    assert next(s for s in t.spans if s.name == "nlp").attrs["backend"] == result.stage == "haiku"
+
+
+def test_cut_short_answers_are_not_cached(staged):
+    staged["haiku"] = staged["ml"] = 5
+    nlp_utils.parse_nlp_detailed("what do i have", budget_ms=50)
+    assert len(nlp_utils._intent_cache) == 0
+
+    staged["haiku"] = staged["ml"] = 0
+    nlp_utils.parse_nlp_detailed("what do i have", budget_ms=1000)
+    assert nlp_utils.parse_nlp_detailed("what do i have").stage == "cache"
+
+
+def test_stage_skipped_when_estimate_exceeds_budget(staged, monkeypatch):
+    calls = []
+    monkeypatch.setattr(nlp_utils, "_haiku_intent", lambda text: calls.append(text) or "list_iam_users")
+    nlp_utils._stage_latency_ms["haiku"] = 1000.0
+
+    result = nlp_utils.parse_nlp_detailed("what do i have", budget_ms=100)
+    assert result.stage == "ml"
+    assert calls == []
+    # the estimate decays so the stage gets retried eventually
+    assert nlp_utils._stage_latency_ms["haiku"] < 1000.0
+
+
+class FakeHaikuClient:
+    """Mimics `anthropic.Anthropic().completions`; `answer(prompt)` builds the completion."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+        self.completions = self
+
+    def create(self, model, prompt, max_tokens_to_sample):
+        self.prompts.append(prompt)
+        return type("Completion", (), {"completion": self.answer(prompt)})()
+
+
+def _answer_by_rules(prompt, skip=()):
+    if "Answers:" not in prompt:
+        return " " + _rule_intent_and_entities(prompt.split("Request: ")[1].split("\nLabel:")[0])[0]
+    lines = prompt.split("Answers:")[0].splitlines()
+    queries = [line.split(". ", 1) for line in lines if line[:1].isdigit()]
+    return "\n".join(f"{n}: {_rule_intent_and_entities(q)[0]}" for n, q in queries if int(n) not in skip)
+
+
+@pytest.fixture
+def haiku(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "haiku")
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    client = FakeHaikuClient(_answer_by_rules)
+    monkeypatch.setattr(nlp_utils, "_haiku_client", client)
+    return client
+
+
+def test_haiku_intents_packs_queries(haiku):
+    queries = ["list iam users", "list my s3 buckets", "show lambda functions", "stop instance i-0abc", "list tables"]
+    labels = nlp_utils._haiku_intents(queries, batch_size=2)
+    assert labels == [_rule_intent_and_entities(q)[0] for q in queries]
+    assert len(haiku.prompts) == 3
+    assert all("Answers:" in p for p in haiku.prompts)
+
+
+def test_haiku_intents_retries_missing_and_malformed_singly(haiku):
+    def answer(prompt):
+        if "Answers:" in prompt:
+            return "1: list_iam_users\n3: not_a_label\n"
+        return _answer_by_rules(prompt)
+
+    haiku.answer = answer
+    labels = nlp_utils._haiku_intents(["list iam users", "list my s3 buckets", "show lambda functions"])
+    assert labels == ["list_iam_users", "list_s3_buckets", "list_lambda_functions"]
+    assert len(haiku.prompts) == 3                       # one batch + two single-query retries
+    assert haiku.prompts[1] == nlp_utils._haiku_prompt("list my s3 buckets")
+
+
+def test_haiku_batch_query_newlines_do_not_break_numbering():
+    prompt = nlp_utils._haiku_batch_prompt(["list\ns3 buckets", "list iam users"])
+    assert "1. list s3 buckets\n2. list iam users\n" in prompt
+
+
+def test_parse_nlp_batch_uses_batched_haiku(haiku, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "HAIKU_BATCH_SIZE", 20)
+    queries = [r["query"] for r in _corpus()][:10]
+    results = nlp_utils.parse_nlp_batch(queries)
+    assert [i for i, _ in results] == [_rule_intent_and_entities(q)[0] for q in queries]
+    assert len(haiku.prompts) == 1
+
+
+def test_concurrent_ml_intent_calls_share_pipeline_batches(monkeypatch):
+    queries = [f"show lambda functions {i}" for i in range(8)]
+    fake = FakeClassifier({q: ("list_lambda_functions", 0.9) for q in queries})
+    monkeypatch.setattr(nlp_utils, "_classifier", fake)
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: fake)
+    monkeypatch.setattr(nlp_utils, "ML_MICROBATCH", True)
+    monkeypatch.setattr(nlp_utils._ml_batcher, "max_wait_ms", 100)
+
+    barrier = threading.Barrier(len(queries))
+    results = []
+
+    def worker(q):
+        barrier.wait()
+        results.append(nlp_utils._ml_intent(q))
+
+    threads = [threading.Thread(target=worker, args=(q,)) for q in queries]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [label for label, _ in results] == ["list_lambda_functions"] * len(queries)
+    assert len(fake.calls) < len(queries)
+    assert all(isinstance(inputs, list) for inputs, _ in fake.calls)
+    assert nlp_utils.model_status()["ml"]["microbatch"]["items"] >= len(queries)
+
+
+@pytest.fixture
+def ml_only(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "ML_MICROBATCH", False)
+    fake = FakeClassifier({})
+    fake._classify = lambda text: {"labels": [_rule_intent_and_entities(text)[0]], "scores": [0.95]}
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: fake)
+    return fake
+
+
+def test_semantic_cache_skips_model_for_near_duplicates(ml_only):
+    assert nlp_utils.parse_nlp_detailed("create s3 bucket named alpha-logs in us-east-1").stage == "ml"
+    result = nlp_utils.parse_nlp_detailed("create s3 bucket named beta-data in us-west-2")
+    assert result.stage == "semantic"
+    assert result == ("create_s3_bucket", {"bucket": "beta-data", "region": "us-west-2"}, "semantic",
+                      result.elapsed_ms)
+    assert len(ml_only.calls) == 1
+    assert nlp_utils.semantic_cache_stats()["hits"] == 1
+
+
+def test_semantic_cache_respects_verbs_and_entity_shape(ml_only):
+    nlp_utils.parse_nlp_detailed("start ec2 instance i-0abc in us-east-1")
+    assert nlp_utils.parse_nlp_detailed("stop ec2 instance i-0abc in us-east-1").stage == "ml"
+    nlp_utils.parse_nlp_detailed("list my s3 buckets")
+    assert nlp_utils.parse_nlp_detailed("create s3 bucket").stage == "ml"
+
+
+def test_semantic_cache_respects_verbs_without_pruning(ml_only, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ML_LABEL_PRUNING", False)
+    nlp_utils.parse_nlp_detailed("start ec2 instance i-0abc in us-east-1")
+    result = nlp_utils.parse_nlp_detailed("stop ec2 instance i-0abc in us-east-1")
+    assert (result.intent, result.stage) == ("stop_ec2_instance", "ml")
+    assert nlp_utils.parse_nlp_detailed("start ec2 instance i-0def in us-east-1").stage == "semantic"
+
+
+def test_semantic_cache_in_batch_path(ml_only):
+    nlp_utils.parse_nlp_batch(["invoke lambda function named a-one"])
+    results = nlp_utils.parse_nlp_batch(["invoke lambda function named b-two", "list iam users"])
+    assert [i for i, _ in results] == ["invoke_lambda", "list_iam_users"]
+    assert [len(batch) for batch, _ in ml_only.calls] == [1, 1]
+
+
+def test_semantic_cache_disabled_and_cleared(ml_only, monkeypatch):
+    nlp_utils.parse_nlp_detailed("create s3 bucket named alpha-logs")
+    nlp_utils.clear_intent_cache()
+    assert nlp_utils.semantic_cache_stats()["size"] == 0
+    monkeypatch.setattr(nlp_utils, "SEMANTIC_CACHE_SIZE", 0)
+    nlp_utils.parse_nlp_detailed("create s3 bucket named alpha-logs")
+    assert nlp_utils.parse_nlp_detailed("create s3 bucket named beta-data").stage == "ml"
+
+
+def test_semantic_cache_skipped_without_numpy(ml_only, monkeypatch):
+    monkeypatch.setattr(nlp_utils, "_semantic", None)
+    monkeypatch.setattr(nlp_utils, "_semantic_available", None)
+    monkeypatch.setitem(sys.modules, "numpy", None)     # import numpy -> ImportError
+    nlp_utils.parse_nlp_detailed("create s3 bucket named alpha-logs")
+    assert nlp_utils.parse_nlp_detailed("create s3 bucket named beta-data").stage == "ml"
+    assert nlp_utils.semantic_cache_stats()["size"] == 0
+    assert nlp_utils._semantic is None
+
+
+@pytest.fixture
+def intent_store(monkeypatch, tmp_path, rules_only):
+    monkeypatch.setattr(nlp_utils, "INTENT_STORE_PATH", str(tmp_path / "intents.sqlite3"))
+    monkeypatch.setattr(nlp_utils, "_store", None)
+    yield
+    if nlp_utils._store is not None:
+        nlp_utils._store.close()
+
+
+def _restart():
+    nlp_utils._store.close()
+    nlp_utils._store = None
+    nlp_utils.clear_intent_cache()
+
+
+def test_intent_store_survives_restart(intent_store):
+    first = nlp_utils.parse_nlp_detailed("list s3 buckets")
+    assert first.stage == "rules"
+    _restart()
+    again = nlp_utils.parse_nlp_detailed("List S3 buckets ")
+    assert (again.intent, again.entities, again.stage) == (first.intent, first.entities, "store")
+    assert nlp_utils.intent_store_stats()["preloaded"] == 1
+
+
+def test_intent_store_batch_path_persists(intent_store):
+    nlp_utils.parse_nlp_batch(["list s3 buckets", "list lambda functions"])
+    _restart()
+    assert [nlp_utils.parse_nlp_detailed(q).stage for q in ("list s3 buckets", "list lambda functions")] == ["store"] * 2
+
+
+def test_intent_store_records_model_score(intent_store, monkeypatch):
+    fake = FakeClassifier({"show me every bucket": ("list_s3_buckets", 0.93),
+                           "which functions exist": ("list_lambda_functions", 0.88)})
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "ML_MICROBATCH", False)
+    monkeypatch.setattr(nlp_utils, "_classifier", fake)
+    monkeypatch.setattr(nlp_utils, "_get_local_classifier", lambda: fake)
+    assert nlp_utils.parse_nlp_detailed("show me every bucket").stage == "ml"
+    nlp_utils.parse_nlp_batch(["which functions exist", "list iam users"])
+    nlp_utils._store.flush()
+    rows = {q: (backend, score) for q, _, _, backend, score in nlp_utils._store.top(10)}
+    assert rows == {"show me every bucket": ("ml", 0.93), "which functions exist": ("ml", 0.88),
+                    "list iam users": ("rules", None)}
+
+
+def test_intent_store_skips_answers_during_warmup(intent_store, slow_model):
+    release, _ = slow_model
+    thread = nlp_utils.start_warmup()
+    assert parse_nlp("list s3 buckets")[0] == "list_s3_buckets"   # rules, model still loading
+    nlp_utils._store.flush()
+    assert nlp_utils._store.top(10) == []
+    release.set()
+    thread.join(5)
+
+
+def test_intent_store_version_tracks_config(monkeypatch):
+    before = nlp_utils.intent_store_version()
+    monkeypatch.setattr(nlp_utils, "ML_CONF_THRESHOLD", nlp_utils.ML_CONF_THRESHOLD + 0.1)
+    assert nlp_utils.intent_store_version() != before
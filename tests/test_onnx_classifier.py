@@ -0,0 +1,72 @@
+"""Scoring tests for the ONNX zero-shot backend with a fake session/tokenizer."""
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip("numpy")
+
+from aws_cli_assistant.core.onnx_classifier import OnnxZeroShotClassifier
+
+ENTAILMENT_ID = 2
+
+
+class FakeTokenizer:
+    def __init__(self):
+        self.pairs = []
+
+    def __call__(self, premises, hypotheses, **kwargs):
+        self.pairs = list(zip(premises, hypotheses))
+        n = len(self.pairs)
+        return {"input_ids": np.zeros((n, 4), dtype=np.int32),
+                "attention_mask": np.ones((n, 4), dtype=np.int32),
+                "token_type_ids": np.zeros((n, 4), dtype=np.int32)}
+
+
+class FakeSession:
+    """Entailment logit = number of label words that appear in the premise."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.runs = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        self.runs.append(sorted(feeds))
+        logits = np.zeros((len(self.tokenizer.pairs), 3), dtype=np.float32)
+        for i, (premise, hypothesis) in enumerate(self.tokenizer.pairs):
+            label = hypothesis[len("This example is "):-1]
+            logits[i, ENTAILMENT_ID] = sum(w in premise for w in label.split("_"))
+        return [logits]
+
+
+@pytest.fixture
+def clf():
+    tokenizer = FakeTokenizer()
+    return OnnxZeroShotClassifier(session=FakeSession(tokenizer), tokenizer=tokenizer, entailment_id=ENTAILMENT_ID)
+
+
+LABELS = ["list_s3_buckets", "list_iam_users", "unknown"]
+
+
+def test_pipeline_contract(clf):
+    res = clf("list my s3 buckets", candidate_labels=LABELS)
+    assert res["labels"][0] == "list_s3_buckets"
+    assert sorted(res["labels"]) == sorted(LABELS)
+    assert sum(res["scores"]) == pytest.approx(1.0)
+    # softmax over entailment logits (3, 1, 0)
+    expected = np.exp([3.0, 1.0, 0.0]) / np.exp([3.0, 1.0, 0.0]).sum()
+    assert res["scores"] == pytest.approx(list(expected), rel=1e-5)
+
+
+def test_batch_keeps_order_and_chunks_runs(clf):
+    res = clf(["list iam users", "list my s3 buckets", "hello"], candidate_labels=LABELS, batch_size=2)
+    assert [r["labels"][0] for r in res] == ["list_iam_users", "list_s3_buckets", "list_s3_buckets"]
+    assert len(clf.session.runs) == 2
+    # only inputs the graph declares are fed
+    assert clf.session.runs[0] == ["attention_mask", "input_ids"]
@@ -0,0 +1,85 @@
+"""AWS CLI operation index built from botocore's service models."""
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("botocore")
+
+from aws_cli_assistant.core import operation_index
+from aws_cli_assistant.core.command_generator import generate_command
+from aws_cli_assistant.core.operation_index import Operation, OperationIndex, build_index
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("ops") / "operations.sqlite")
+    stats = build_index(path, ["s3", "sns", "lambda", "dynamodb", "kafka", "account", "identitystore"])
+    assert stats["services"] == 7 and stats["operations"] > 100
+    return path
+
+
+@pytest.fixture
+def use_index(index_path, monkeypatch):
+    monkeypatch.setattr(operation_index, "OPERATION_INDEX_PATH", index_path)
+    monkeypatch.setattr(operation_index, "_index", None)
+    return index_path
+
+
+def test_lookup_by_cli_and_api_name(index_path):
+    index = OperationIndex(index_path)
+    op = index.get("s3", "create-bucket")
+    assert op == Operation("s3api", "create-bucket", ("bucket",))
+    assert index.get("s3api", "CreateBucket") == op
+    assert index.get("sns", "no-such-operation") is None
+    assert "botocore" in index.meta
+
+
+def test_search_ranks_by_operation_words(index_path):
+    index = OperationIndex(index_path)
+    assert index.search("list sns topics")[0][:2] == ("sns", "list-topics")
+    assert index.search("invoke lambda function")[0][:2] == ("lambda", "invoke")
+    assert index.search("show my dynamodb tables")[0][:2] == ("dynamodb", "list-tables")
+    assert index.search("tell me a joke") == []
+
+
+def test_search_rejects_unrelated_text(index_path):
+    index = OperationIndex(index_path)
+    assert index.search("what is the weather in paris") == []       # no service named
+    assert index.search("is my lambda in there") == []              # stopwords only
+    assert index.search("get the sns weather") == []                # no operation fully named
+    assert index.search("I want to delete my account") == []        # never destructive
+    assert index.search("delete sns topic") == []
+    assert index.search("list sns topics", limit=10) and all(
+        not op.operation.startswith(("delete", "remove")) for op in index.search("sns topic", limit=10))
+
+
+def test_resolve_intent_names(index_path):
+    index = OperationIndex(index_path)
+    assert index.resolve("list_sns_topics").operation == "list-topics"
+    assert index.resolve("sns.list-topics").operation == "list-topics"
+    assert index.resolve("lambda:GetFunction").operation == "get-function"
+    assert index.resolve("unknown") is None
+
+
+def test_generate_command_falls_back_to_index(use_index):
+    command, explanation = generate_command("delete_sns_topic", {"topic_arn": "arn:aws:sns:us-east-1:1:t"})
+    assert command == "aws sns delete-topic --topic-arn arn:aws:sns:us-east-1:1:t"
+    assert "operation index" in explanation
+    command, _ = generate_command("unknown", {"table": "Orders", "region": "us-west-2"},
+                                  "get an item from dynamodb table Orders in us-west-2")
+    assert command == "aws dynamodb get-item --table-name Orders --key '<key>' --region us-west-2"
+    for query in ("what is the weather in paris", "I want to delete my account"):
+        assert generate_command("unknown", {}, query)[0] == "echo 'Unknown service intent'"
+
+
+def test_registry_intents_win_over_index(use_index):
+    assert generate_command("list_s3_buckets", {})[0] == "aws s3api list-buckets"
+
+
+def test_missing_index_disables_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(operation_index, "OPERATION_INDEX_PATH", str(tmp_path / "absent.sqlite"))
+    monkeypatch.setattr(operation_index, "_index", None)
+    assert generate_command("list_sns_topics", {})[0] == "echo 'Unknown service intent'"
@@ -0,0 +1,55 @@
+"""Tests for the pre-fork pool: workers inherit the parent's model and keep order."""
+from pathlib import Path
+import os
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant import prefork
+from aws_cli_assistant.core import nlp_utils
+
+pytestmark = pytest.mark.skipif(not prefork.CAN_FORK, reason="pre-fork needs os.fork")
+
+
+class ConstantClassifier:
+    """Labels every query 'list_iam_users'."""
+
+    def __call__(self, inputs, candidate_labels, multi_label=False, batch_size=None):
+        res = {"labels": ["list_iam_users"], "scores": [0.99]}
+        return res if isinstance(inputs, str) else [res for _ in inputs]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    nlp_utils.clear_intent_cache()
+    yield
+    nlp_utils.clear_intent_cache()
+
+
+def test_pool_matches_batch_order_without_model(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", False)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    queries = ["list iam users", "list my s3 buckets", "hello", "show lambda functions"] * 5
+    assert prefork.parse_nlp_pool(queries, workers=3, chunk_size=2) == nlp_utils.parse_nlp_batch(queries)
+
+
+def test_workers_share_the_parent_model(monkeypatch, tmp_path):
+    # a file, not a list: appends made in a child would be invisible to the parent
+    log = tmp_path / "loads"
+
+    def build():
+        with open(log, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        return ConstantClassifier()
+
+    monkeypatch.setattr(nlp_utils, "ENABLE_ML", True)
+    monkeypatch.setattr(nlp_utils, "NLP_MODE", "local")
+    monkeypatch.setattr(nlp_utils, "_classifier", None)
+    monkeypatch.setattr(nlp_utils, "_build_local_classifier", build)
+
+    results = prefork.parse_nlp_pool(["what is this", "no idea"] * 4, workers=2, chunk_size=1)
+    assert [intent for intent, _ in results] == ["list_iam_users"] * 8
+    # loaded exactly once, in the parent, before forking
+    assert log.read_text().split() == [str(os.getpid())]
@@ -0,0 +1,105 @@
+"""Unit tests for the vector nearest-neighbour `SemanticCache`."""
+from pathlib import Path
+import sys
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip("numpy")
+
+from aws_cli_assistant.core.semantic_cache import SemanticCache, hashed_features, hashed_vector
+
+
+def unit(*values, dim=8):
+    v = np.zeros(dim, np.float32)
+    v[:len(values)] = values
+    return v / np.linalg.norm(v)
+
+
+def test_hit_above_threshold_only():
+    cache = SemanticCache(dim=8, capacity=10, threshold=0.95)
+    cache.put(unit(1, 0), "a")
+    cache.put(unit(0, 1), "b")
+    assert cache.get(unit(1, 0.1))[0] == "a"
+    assert cache.get(unit(1, 1)) is None            # cos 0.71 to both
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_accept_skips_to_next_neighbour():
+    cache = SemanticCache(dim=8, capacity=10, threshold=0.9)
+    cache.put(unit(1, 0), "wrong-shape")
+    cache.put(unit(1, 0.2), "ok")
+    assert cache.get(unit(1, 0.05), accept=lambda v: v == "ok")[0] == "ok"
+    assert cache.get(unit(1, 0.05), accept=lambda v: False) is None
+
+
+def test_lru_eviction_reuses_slots():
+    cache = SemanticCache(dim=8, capacity=2, threshold=0.99)
+    cache.put(unit(1), "a")
+    cache.put(unit(0, 1), "b")
+    assert cache.get(unit(1))[0] == "a"             # "b" is now least recently used
+    cache.put(unit(0, 0, 1), "c")
+    assert cache.get(unit(0, 1)) is None
+    assert cache.get(unit(1))[0] == "a" and cache.get(unit(0, 0, 1))[0] == "c"
+    assert cache.stats()["evictions"] == 1 and len(cache) == 2
+
+
+def test_matrix_grows_to_capacity():
+    cache = SemanticCache(dim=4, capacity=600, threshold=0.999)
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((600, 4)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for i, v in enumerate(vectors):
+        cache.put(v, i)
+    assert len(cache) == 600
+    assert cache.get(vectors[599])[0] == 599
+
+
+def test_ann_index_finds_near_duplicates():
+    dim = 64
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    cache = SemanticCache(dim=dim, capacity=500, threshold=0.95, ann_min=100)
+    for i, v in enumerate(vectors):
+        cache.put(v, i)
+
+    found = 0
+    for i in range(0, 500, 10):
+        query = vectors[i] + 0.01 * rng.standard_normal(dim).astype(np.float32)
+        hit = cache.get(query / np.linalg.norm(query))
+        found += hit is not None and hit[0] == i
+    assert found >= 45
+    assert cache.stats()["ann_lookups"] == 50
+
+
+def test_ann_min_follows_capacity():
+    assert SemanticCache(dim=8, capacity=4096).ann_min == 512
+    assert SemanticCache(dim=8, capacity=100).ann_min == 256
+    assert SemanticCache(dim=8, capacity=4096, ann_min=10).ann_min == 10
+
+
+def test_clear():
+    cache = SemanticCache(dim=8, capacity=4)
+    cache.put(unit(1), "a")
+    assert cache.clear() == 1
+    assert cache.get(unit(1)) is None and len(cache) == 0
+
+
+def test_zero_capacity_disables():
+    cache = SemanticCache(dim=8, capacity=0)
+    cache.put(unit(1), "a")
+    assert cache.get(unit(1)) is None
+
+
+def test_hashed_vector_is_stable_unit_length():
+    vec = hashed_vector("list my s3 buckets", 1024)
+    assert vec.dtype == np.float32 and vec.shape == (1024,)
+    assert np.isclose(np.linalg.norm(vec), 1.0)
+    assert np.array_equal(vec, hashed_vector("List my S3 buckets", 1024))
+    idx, val = hashed_features("list my s3 buckets", 1024)
+    assert np.allclose(vec[idx], val)
+    assert float(vec @ hashed_vector("lsit my s3 bukcets", 1024)) > float(vec @ hashed_vector("stop instance", 1024))
+    assert not hashed_vector("", 1024).any()
@@ -0,0 +1,128 @@
+"""Unit tests for the span / trace API and the latency histograms."""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import asyncio
+import contextvars
+import random
+import sys
+import threading
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aws_cli_assistant.core import timing
+from aws_cli_assistant.core.timing import LatencyHistogram, span, trace
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    timing.reset_latency_stats()
+    yield
+    timing.reset_latency_stats()
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = LatencyHistogram()
+    values = [random.Random(0).lognormvariate(2, 1) for _ in range(10000)]
+    for v in values:
+        hist.record(v)
+    values.sort()
+    for q in (50, 95, 99):
+        exact = values[int(len(values) * q / 100) - 1]
+        assert hist.percentile(q) == pytest.approx(exact, rel=0.06)
+    summary = hist.summary()
+    assert summary["count"] == 10000 and summary["max_ms"] == pytest.approx(values[-1], abs=1e-3)
+
+
+def test_empty_and_single_value_histograms():
+    hist = LatencyHistogram()
+    assert hist.summary()["p99_ms"] == 0.0
+    hist.record(3.0)
+    assert hist.percentile(50) == hist.percentile(99) == 3.0
+
+
+def test_spans_land_in_trace_and_histograms():
+    with trace("req") as t:
+        with span("nlp") as s:
+            s.set(backend="rules")
+        with span("generate", intent="list_s3_buckets"):
+            pass
+        timing.record_aws_call("s3", "ListBuckets", 12.5, 200)
+    d = t.to_dict()
+    assert [s["name"] for s in d["spans"]] == ["nlp", "generate"]
+    assert d["spans"][0]["backend"] == "rules" and d["spans"][1]["intent"] == "list_s3_buckets"
+    assert d["aws_calls"] == [{"service": "s3", "operation": "ListBuckets", "ms": 12.5, "status": 200}]
+    assert d["total_ms"] >= sum(s["ms"] for s in d["spans"])
+    assert set(timing.latency_stats()) == {"req", "nlp", "generate", "aws.s3.ListBuckets"}
+
+
+def test_spans_outside_a_trace_still_feed_histograms():
+    with span("validate"):
+        pass
+    assert timing.current_trace() is None
+    assert timing.latency_stats()["validate"]["count"] == 1
+
+
+def test_concurrent_tasks_keep_separate_traces():
+    async def request(name, delay):
+        with trace(name) as t:
+            await asyncio.sleep(delay)
+            with span(f"{name}.work"):
+                await asyncio.to_thread(lambda: None)
+        return t
+
+    async def main():
+        return await asyncio.gather(request("a", 0.02), request("b", 0.0))
+
+    a, b = asyncio.run(main())
+    assert [s.name for s in a.spans] == ["a.work"]
+    assert [s.name for s in b.spans] == ["b.work"]
+
+
+def test_executor_needs_copied_context():
+    def work():
+        with span("stage"):
+            pass
+
+    with ThreadPoolExecutor(1) as pool, trace("req") as t:
+        pool.submit(work).result()
+        assert t.spans == []
+        pool.submit(contextvars.copy_context().run, work).result()
+    assert [s.name for s in t.spans] == ["stage"]
+
+
+def test_validator_times_every_aws_call(monkeypatch):
+    boto3 = pytest.importorskip("boto3")
+    from aws_cli_assistant.core import aws_validator
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = b"<ListAllMyBucketsResult><Buckets><Bucket><Name>b1</Name></Bucket></Buckets></ListAllMyBucketsResult>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "stub")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "stub")
+    monkeypatch.setattr(aws_validator, "_session_client", lambda service, region: aws_validator._instrument(
+        boto3.Session().client(service, region_name=region, endpoint_url=url)))
+    try:
+        with trace("req") as t:
+            result = aws_validator.validate_command_safe("list_s3_buckets", {})
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert result["detail"] == {"buckets": ["b1"]}
+    d = t.to_dict()
+    assert [(s["name"], s["status"]) for s in d["spans"]] == [("validate", "valid")]
+    assert [(c["service"], c["operation"], c["status"]) for c in d["aws_calls"]] == [("s3", "ListBuckets", 200)]
+    assert timing.latency_stats()["aws.s3.ListBuckets"]["count"] == 1